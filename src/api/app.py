@@ -1,7 +1,9 @@
 import os
 import json
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from src.core.answer_cache import AnswerCache, SemanticAnswerCache
 from src.core.rag_chain import RAGChain
 from src.collector import OpenAgendaCollector
 from src.processor import EventProcessor
@@ -12,8 +14,13 @@ app = FastAPI(
     description="Assistant de recommandation d'événements culturels",
 )
 
+# Partagé par les chaînes successives : les statistiques survivent aux
+# reconstructions, les réponses de l'ancien index sont invalidées
+answer_cache = AnswerCache.from_env()
+semantic_cache = SemanticAnswerCache.from_env()
+
 try:
-    rag_chain = RAGChain()
+    rag_chain = RAGChain(answer_cache=answer_cache, semantic_cache=semantic_cache)
 except Exception as e:
     print(f"Warning: RAGChain could not be initialized: {e}")
     rag_chain = None
@@ -27,6 +34,23 @@ class Response(BaseModel):
     answer: str
 
 
+class BatchQuery(BaseModel):
+    questions: list[str]
+
+
+class BatchItem(BaseModel):
+    answer: str | None = None
+    error: str | None = None
+
+
+class BatchResponse(BaseModel):
+    results: list[BatchItem]
+
+
+# Taille maximale d'un lot de questions (/ask/batch)
+ASK_BATCH_MAX_SIZE = int(os.getenv("ASK_BATCH_MAX_SIZE", "100"))
+
+
 @app.get("/")
 def read_root():
     return {"message": "Bienvenue sur l'API Culture IA !"}
@@ -52,8 +76,14 @@ def get_metrics():
     }
 
 
+@app.get("/cache")
+def get_cache_stats():
+    """Statistiques des caches de réponses (taux de succès, taille)."""
+    return {"exact": answer_cache.summary(), "semantic": semantic_cache.summary()}
+
+
 @app.post("/ask", response_model=Response)
-def ask_question(query: Query):
+async def ask_question(query: Query):
     if not query.question or not query.question.strip():
         raise HTTPException(
             status_code=400, detail="La question ne peut pas être vide."
@@ -66,20 +96,103 @@ def ask_question(query: Query):
         )
 
     try:
-        answer = rag_chain.ask(query.question)
+        answer = await rag_chain.aask(query.question)
         return Response(answer=answer)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@app.post("/ask/batch", response_model=BatchResponse)
+async def ask_questions_batch(query: BatchQuery):
+    """
+    Réponses à une liste de questions, dans l'ordre. Une question vide ou en
+    échec donne une erreur à sa place sans faire échouer le lot.
+    """
+    if not query.questions:
+        raise HTTPException(status_code=400, detail="La liste de questions est vide.")
+    if len(query.questions) > ASK_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Au plus {ASK_BATCH_MAX_SIZE} questions par lot.",
+        )
+
+    if rag_chain is None:
+        raise HTTPException(
+            status_code=503,
+            detail="RAG Chain not initialized. Please rebuild index.",
+        )
+
+    valid = [i for i, q in enumerate(query.questions) if q and q.strip()]
+    results = [
+        BatchItem(error="La question ne peut pas être vide.") for _ in query.questions
+    ]
+    try:
+        answers = await rag_chain.aask_many([query.questions[i] for i in valid])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+    for i, answer in zip(valid, answers):
+        if isinstance(answer, Exception):
+            results[i] = BatchItem(error=str(answer))
+        else:
+            results[i] = BatchItem(answer=answer)
+    return BatchResponse(results=results)
+
+
+def _sse(data, event=None):
+    """One server-sent event; the payload is JSON so newlines stay intact."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/ask/stream")
+async def ask_question_stream(query: Query):
+    """
+    Réponse en server-sent events : un événement {"token": ...} par morceau
+    généré, puis "done" (ou "error" si la génération échoue en cours de route).
+    """
+    if not query.question or not query.question.strip():
+        raise HTTPException(
+            status_code=400, detail="La question ne peut pas être vide."
+        )
+
+    if rag_chain is None:
+        raise HTTPException(
+            status_code=503,
+            detail="RAG Chain not initialized. Please rebuild index.",
+        )
+
+    async def events():
+        try:
+            async for token in rag_chain.astream(query.question):
+                yield _sse({"token": token})
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            yield _sse({"detail": str(e)}, event="error")
+            return
+        yield _sse({}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/rebuild")
-def rebuild_index():
+def rebuild_index(full: bool = False):
+    # pylint: disable=global-statement
+    global rag_chain
     try:
-        # 1. Collect
+        # 1. Collect (delta depuis le dernier checkpoint, sauf si full=true)
         collector = OpenAgendaCollector()
-        events = collector.fetch_events()
-        recent_events = collector.filter_recent_events(events)
-        collector.save_to_json(recent_events)
+        sync_stats = collector.sync(full=full)
+
+        # Données inchangées (304 ou delta vide) : index courant conservé
+        if sync_stats.get("mode") == "not_modified" and rag_chain is not None:
+            return {
+                "message": "Aucune modification des données, index conservé.",
+                "collector": sync_stats,
+            }
 
         # 2. Process
         processor = EventProcessor()
@@ -90,11 +203,12 @@ def rebuild_index():
         vector_manager.create_index()
 
         # 4. Reload RAG Chain
-        # pylint: disable=global-statement
-        global rag_chain
-        rag_chain = RAGChain()
+        rag_chain = RAGChain(answer_cache=answer_cache, semantic_cache=semantic_cache)
 
-        return {"message": "Index vectoriel reconstruit avec succès !"}
+        return {
+            "message": "Index vectoriel reconstruit avec succès !",
+            "collector": sync_stats,
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -0,0 +1,94 @@
+import time
+import json
+import argparse
+from src.bench.concurrency_bench import LatencyLLM
+from src.core.answer_cache import AnswerCache, SemanticAnswerCache
+
+DEFAULT_QUESTIONS = [
+    "Des concerts de jazz ce week-end ?",
+    "Quelles expositions de peinture le mois prochain ?",
+    "Un spectacle pour enfants demain ?",
+    "Du théâtre ce week-end ?",
+    "Des ateliers de poterie cette semaine ?",
+    "Des visites guidées du patrimoine le mois prochain ?",
+    "Un festival de musique électronique cet été ?",
+    "Des conférences sur l'histoire de l'art ?",
+    "Des projections de films en plein air ?",
+    "Des concerts de musique classique demain soir ?",
+    "Un marché de créateurs ce week-end ?",
+    "Des lectures ou rencontres d'auteurs cette semaine ?",
+    "Des spectacles de danse contemporaine ?",
+    "Des animations à la médiathèque ?",
+    "Des expositions de photographie ce mois-ci ?",
+    "Un concert de rock ce soir ?",
+]
+
+
+def run_benchmark(rag, questions, latency=0.5, max_concurrency=8):
+    """
+    Wall time of the same questions asked one by one (ask) and as one
+    list (ask_many), answer caches off and the LLM replaced by a fixed
+    latency, so that the measure isolates the batching. Also reports the
+    peak number of LLM calls in flight of each mode.
+    """
+    serial_llm, batch_llm = LatencyLLM(latency), LatencyLLM(latency)
+    rag.llm = serial_llm.runnable()
+    rag.answer_chain = rag._build_answer_chain()  # pylint: disable=protected-access
+    rag.chain = rag._build_chain()  # pylint: disable=protected-access
+    rag.answer_cache = AnswerCache(max_entries=0)
+    rag.semantic_cache = SemanticAnswerCache(max_entries=0)
+
+    # Questions suffixées par mode : pas d'embedding déjà en cache d'un mode à l'autre
+    start = time.perf_counter()
+    for question in questions:
+        rag.ask(f"{question} (série)")
+    serial = time.perf_counter() - start
+
+    rag.llm = batch_llm.runnable()
+    rag.answer_chain = rag._build_answer_chain()  # pylint: disable=protected-access
+    start = time.perf_counter()
+    results = rag.ask_many(
+        [f"{question} (lot)" for question in questions], max_concurrency
+    )
+    batch = time.perf_counter() - start
+
+    return {
+        "questions": len(questions),
+        "llm_latency_seconds": latency,
+        "max_concurrency": max_concurrency,
+        "errors": sum(isinstance(result, Exception) for result in results),
+        "serial_seconds": round(serial, 3),
+        "batch_seconds": round(batch, 3),
+        "serial_questions_per_sec": round(len(questions) / serial, 2),
+        "batch_questions_per_sec": round(len(questions) / batch, 2),
+        "speedup": round(serial / batch, 2),
+        "serial_peak_in_flight": serial_llm.peak_in_flight,
+        "batch_peak_in_flight": batch_llm.peak_in_flight,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Débit de ask_many comparé à des appels ask successifs."
+    )
+    parser.add_argument("--latency", type=float, default=0.5, help="Latence LLM (s)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--questions", help="Fichier JSON d'une liste de questions (optionnel)"
+    )
+    args = parser.parse_args(argv)
+
+    # pylint: disable=import-outside-toplevel
+    from src.core.rag_chain import RAGChain
+
+    questions = DEFAULT_QUESTIONS
+    if args.questions:
+        with open(args.questions, "r", encoding="utf-8") as f:
+            questions = json.load(f)
+    result = run_benchmark(RAGChain(), questions, args.latency, args.concurrency)
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import json
+import argparse
+import resource
+import tempfile
+import tracemalloc
+from unittest.mock import patch
+from src.bench.openagenda_server import (
+    OpenAgendaStandIn,
+    RecordedAgenda,
+    SyntheticAgenda,
+)
+from src.collector import OpenAgendaCollector
+
+
+def run_benchmark(
+    events=10_000,
+    recorded=None,
+    mode="iter",
+    page_size=100,
+    latency=0.0,
+    error_rate=0.0,
+    trace_memory=False,
+):
+    """
+    Run the collector against a local OpenAgenda stand-in and return its
+    throughput (events/sec), HTTP counters and memory usage.
+    mode "iter" only consumes iter_events(); "sync" also filters and writes
+    the raw store like /rebuild does.
+    """
+    agenda = RecordedAgenda(recorded) if recorded else SyntheticAgenda(events)
+    server = OpenAgendaStandIn(agenda, latency=latency, error_rate=error_rate).start()
+
+    env = {
+        "OPENAGENDA_API_URL": f"{server.url}/v2",
+        "OPENAGENDA_BASE_URL": f"{server.url}/agendas",
+        "OPENAGENDA_MAX_RPS": "0",
+        "MOCK_DATA": "false",
+    }
+    try:
+        with patch.dict(os.environ, env), tempfile.TemporaryDirectory() as tmp:
+            collector = OpenAgendaCollector(api_key="bench", agenda_uid="bench")
+            collector.page_size = page_size
+            # Pas d'attente réelle sur les fautes injectées : on mesure le débit
+            collector.backoff_factor = 0.01
+
+            if trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            if mode == "sync":
+                collected = collector.sync(
+                    filename=os.path.join(tmp, "raw_events.json"), full=True
+                )["total"]
+            else:
+                collected = sum(1 for _ in collector.iter_events())
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+            if trace_memory:
+                tracemalloc.stop()
+    finally:
+        server.stop()
+
+    # ru_maxrss : kilo-octets sous Linux, octets sous macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        max_rss *= 1024
+
+    return {
+        "mode": mode,
+        "events": collected,
+        "seconds": round(elapsed, 3),
+        "events_per_sec": round(collected / elapsed, 1) if elapsed else None,
+        "http": collector.http_stats,
+        "server": server.stats,
+        "python_peak_mb": round(peak / 2**20, 1) if peak is not None else None,
+        "max_rss_mb": round(max_rss / 2**20, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark du collecteur contre un OpenAgenda local."
+    )
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--recorded", help="Store brut enregistré à rejouer")
+    parser.add_argument("--mode", choices=["iter", "sync"], default="iter")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0, help="secondes")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--trace-memory", action="store_true")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(
+        events=args.events,
+        recorded=args.recorded,
+        mode=args.mode,
+        page_size=args.page_size,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        trace_memory=args.trace_memory,
+    )
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == "__main__":
+    main()
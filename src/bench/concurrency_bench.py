@@ -0,0 +1,217 @@
+import time
+import json
+import asyncio
+import argparse
+import threading
+from unittest.mock import patch
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.runnables import RunnableLambda
+from src.core.answer_cache import AnswerCache, SemanticAnswerCache
+from src.core.embedding_cache import CachedEmbeddings
+from src.core.time_index import TimeIndex
+
+DEFAULT_LEVELS = (1, 10, 50, 100, 200, 400)
+
+
+class LatencyEmbeddings(DeterministicFakeEmbedding):
+    """
+    Fake embeddings taking 'latency' seconds per call, like the Mistral
+    embeddings API: blocking in the sync methods, awaited in aembed_query.
+    Counts the blocking calls.
+    """
+
+    latency: float = 0.05
+    blocking_calls: int = 0
+
+    def embed_documents(self, texts):
+        self.blocking_calls += 1
+        time.sleep(self.latency)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.blocking_calls += 1
+        time.sleep(self.latency)
+        return super().embed_query(text)
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(self.latency)
+        return super().embed_query(text)
+
+
+class LatencyLLM:
+    """
+    Fake chat model answering after 'latency' seconds (time.sleep when
+    invoked, asyncio.sleep when awaited). Tracks the peak number of
+    generations in flight.
+    """
+
+    def __init__(self, latency=0.5):
+        self.latency = latency
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _answer(self, _):
+        self._enter()
+        time.sleep(self.latency)
+        self._exit()
+        return "Un concert de jazz samedi."
+
+    async def _aanswer(self, _):
+        self._enter()
+        await asyncio.sleep(self.latency)
+        self._exit()
+        return "Un concert de jazz samedi."
+
+    def runnable(self):
+        return RunnableLambda(self._answer, afunc=self._aanswer)
+
+
+def bench_chain(llm, embeddings, events=200):
+    """
+    Real RAGChain over a small in-memory FAISS index, with the fake LLM and
+    fake embeddings (behind the embedding cache, as in production).
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.core.rag_chain import RAGChain
+
+    cached = CachedEmbeddings(embeddings, "bench", path="")
+    docs = [
+        Document(page_content=f"Concert de jazz n°{n}", metadata={"event_id": n})
+        for n in range(events)
+    ]
+    latency, embeddings.latency = embeddings.latency, 0
+    vectorstore = FAISS.from_documents(docs, cached)
+    embeddings.latency, embeddings.blocking_calls = latency, 0
+
+    with patch("src.core.rag_chain.VectorStoreManager") as manager_cls, patch(
+        "src.core.rag_chain.ChatMistralAI", return_value=llm.runnable()
+    ):
+        manager = manager_cls.return_value
+        manager.load_index.return_value = vectorstore
+        manager.load_time_index.return_value = TimeIndex.from_vectorstore(vectorstore)
+        manager.load_parents.return_value = None
+        manager.load_lexical_index.return_value = None
+        manager.load_index_version.return_value = "bench"
+        return RAGChain(
+            answer_cache=AnswerCache(), semantic_cache=SemanticAnswerCache()
+        )
+
+
+def sync_app(chain):
+    """/ask as before: a sync handler, each question holding a pool thread."""
+    # pylint: disable=import-outside-toplevel
+    from src.api.app import Query, Response
+
+    app = FastAPI()
+
+    @app.post("/ask", response_model=Response)
+    def ask_question(query: Query):
+        return Response(answer=chain.ask(query.question))
+
+    return app
+
+
+async def _load(app, concurrency, requests_per_client):
+    """'concurrency' clients each sending 'requests_per_client' questions in a row."""
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+
+        async def run_client(n):
+            for i in range(requests_per_client):
+                start = time.perf_counter()
+                # Questions distinctes : aucune réponse servie par les caches
+                response = await client.post(
+                    "/ask", json={"question": f"Des concerts de jazz {n}-{i} ?"}
+                )
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run_client(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+
+def run_benchmark(
+    levels=DEFAULT_LEVELS, latency=0.5, embedding_latency=0.05, requests_per_client=3
+):
+    """
+    Concurrency curve of /ask in one worker, before (sync handler calling
+    RAGChain.ask in the threadpool) and after (async handler awaiting
+    RAGChain.aask): throughput, latency percentiles, peak generations in
+    flight and blocking embedding calls per client count.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.api import app as api
+
+    results = {
+        "llm_latency_seconds": latency,
+        "embedding_latency_seconds": embedding_latency,
+        "requests_per_client": requests_per_client,
+    }
+    for mode in ("sync", "async"):
+        curve = {}
+        for concurrency in levels:
+            llm = LatencyLLM(latency)
+            embeddings = LatencyEmbeddings(size=16, latency=embedding_latency)
+            chain = bench_chain(llm, embeddings)
+            app = sync_app(chain) if mode == "sync" else api.app
+            with patch.object(api, "rag_chain", chain):
+                latencies, elapsed = asyncio.run(
+                    _load(app, concurrency, requests_per_client)
+                )
+            curve[concurrency] = {
+                "requests_per_sec": round(len(latencies) / elapsed, 1),
+                "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1),
+                "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 1),
+                "peak_in_flight": llm.peak_in_flight,
+                "blocking_embedding_calls": embeddings.blocking_calls,
+            }
+        results[mode] = curve
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Test de charge de /ask : handler synchrone vs asynchrone."
+    )
+    parser.add_argument(
+        "--levels", default=",".join(str(level) for level in DEFAULT_LEVELS)
+    )
+    parser.add_argument("--latency", type=float, default=0.5, help="Latence LLM (s)")
+    parser.add_argument(
+        "--embedding-latency", type=float, default=0.05, help="Latence embedding (s)"
+    )
+    parser.add_argument("--requests", type=int, default=3, help="Questions par client")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(
+        levels=[int(level) for level in args.levels.split(",")],
+        latency=args.latency,
+        embedding_latency=args.embedding_latency,
+        requests_per_client=args.requests,
+    )
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == "__main__":
+    main()
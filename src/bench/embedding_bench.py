@@ -0,0 +1,128 @@
+import sys
+import time
+import json
+import argparse
+import resource
+import numpy as np
+from src.bench.openagenda_server import SyntheticAgenda
+from src.processor import EventProcessor
+
+
+def _synthetic_texts(count):
+    """Search texts of synthetic events, as built by the processor."""
+    agenda = SyntheticAgenda(count)
+    processor = EventProcessor()
+    # pylint: disable=protected-access
+    return [processor._process_event(agenda[i])["text"] for i in range(count)]
+
+
+def _load_backend(backend, model_name, onnx_dir, batch_size):
+    # pylint: disable=import-outside-toplevel
+    if backend == "onnx":
+        from src.core.onnx_embeddings import OnnxEmbeddings
+
+        return OnnxEmbeddings(onnx_dir, batch_size=batch_size)
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(
+        model_name=model_name, encode_kwargs={"batch_size": batch_size}
+    )
+
+
+def cosine_agreement(reference, candidate):
+    """Row-wise cosine similarity between two lists of vectors."""
+    a = np.asarray(reference, dtype=np.float64)
+    b = np.asarray(candidate, dtype=np.float64)
+    a /= np.linalg.norm(a, axis=1, keepdims=True)
+    b /= np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+def run_benchmark(
+    backends=("torch", "onnx"),
+    model_name="all-MiniLM-L6-v2",
+    onnx_dir="data/onnx/all-MiniLM-L6-v2-int8",
+    texts=2_000,
+    queries=200,
+    batch_size=32,
+):
+    """
+    Compare local embedding backends: startup time, per-query latency
+    percentiles (embed_query), build throughput (embed_documents) and, when
+    several backends run, cosine agreement with the first one.
+    """
+    documents = _synthetic_texts(texts)
+    questions = [f"Quels événements à {doc.splitlines()[0][7:]} ?" for doc in documents]
+    questions = questions[:queries]
+
+    results = {}
+    reference = None
+    for backend in backends:
+        start = time.perf_counter()
+        embeddings = _load_backend(backend, model_name, onnx_dir, batch_size)
+        load_seconds = time.perf_counter() - start
+
+        embeddings.embed_query("échauffement")
+        latencies = []
+        for question in questions:
+            start = time.perf_counter()
+            embeddings.embed_query(question)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        vectors = embeddings.embed_documents(documents)
+        build_seconds = time.perf_counter() - start
+
+        result = {
+            "load_seconds": round(load_seconds, 3),
+            "query_ms": {
+                "p50": round(float(np.percentile(latencies, 50)), 2),
+                "p95": round(float(np.percentile(latencies, 95)), 2),
+                "p99": round(float(np.percentile(latencies, 99)), 2),
+            },
+            "build_docs_per_sec": round(len(documents) / build_seconds, 1),
+        }
+        if reference is None:
+            reference = vectors
+        else:
+            cosines = cosine_agreement(reference, vectors)
+            result["cosine_vs_" + backends[0]] = {
+                "mean": round(float(cosines.mean()), 4),
+                "min": round(float(cosines.min()), 4),
+            }
+        results[backend] = result
+
+    # ru_maxrss : kilo-octets sous Linux, octets sous macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        max_rss *= 1024
+    results["max_rss_mb"] = round(max_rss / 2**20, 1)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark des moteurs d'embeddings locaux (torch / ONNX int8)."
+    )
+    parser.add_argument("--backends", default="torch,onnx")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--onnx-dir", default="data/onnx/all-MiniLM-L6-v2-int8")
+    parser.add_argument("--texts", type=int, default=2_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(
+        backends=tuple(args.backends.split(",")),
+        model_name=args.model,
+        onnx_dir=args.onnx_dir,
+        texts=args.texts,
+        queries=args.queries,
+        batch_size=args.batch_size,
+    )
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == "__main__":
+    main()
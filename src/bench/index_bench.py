@@ -0,0 +1,113 @@
+import time
+import json
+import argparse
+import faiss
+import numpy as np
+from src.core.index_spec import IndexSpec
+from src.storage import iter_records
+
+DEFAULT_SPECS = (
+    "flat",
+    "hnsw:m=32,ef_search=64",
+    "ivf_flat:nlist=1024,nprobe=16",
+    "ivf_pq:nlist=1024,m=16,nbits=8,nprobe=16",
+)
+
+
+def synthetic_corpus(size, dim, queries, seed=0):
+    """Clustered random vectors (and queries) standing in for an embedded catalogue."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, size // 100), dim))
+
+    def sample(count):
+        points = centers[rng.integers(len(centers), size=count)]
+        return (points + 0.3 * rng.normal(size=(count, dim))).astype(np.float32)
+
+    return sample(size), sample(queries)
+
+
+def embedded_corpus(processed_events_file, queries, seed=0):
+    """Vectors of a processed store, embedded like the index (embedding cache)."""
+    # pylint: disable=import-outside-toplevel
+    from src.core.vectorstore import VectorStoreManager
+
+    events = list(iter_records(processed_events_file))
+    embeddings = VectorStoreManager().embeddings
+    vectors = np.asarray(
+        embeddings.embed_documents([event["text"] for event in events]),
+        dtype=np.float32,
+    )
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(len(events), size=min(queries, len(events)), replace=False)
+    titles = [events[i]["metadata"].get("title", events[i]["text"]) for i in picked]
+    return vectors, np.asarray(
+        [embeddings.embed_query(title) for title in titles], dtype=np.float32
+    )
+
+
+def run_benchmark(vectors, queries, specs=DEFAULT_SPECS, k=10):
+    """
+    Build every index spec on 'vectors' and report, against the exact (flat)
+    search: recall@k, single-query latency percentiles, build time and the
+    serialized index size.
+    """
+    dim = vectors.shape[1]
+    exact = faiss.IndexFlatL2(dim)
+    exact.add(vectors)
+    _, truth = exact.search(queries, k)
+
+    results = {}
+    for value in specs:
+        spec = IndexSpec.parse(value)
+        start = time.perf_counter()
+        index = spec.build(dim, vectors)
+        index.add(vectors)
+        build_seconds = time.perf_counter() - start
+
+        latencies = []
+        found = []
+        for query in queries:
+            start = time.perf_counter()
+            _, ids = index.search(query[None, :], k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found.append(ids[0])
+
+        recall = np.mean(
+            [len(set(ids) & set(expected)) / k for ids, expected in zip(found, truth)]
+        )
+        results[str(spec)] = {
+            f"recall@{k}": round(float(recall), 4),
+            "query_ms": {
+                "p50": round(float(np.percentile(latencies, 50)), 3),
+                "p95": round(float(np.percentile(latencies, 95)), 3),
+                "p99": round(float(np.percentile(latencies, 99)), 3),
+            },
+            "build_seconds": round(build_seconds, 3),
+            "memory_mb": round(faiss.serialize_index(index).nbytes / 2**20, 2),
+        }
+    return {"vectors": len(vectors), "dim": dim, "queries": len(queries), **results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark rappel / latence / mémoire des types d'index FAISS."
+    )
+    parser.add_argument("--processed", help="Store d'événements traités à indexer")
+    parser.add_argument("--size", type=int, default=50_000, help="corpus synthétique")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--specs", default=";".join(DEFAULT_SPECS))
+    args = parser.parse_args(argv)
+
+    if args.processed:
+        vectors, queries = embedded_corpus(args.processed, args.queries)
+    else:
+        vectors, queries = synthetic_corpus(args.size, args.dim, args.queries)
+    result = run_benchmark(vectors, queries, specs=args.specs.split(";"), k=args.k)
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import re
+import json
+import time
+import random
+import bisect
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from src.storage import iter_records
+
+# Date de référence des agendas synthétiques (création et mises à jour)
+_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+_V2_EVENTS = re.compile(r"^/v2/agendas/([^/]+)/events$")
+_LEGACY_EXPORT = re.compile(r"^/agendas/([^/]+)/events\.json$")
+
+_TITLES = ["Concert", "Exposition", "Atelier", "Spectacle", "Visite guidée"]
+_CITIES = ["Paris", "Lyon", "Marseille", "Nantes", "Lille"]
+
+
+class SyntheticAgenda:
+    """
+    Deterministic agenda of 'size' events generated on demand, so 1M events
+    cost no memory. Events are ordered by 'updatedAt' (one minute apart).
+    """
+
+    def __init__(self, size):
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        begin = now + timedelta(days=index % 60, hours=index % 10)
+        title = _TITLES[index % len(_TITLES)]
+        city = _CITIES[index % len(_CITIES)]
+        return {
+            "uid": index + 1,
+            "title": {"fr": f"{title} n°{index + 1}"},
+            "description": {"fr": f"{title} à {city}, événement synthétique."},
+            "longDescription": {"fr": f"{title} à {city}. " * 5},
+            "location": {
+                "name": f"Salle {index % 97}",
+                "address": f"{index % 200} rue de la Culture",
+                "city": city,
+                "postalCode": "75000",
+            },
+            "timings": [
+                {
+                    "begin": (begin + timedelta(weeks=week)).isoformat(),
+                    "end": (begin + timedelta(weeks=week, hours=2)).isoformat(),
+                }
+                for week in range(index % 4 + 1)
+            ],
+            "keywords": {"fr": [title.lower(), city.lower()]},
+            "canonicalUrl": f"https://openagenda.com/events/{index + 1}",
+            "updatedAt": self.updated_at(index),
+            "state": 2,
+        }
+
+    @staticmethod
+    def updated_at(index):
+        return (_EPOCH + timedelta(minutes=index)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    def first_updated_since(self, value):
+        return bisect.bisect_left(range(self.size), value, key=self.updated_at)
+
+
+class RecordedAgenda:
+    """Agenda replayed from a recorded raw store (NDJSON or legacy JSON array)."""
+
+    def __init__(self, path):
+        self.events = sorted(iter_records(path), key=lambda e: e.get("updatedAt", ""))
+
+    def __len__(self):
+        return len(self.events)
+
+    def __getitem__(self, index):
+        return self.events[index]
+
+    def first_updated_since(self, value):
+        return bisect.bisect_left(
+            self.events, value, key=lambda e: e.get("updatedAt", "")
+        )
+
+
+class OpenAgendaStandIn(ThreadingHTTPServer):
+    """
+    Local stand-in for OpenAgenda serving one agenda on any agenda UID:
+    - v2 API: /v2/agendas/{uid}/events with 'limit', 'after[]' cursor and
+      'updatedAt[gte]' delta filter;
+    - legacy export: /agendas/{uid}/events.json with ETag / 304.
+    Latency and 429/5xx faults can be injected to exercise the collector.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        agenda,
+        host="127.0.0.1",
+        port=0,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        retry_after=0,
+        seed=0,
+    ):
+        super().__init__((host, port), _Handler)
+        self.agenda = agenda
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "faults": 0, "events_served": 0}
+        self.etag = (
+            f'"{len(agenda)}-{hashlib.sha1(str(seed).encode()).hexdigest()[:8]}"'
+        )
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread; returns the server for chaining."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def draw_fault(self):
+        """Return the HTTP status of an injected fault, or None."""
+        with self.lock:
+            self.stats["requests"] += 1
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.stats["faults"] += 1
+                return self.random.choice([429, 500, 502, 503])
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: OpenAgendaStandIn
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        server = self.server
+        if server.latency or server.jitter:
+            with server.lock:
+                jitter = server.random.uniform(0, server.jitter)
+            time.sleep(server.latency + jitter)
+
+        fault = server.draw_fault()
+        if fault:
+            headers = {"Retry-After": str(server.retry_after)} if fault == 429 else {}
+            self._send_json({"error": "injected fault"}, fault, headers)
+            return
+
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        if _V2_EVENTS.match(parsed.path):
+            self._serve_v2(query)
+        elif _LEGACY_EXPORT.match(parsed.path):
+            self._serve_legacy()
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def _serve_v2(self, query):
+        agenda = self.server.agenda
+        limit = int(query.get("limit", ["20"])[0])
+        if "after[]" in query:
+            start = int(query["after[]"][0])
+        elif "updatedAt[gte]" in query:
+            start = agenda.first_updated_since(query["updatedAt[gte]"][0])
+        else:
+            start = 0
+
+        end = min(start + limit, len(agenda))
+        events = [agenda[i] for i in range(start, end)]
+        with self.server.lock:
+            self.server.stats["events_served"] += len(events)
+        self._send_json(
+            {
+                "total": len(agenda),
+                "events": events,
+                "after": [end] if end < len(agenda) else None,
+            }
+        )
+
+    def _serve_legacy(self):
+        server = self.server
+        if self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.send_header("ETag", server.etag)
+            self.end_headers()
+            return
+
+        events = [server.agenda[i] for i in range(len(server.agenda))]
+        with server.lock:
+            server.stats["events_served"] += len(events)
+        self._send_json({"events": events}, headers={"ETag": server.etag})
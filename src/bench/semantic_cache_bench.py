@@ -0,0 +1,97 @@
+import os
+import json
+import argparse
+import numpy as np
+from src.core.answer_cache import date_bucket
+from src.core.rag_chain import RAGChain
+
+DEFAULT_PAIRS = os.path.join(os.path.dirname(__file__), "semantic_cache_pairs.json")
+DEFAULT_THRESHOLDS = (0.8, 0.85, 0.9, 0.925, 0.95, 0.975)
+
+
+def evaluate_pairs(embeddings, pairs, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Replay labelled (cached question, new question, same_answer) pairs
+    through the cache rules of a chain with a time index (date bucket, then
+    cosine similarity for topical questions; purely temporal questions
+    share the exact-cache entry of their date bucket) and report, per
+    threshold, the share of paraphrases served from cache and the false-hit
+    rate (wrong answers among cache hits).
+    """
+    cached = np.asarray(
+        embeddings.embed_documents([p["cached"] for p in pairs]), dtype=np.float64
+    )
+    queries = np.asarray(
+        embeddings.embed_documents([p["query"] for p in pairs]), dtype=np.float64
+    )
+    cached /= np.linalg.norm(cached, axis=1, keepdims=True)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    similarities = (cached * queries).sum(axis=1)
+
+    # pylint: disable=protected-access
+    same_bucket = np.array(
+        [
+            date_bucket(RAGChain._get_date_range_from_query(p["cached"]))
+            == date_bucket(RAGChain._get_date_range_from_query(p["query"]))
+            for p in pairs
+        ]
+    )
+    topical = np.array(
+        [
+            (RAGChain._has_topic(p["cached"]), RAGChain._has_topic(p["query"]))
+            for p in pairs
+        ]
+    ).reshape(-1, 2)
+    calendar = ~topical[:, 0] & ~topical[:, 1]
+    semantic = topical[:, 0] & topical[:, 1]
+    same_answer = np.array([bool(p["same_answer"]) for p in pairs])
+
+    results = {}
+    for threshold in thresholds:
+        hits = same_bucket & (calendar | (semantic & (similarities >= threshold)))
+        false_hits = hits & ~same_answer
+        results[str(threshold)] = {
+            "paraphrase_hit_rate": round(
+                float(hits[same_answer].mean()) if same_answer.any() else 0.0, 4
+            ),
+            "false_hit_rate": round(
+                float(false_hits.sum() / hits.sum()) if hits.any() else 0.0, 4
+            ),
+            "false_hits": int(false_hits.sum()),
+        }
+    return {
+        "pairs": len(pairs),
+        "similarity": {
+            "paraphrases_mean": round(float(similarities[same_answer].mean()), 4),
+            "distinct_mean": round(float(similarities[~same_answer].mean()), 4),
+        },
+        "thresholds": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Évaluation hors ligne des faux succès du cache sémantique."
+    )
+    parser.add_argument("--pairs", default=DEFAULT_PAIRS, help="Paires annotées (JSON)")
+    parser.add_argument(
+        "--thresholds", default=",".join(str(t) for t in DEFAULT_THRESHOLDS)
+    )
+    args = parser.parse_args(argv)
+
+    # pylint: disable=import-outside-toplevel
+    from src.core.vectorstore import VectorStoreManager
+
+    with open(args.pairs, "r", encoding="utf-8") as f:
+        pairs = json.load(f)
+    result = evaluate_pairs(
+        VectorStoreManager().embeddings,
+        pairs,
+        thresholds=[float(t) for t in args.thresholds.split(",")],
+    )
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -1,134 +1,624 @@
 import os
 import json
+import time
+import random
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from src.ratelimit import RateLimiter
+from src.storage import iter_records, write_records
+from src.timings import ends_after, event_sessions
 
 load_dotenv()
 
+# État OpenAgenda d'un événement publié (les autres états valent retrait)
+PUBLISHED_STATE = 2
+# États OpenAgenda : refusé, à modérer, prêt à publier, publié
+ALL_STATES = [-1, 0, 1, PUBLISHED_STATE]
+
+# Statuts HTTP transitoires pour lesquels on retente la requête
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Fin de flux d'un agenda dans la collecte concurrente
+_DONE = object()
+
+# Fichier de checkpoints partagé par les agendas synchronisés en parallèle
+_CHECKPOINT_LOCK = threading.Lock()
+
 
 class OpenAgendaCollector:
-    def __init__(self, api_key=None, agenda_uid=None):
+    def __init__(self, api_key=None, agenda_uid=None, rate_limiter=None):
         self.api_key = api_key or os.getenv("OPENAGENDA_API_KEY")
-        self.agenda_uid = agenda_uid or os.getenv("OPENAGENDA_AGENDA_UID", "826334")
-        self.base_url = "https://openagenda.com/agendas"
+        agenda_uid = agenda_uid or os.getenv("OPENAGENDA_AGENDA_UID", "826334")
+        # Plusieurs agendas : liste ou UIDs séparés par des virgules
+        if isinstance(agenda_uid, (list, tuple)):
+            self.agenda_uids = [str(uid).strip() for uid in agenda_uid]
+        else:
+            self.agenda_uids = [
+                uid.strip() for uid in str(agenda_uid).split(",") if uid.strip()
+            ]
+        self.agenda_uid = self.agenda_uids[0]
+        self.max_workers = int(os.getenv("OPENAGENDA_MAX_WORKERS", "8"))
+        self.rate_limiter = rate_limiter or RateLimiter(
+            float(os.getenv("OPENAGENDA_MAX_RPS", "5"))
+        )
+        self.agenda_errors = {}
+        # Surchargeables pour pointer vers un serveur de substitution (benchmarks)
+        self.base_url = os.getenv(
+            "OPENAGENDA_BASE_URL", "https://openagenda.com/agendas"
+        )
+        self.api_url = os.getenv("OPENAGENDA_API_URL", "https://api.openagenda.com/v2")
+        self.page_size = 100
+        self.max_retries = int(os.getenv("OPENAGENDA_MAX_RETRIES", "4"))
+        self.backoff_factor = 0.5
+        self.max_backoff = 30
 
-    def fetch_events(self):
+        # Session poolée : réutilisation des connexions keep-alive entre pages
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.http_stats = {
+            "requests": 0,
+            "retries": 0,
+            "not_modified": 0,
+            "bytes_downloaded": 0,
+            "bytes_saved": 0,
+        }
+        # Validateurs HTTP (ETag/Last-Modified) du dernier export legacy
+        self.validators = {}
+        self.not_modified = False
+
+    def _mock_events(self):
+        """Événement factice pour la CI/Tests (MOCK_DATA=true)."""
+        print("⚠️ Mode Mock activé : Génération d'événements factices.")
+        now = datetime.now(timezone.utc)
+        return [
+            {
+                "uid": 999999,
+                "title": {"fr": "Atelier Cuisine Sauvage Mock"},
+                "description": {"fr": "Un événement factice pour les tests."},
+                "location": {
+                    "name": "Bois de Vincennes",
+                    "address": "Paris",
+                    "city": "Paris",
+                    "postalCode": "75012",
+                },
+                "timings": [
+                    {
+                        "begin": now.isoformat(),
+                        "end": (now + timedelta(days=1)).isoformat(),
+                    }
+                ],
+                "keywords": {"fr": ["cuisine", "sauvage"]},
+                "canonicalUrl": "http://mock.url",
+            }
+        ]
+
+    def _retry_delay(self, attempt, response=None):
+        """Delay before a retry: Retry-After if provided, else full-jitter backoff."""
+        retry_after = (
+            response.headers.get("Retry-After") if response is not None else None
+        )
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                try:
+                    retry_date = parsedate_to_datetime(retry_after)
+                    delay = (retry_date - datetime.now(timezone.utc)).total_seconds()
+                    return min(max(delay, 0), self.max_backoff)
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff_factor * 2**attempt)
+        )
+
+    def _get(self, url, params=None, headers=None):
+        """GET through the pooled session, retrying 429/5xx and network errors."""
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait()
+            self.http_stats["requests"] += 1
+            try:
+                response = self.session.get(
+                    url, params=params, headers=headers, timeout=10
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                self.http_stats["retries"] += 1
+                time.sleep(self._retry_delay(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self.http_stats["retries"] += 1
+                time.sleep(self._retry_delay(attempt, response))
+                continue
+
+            self.http_stats["bytes_downloaded"] += len(response.content or b"")
+            return response
+        return response
+
+    def iter_events(self, updated_since=None, validators=None):
+        """
+        Yield events from OpenAgenda, tagged with their source 'agenda_uid'.
+        Several agendas are fetched concurrently (see _iter_many_events);
+        'updated_since' and 'validators' only apply to a single agenda.
         """
-        Fetch events from OpenAgenda.
-        Uses legacy JSON export if no API key is provided for public agendas.
+        if len(self.agenda_uids) > 1:
+            yield from self._iter_many_events()
+            return
+
+        for event in self._iter_agenda_events(updated_since, validators):
+            event["agenda_uid"] = self.agenda_uid
+            yield event
+
+    def _for_agenda(self, agenda_uid):
+        """Single-agenda collector sharing the API key and the global rate limit."""
+        return OpenAgendaCollector(
+            api_key=self.api_key,
+            agenda_uid=str(agenda_uid),
+            rate_limiter=self.rate_limiter,
+        )
+
+    def _merge_http_stats(self, collector):
+        for key, value in collector.http_stats.items():
+            self.http_stats[key] += value
+
+    def _iter_many_events(self):
         """
+        Fetch every agenda in a bounded thread pool and yield events as they
+        arrive through a bounded queue. A failing agenda is recorded in
+        self.agenda_errors without interrupting the others.
+        """
+        events_queue = queue.Queue(maxsize=self.page_size * 4)
+        collectors = {uid: self._for_agenda(uid) for uid in self.agenda_uids}
+        stop = threading.Event()
+
+        def worker(agenda_uid, collector):
+            try:
+                for event in collector.iter_events():
+                    if stop.is_set():
+                        return
+                    events_queue.put(event)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self.agenda_errors[agenda_uid] = str(e)
+                print(f"❌ Agenda {agenda_uid} : {e}")
+            finally:
+                events_queue.put(_DONE)
+
+        workers = min(self.max_workers, len(collectors))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for agenda_uid, collector in collectors.items():
+                pool.submit(worker, agenda_uid, collector)
+            try:
+                remaining = len(collectors)
+                while remaining:
+                    item = events_queue.get()
+                    if item is _DONE:
+                        remaining -= 1
+                    else:
+                        yield item
+            finally:
+                # Consommateur interrompu : on libère les workers bloqués
+                stop.set()
+                while not events_queue.empty():
+                    events_queue.get_nowait()
+
+        for collector in collectors.values():
+            self._merge_http_stats(collector)
+
+    def _iter_agenda_events(self, updated_since=None, validators=None):
+        """
+        Yield events of self.agenda_uid from OpenAgenda page by page.
+        With an API key, follows the v2 'after' cursor until the agenda is
+        exhausted; otherwise reads the legacy JSON export of public agendas.
+        If 'updated_since' (ISO date) is given, only events modified since then
+        are requested, in every state and including events removed from the
+        agenda, so unpublications and deletions can be applied.
+        'validators' (etag/last_modified of a previous legacy export) make the
+        legacy download conditional: on 304, nothing is yielded and
+        self.not_modified is set.
+        """
+        self.not_modified = False
+
         # Mode Mock pour la CI/Tests (si activé)
         if os.getenv("MOCK_DATA") == "true":
-            print("⚠️ Mode Mock activé : Génération d'événements factices.")
-            now = datetime.now(timezone.utc)
-            return [
-                {
-                    "uid": 999999,
-                    "title": {"fr": "Atelier Cuisine Sauvage Mock"},
-                    "description": {"fr": "Un événement factice pour les tests."},
-                    "location": {
-                        "name": "Bois de Vincennes",
-                        "address": "Paris",
-                        "city": "Paris",
-                        "postalCode": "75012",
-                    },
-                    "timings": [
-                        {
-                            "begin": now.isoformat(),
-                            "end": (now + timedelta(days=1)).isoformat(),
-                        }
-                    ],
-                    "keywords": {"fr": ["cuisine", "sauvage"]},
-                    "canonicalUrl": "http://mock.url",
-                }
-            ]
+            yield from self._mock_events()
+            return
 
-        if self.api_key:
-            # V2 API
-            url = f"https://api.openagenda.com/v2/agendas/{self.agenda_uid}/events"
-            params = {
-                "key": self.api_key,
-                "includeFields[]": [
-                    "uid",
-                    "title",
-                    "description",
-                    "longDescription",
-                    "location",
-                    "timings",
-                    "keywords",
-                    "canonicalUrl",
-                    "range",
-                ],
-                "relative[]": ["current", "upcoming"],
-                "limit": 100,
-            }
-            response = requests.get(url, params=params, timeout=10)
-        else:
+        if not self.api_key:
             # Legacy JSON export (public)
             url = f"{self.base_url}/{self.agenda_uid}/events.json"
-            response = requests.get(url, timeout=10)
+            headers = {}
+            if validators and validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators and validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+            response = self._get(url, headers=headers)
+            if response.status_code == 304:
+                self.not_modified = True
+                self.http_stats["not_modified"] += 1
+                self.http_stats["bytes_saved"] += (validators or {}).get(
+                    "content_length", 0
+                )
+                return
+
+            response.raise_for_status()
+            self.validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "content_length": len(response.content or b""),
+            }
+            yield from response.json().get("events", [])
+            return
+
+        # V2 API : pagination par curseur 'after'
+        url = f"{self.api_url}/agendas/{self.agenda_uid}/events"
+        params = {
+            "key": self.api_key,
+            "includeFields[]": [
+                "uid",
+                "title",
+                "description",
+                "longDescription",
+                "location",
+                "timings",
+                "keywords",
+                "canonicalUrl",
+                "range",
+                "updatedAt",
+                "state",
+            ],
+            "relative[]": ["current", "upcoming"],
+            "limit": self.page_size,
+        }
+        if updated_since:
+            # Delta : tout événement modifié depuis le checkpoint, passé ou non
+            del params["relative[]"]
+            params["updatedAt[gte]"] = updated_since
+            params["sort"] = "updatedAt.asc"
+            # Par défaut l'API ne renvoie que les événements publiés : sans
+            # ces filtres, dépublications et retraits n'arriveraient jamais
+            params["state[]"] = ALL_STATES
+            params["removed"] = "true"
+            params["includeFields[]"] = params["includeFields[]"] + ["removed"]
+        after = None
+        while True:
+            page_params = dict(params)
+            if after:
+                page_params["after[]"] = after
+            response = self._get(url, params=page_params)
+            response.raise_for_status()
+            data = response.json()
+
+            events = data.get("events", [])
+            yield from events
+
+            after = data.get("after")
+            # Dernière page : plus de curseur ou page vide
+            if not after or not events:
+                break
+
+    def fetch_events(self):
+        """
+        Fetch all events from OpenAgenda as a list.
+        Prefer iter_events() for large agendas to keep memory flat.
+        """
+        return list(self.iter_events())
 
-        response.raise_for_status()
-        data = response.json()
-        return data.get("events", [])
+    def iter_recent_events(self, events, days=365):
+        """
+        Lazily filter an event stream, keeping events that occurred within the
+        last 'days' days or are in the future.
+        """
+        cutoff_ts = (datetime.now(timezone.utc) - timedelta(days=days)).timestamp()
+        kept = 0
+        total = 0
+
+        for event in events:
+            total += 1
+            if ends_after(event_sessions(event), cutoff_ts):
+                kept += 1
+                yield event
+
+        print(
+            f"✅ Filtrage temporel activé ({days} jours) : "
+            f"{kept}/{total} événements conservés."
+        )
 
     def filter_recent_events(self, events, days=365):
         """
         Filter events that occurred within the last 'days' days or are in the future.
+        Accepts any iterable, including the iter_events() stream.
         """
-        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
-        filtered_events = []
+        return list(self.iter_recent_events(events, days=days))
 
-        for event in events:
-            timings = event.get("timings", [])
-            if not timings:
-                continue
+    def save_to_json(self, events, filename="data/raw_events.json"):
+        """
+        Stream events (list or stream) to the raw store as NDJSON, atomically.
+        A .gz or .zst suffix on 'filename' compresses the store.
+        """
+        count = write_records(filename, events)
+        print(f"Saved {count} events to {filename}")
+        return count
 
-            is_recent = False
-            for timing in timings:
+    @staticmethod
+    def _checkpoint_path(filename):
+        return os.path.join(os.path.dirname(filename), "sync_checkpoint.json")
+
+    def load_checkpoint(self, filename="data/raw_events.json"):
+        """Return the sync checkpoint of this agenda, or None."""
+        path = self._checkpoint_path(filename)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f).get(str(self.agenda_uid))
+        except (ValueError, OSError):
+            return None
+
+    def save_checkpoint(self, filename="data/raw_events.json", **fields):
+        """
+        Persist the sync state of this agenda (last seen 'updatedAt', HTTP
+        validators...) next to the raw store.
+        """
+        path = self._checkpoint_path(filename)
+        # Lecture-modification-écriture sérialisée : sans verrou, les
+        # agendas de _sync_many s'écrasent mutuellement leurs checkpoints
+        with _CHECKPOINT_LOCK:
+            checkpoints = {}
+            if os.path.exists(path):
                 try:
-                    end_str = timing.get("end")
-                    if not end_str:
-                        continue
-
-                    # Handle Z for UTC if present (Python 3.10 compatibility)
-                    end_str = end_str.replace("Z", "+00:00")
-                    end_date = datetime.fromisoformat(end_str)
-
-                    # Ensure comparison is timezone-aware
-                    if end_date.tzinfo is None:
-                        end_date = end_date.replace(tzinfo=timezone.utc)
-
-                    if end_date >= cutoff_date:
-                        is_recent = True
-                        break
-                except (ValueError, TypeError):
+                    with open(path, "r", encoding="utf-8") as f:
+                        checkpoints = json.load(f)
+                except (ValueError, OSError):
+                    checkpoints = {}
+
+            entry = checkpoints.get(str(self.agenda_uid), {})
+            entry.update(fields)
+            entry["synced_at"] = datetime.now(timezone.utc).isoformat()
+            checkpoints[str(self.agenda_uid)] = entry
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(checkpoints, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, path)
+
+    @staticmethod
+    def _track_updated_at(events, tracker):
+        """
+        Pass events through while recording the greatest 'updatedAt' seen and
+        the uids of the events carrying it.
+        """
+        for event in events:
+            updated_at = event.get("updatedAt")
+            if updated_at:
+                if tracker["updatedAt"] is None or updated_at > tracker["updatedAt"]:
+                    tracker["updatedAt"] = updated_at
+                    tracker["uids"] = set()
+                if updated_at == tracker["updatedAt"]:
+                    tracker["uids"].add(str(event.get("uid")))
+            yield event
+
+    @staticmethod
+    def _already_synced(event, since, uids):
+        """
+        True for an event the previous sync already stored: 'updatedAt[gte]'
+        returns again the events modified exactly at the checkpoint.
+        """
+        updated_at = event.get("updatedAt")
+        if not updated_at:
+            return False
+        return updated_at < since or (
+            updated_at == since and str(event.get("uid")) in uids
+        )
+
+    @staticmethod
+    def _merge_delta(changes, filename):
+        """Yield the local raw store with the delta applied (upserts/deletions)."""
+        for event in iter_records(filename):
+            uid = event.get("uid")
+            if uid in changes:
+                changed = changes.pop(uid)
+                if changed is not None:
+                    yield changed
+            else:
+                yield event
+
+        # Nouveaux événements absents du store local
+        yield from (event for event in changes.values() if event is not None)
+
+    def sync(self, filename="data/raw_events.json", days=365, full=False):
+        """
+        Synchronise the local raw store with OpenAgenda.
+        Uses a delta request (events updated since the last checkpoint) when a
+        checkpoint and a raw store exist, otherwise falls back to a full crawl.
+        Returns stats whose mode is "not_modified" when the raw store is left
+        untouched, so callers can skip the process/index steps.
+        """
+        if len(self.agenda_uids) > 1:
+            return self._sync_many(filename, days=days, full=full)
+
+        checkpoint = None if full else self.load_checkpoint(filename)
+        tracker = {
+            "updatedAt": checkpoint.get("updatedAt") if checkpoint else None,
+            "uids": set(checkpoint.get("updatedAt_uids", [])) if checkpoint else set(),
+        }
+
+        can_delta = (
+            tracker["updatedAt"]
+            and self.api_key
+            and os.path.exists(filename)
+            and os.getenv("MOCK_DATA") != "true"
+        )
+
+        if not can_delta:
+            validators = checkpoint if os.path.exists(filename) else None
+            events = self.iter_events(validators=validators)
+
+            # On amorce le flux : un 304 ne doit pas écraser le store local
+            first = next(events, None)
+            if self.not_modified:
+                return self._unchanged_stats("Export OpenAgenda inchangé (304)")
+            if first is not None:
+                events = itertools.chain([first], events)
+
+            stream = self._track_updated_at(events, tracker)
+            total = self.save_to_json(
+                self.iter_recent_events(stream, days=days), filename=filename
+            )
+            stats = {"mode": "full", "changed": total, "deleted": 0, "total": total}
+        else:
+            changes = {}
+            since, synced_uids = tracker["updatedAt"], set(tracker["uids"])
+            stream = self._track_updated_at(
+                self.iter_events(updated_since=since), tracker
+            )
+            for event in stream:
+                if self._already_synced(event, since, synced_uids):
                     continue
+                published = event.get(
+                    "state", PUBLISHED_STATE
+                ) == PUBLISHED_STATE and not event.get("removed")
+                changes[event.get("uid")] = event if published else None
 
-            if is_recent:
-                filtered_events.append(event)
+            if not changes:
+                return self._unchanged_stats("Aucun changement OpenAgenda")
 
-        print(
-            f"✅ Filtrage temporel activé ({days} jours) : "
-            f"{len(filtered_events)}/{len(events)} événements conservés."
+            deleted = sum(1 for event in changes.values() if event is None)
+            changed = len(changes) - deleted
+            print(
+                f"🔄 Delta OpenAgenda : {changed} modifiés, "
+                f"{deleted} supprimés depuis {checkpoint['updatedAt']}."
+            )
+
+            # Écriture atomique : le store courant est relu pendant la fusion
+            total = self.save_to_json(
+                self.iter_recent_events(
+                    self._merge_delta(changes, filename), days=days
+                ),
+                filename=filename,
+            )
+            stats = {
+                "mode": "delta",
+                "changed": changed,
+                "deleted": deleted,
+                "total": total,
+            }
+
+        fields = dict(self.validators)
+        if tracker["updatedAt"]:
+            fields["updatedAt"] = tracker["updatedAt"]
+            fields["updatedAt_uids"] = sorted(tracker["uids"])
+        if fields:
+            self.save_checkpoint(filename, **fields)
+
+        stats["http"] = dict(self.http_stats)
+        return stats
+
+    @staticmethod
+    def _agenda_store(filename, agenda_uid):
+        """Per-agenda raw store (with its own checkpoints) used by _sync_many."""
+        name, _, ext = os.path.basename(filename).partition(".")
+        return os.path.join(
+            os.path.dirname(filename), "agendas", f"{name}_{agenda_uid}.{ext}"
         )
-        return filtered_events
 
-    def save_to_json(self, events, filename="data/raw_events.json"):
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(events, f, ensure_ascii=False, indent=4)
-        print(f"Saved {len(events)} events to {filename}")
+    def _sync_many(self, filename, days=365, full=False):
+        """
+        Synchronise every agenda concurrently into its own store, then merge
+        them into 'filename'. Wall-clock time follows the slowest agenda; an
+        agenda in error keeps its previous store and does not block the others.
+        """
+        collectors = {uid: self._for_agenda(uid) for uid in self.agenda_uids}
+        results = {}
+
+        workers = min(self.max_workers, len(collectors))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(
+                    collector.sync,
+                    self._agenda_store(filename, uid),
+                    days=days,
+                    full=full,
+                ): uid
+                for uid, collector in collectors.items()
+            }
+            for future in as_completed(futures):
+                uid = futures[future]
+                try:
+                    results[uid] = future.result()
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    self.agenda_errors[uid] = str(e)
+                    print(f"❌ Agenda {uid} : {e}")
+
+        for collector in collectors.values():
+            self._merge_http_stats(collector)
+
+        unchanged = all(
+            results.get(uid, {}).get("mode") == "not_modified"
+            for uid in self.agenda_uids
+            if uid not in self.agenda_errors
+        )
+        if unchanged and os.path.exists(filename):
+            stats = self._unchanged_stats("Aucun agenda modifié")
+            stats["agendas"] = results
+            stats["errors"] = dict(self.agenda_errors)
+            return stats
+
+        total = self.save_to_json(self._iter_agenda_stores(filename), filename)
+
+        return {
+            "mode": "multi",
+            "changed": sum(r.get("changed", 0) for r in results.values()),
+            "deleted": sum(r.get("deleted", 0) for r in results.values()),
+            "total": total,
+            "agendas": results,
+            "errors": dict(self.agenda_errors),
+            "http": dict(self.http_stats),
+        }
+
+    def _iter_agenda_stores(self, filename):
+        """Stream the per-agenda stores, keeping the first copy of shared events."""
+        seen = set()
+        for uid in self.agenda_uids:
+            store = self._agenda_store(filename, uid)
+            if not os.path.exists(store):
+                continue
+            for event in iter_records(store):
+                if event.get("uid") in seen:
+                    continue
+                seen.add(event.get("uid"))
+                event.setdefault("agenda_uid", uid)
+                yield event
+
+    def _unchanged_stats(self, reason):
+        print(
+            f"✅ {reason} : store local conservé "
+            f"({self.http_stats['bytes_saved']} octets économisés)."
+        )
+        return {
+            "mode": "not_modified",
+            "changed": 0,
+            "deleted": 0,
+            "total": None,
+            "http": dict(self.http_stats),
+        }
 
 
 if __name__ == "__main__":
     collector = OpenAgendaCollector()
-    print(f"Fetching events for agenda {collector.agenda_uid}...")
+    print(f"Fetching events for agendas {', '.join(collector.agenda_uids)}...")
     try:
-        all_events = collector.fetch_events()
-        print(f"Found {len(all_events)} total events.")
-        recent_events = collector.filter_recent_events(all_events)
-        collector.save_to_json(recent_events)
+        print(collector.sync())
     except Exception as e:
         print(f"Error: {e}")
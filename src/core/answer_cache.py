@@ -0,0 +1,242 @@
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+import numpy as np
+
+
+def normalize_question(question):
+    """Lowercase, collapse spaces and drop surrounding punctuation."""
+    question = re.sub(r"\s+", " ", question.strip().lower())
+    return question.strip(" ?!.,;:")
+
+
+def date_bucket(date_context, today=None):
+    """
+    Cache bucket of a resolved date_context: its type and bounds, plus the
+    current day, so answers to relative dates ("demain", "ce week-end")
+    expire at midnight. Open ranges starting "now" are bucketed by day.
+    """
+    today = today or datetime.now().date()
+    kind = date_context.get("type", "")
+    if kind in ("greeting", "any_future"):
+        return f"{today.isoformat()}|{kind}"
+    return (
+        f"{today.isoformat()}|{kind}|"
+        f"{date_context.get('start_ts')}|{date_context.get('end_ts')}"
+    )
+
+
+class AnswerCache:
+    """
+    Bounded in-memory LRU of final answers, with a TTL. Keys combine the
+    normalized question, the date bucket, a hash of the prompt (and model)
+    and the index version; entries of a previous index are dropped as soon
+    as a chain bound to a new index version uses the cache.
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.index_version = None
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @classmethod
+    def from_env(cls):
+        """Build the cache from the ANSWER_CACHE_* environment variables."""
+        return cls(
+            max_entries=int(os.getenv("ANSWER_CACHE_SIZE", "1024")),
+            ttl=float(os.getenv("ANSWER_CACHE_TTL", "3600")),
+        )
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def summary(self):
+        with self._lock:
+            return {
+                **self.stats,
+                "hit_rate": self.hit_rate,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "index_version": self.index_version,
+            }
+
+    @staticmethod
+    def key(question, bucket, prompt_hash, index_version):
+        payload = (
+            f"{normalize_question(question)}\0{bucket}\0{prompt_hash}\0{index_version}"
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def bind(self, index_version):
+        """Attach the cache to an index version, dropping older answers."""
+        with self._lock:
+            if index_version != self.index_version:
+                if self._entries:
+                    self.stats["invalidations"] += 1
+                self._entries.clear()
+                self.index_version = index_version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[0]
+
+    def put(self, key, answer):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (answer, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SemanticAnswerCache:
+    """
+    Second-level answer cache for paraphrases: a small in-memory vector
+    index of (normalized query embedding, date bucket, answer). A query hits
+    when a cached query of the same date bucket is at least 'threshold'
+    cosine-similar. Bounded (least recently used slot is reused), with a
+    TTL, and emptied when bound to a new index version.
+    """
+
+    def __init__(self, max_entries=512, threshold=0.95, ttl=3600):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+        self.index_version = None
+        self._lock = threading.RLock()
+        self._clear()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @classmethod
+    def from_env(cls):
+        """Build the cache from the SEMANTIC_CACHE_* environment variables."""
+        return cls(
+            max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", "512")),
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+            ttl=float(os.getenv("SEMANTIC_CACHE_TTL", "3600")),
+        )
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def __len__(self):
+        return self._size
+
+    def summary(self):
+        with self._lock:
+            return {
+                **self.stats,
+                "hit_rate": self.hit_rate,
+                "size": self._size,
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+            }
+
+    def _clear(self):
+        self._vectors = None
+        self._size = 0
+        self._buckets = np.empty(self.max_entries, dtype=object)
+        self._answers = [None] * self.max_entries
+        self._created = np.zeros(self.max_entries)
+        self._used = np.zeros(self.max_entries)
+
+    def bind(self, index_version):
+        """Attach the cache to an index version, dropping older answers."""
+        with self._lock:
+            if index_version != self.index_version:
+                if self._size:
+                    self.stats["invalidations"] += 1
+                self._clear()
+                self.index_version = index_version
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def _best(self, vector, bucket, now):
+        """(slot, similarity) of the closest live entry of 'bucket', or None."""
+        if not self._size:
+            return None
+        live = (self._buckets[: self._size] == bucket) & (
+            now - self._created[: self._size] <= self.ttl
+        )
+        slots = np.flatnonzero(live)
+        if not len(slots):
+            return None
+        similarities = self._vectors[slots] @ vector
+        best = int(np.argmax(similarities))
+        return int(slots[best]), float(similarities[best])
+
+    def get(self, vector, bucket):
+        with self._lock:
+            now = time.monotonic()
+            found = self._best(self._normalize(vector), bucket, now)
+            if found is None or found[1] < self.threshold:
+                self.stats["misses"] += 1
+                return None
+            self._used[found[0]] = now
+            self.stats["hits"] += 1
+            return self._answers[found[0]]
+
+    def put(self, vector, bucket, answer):
+        if not self.enabled:
+            return
+        vector = self._normalize(vector)
+        with self._lock:
+            now = time.monotonic()
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, len(vector)), np.float32)
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                # Entrée expirée ou, à défaut, la moins récemment utilisée
+                expired = now - self._created > self.ttl
+                slot = (
+                    int(np.argmax(expired))
+                    if expired.any()
+                    else int(np.argmin(self._used))
+                )
+            self._vectors[slot] = vector
+            self._buckets[slot] = bucket
+            self._answers[slot] = answer
+            self._created[slot] = now
+            self._used[slot] = now
@@ -0,0 +1,267 @@
+import os
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper caching vectors by (model id, text hash).
+    A bounded in-memory LRU sits in front of an SQLite store on disk; the
+    disk store is evicted by size (least recently used) and by age (TTL).
+    Vectors are kept as float32 arrays, in memory and on disk (FAISS
+    precision), and only turned into lists when returned.
+    Documents and queries are cached separately, as some models embed them
+    differently; 'query_as_document' states that the wrapped model does not,
+    so that several queries can be embedded in one embed_documents call.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        model_id,
+        path="data/embedding_cache.sqlite",
+        memory_size=10_000,
+        max_entries=200_000,
+        ttl=30 * 24 * 3600,
+        query_as_document=False,
+    ):
+        self.embeddings = embeddings
+        self.model_id = model_id
+        self.query_as_document = query_as_document
+        self.path = path
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._memory = OrderedDict()
+        # SQLite d'un côté, LRU de l'autre : un hit mémoire n'attend jamais le disque
+        self._lock = threading.RLock()
+        self._memory_lock = threading.Lock()
+        self._connection = None
+        self._writes_since_eviction = 0
+        self.stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    @classmethod
+    def from_env(cls, embeddings, model_id, query_as_document=False):
+        """Build the cache from the EMBEDDING_CACHE_* environment variables."""
+        return cls(
+            embeddings,
+            model_id,
+            query_as_document=query_as_document,
+            path=os.getenv("EMBEDDING_CACHE_PATH", "data/embedding_cache.sqlite"),
+            memory_size=int(os.getenv("EMBEDDING_CACHE_MEMORY_SIZE", "10000")),
+            max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000")),
+            ttl=float(os.getenv("EMBEDDING_CACHE_TTL", str(30 * 24 * 3600))),
+        )
+
+    @property
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def _key(self, kind, text):
+        # "f32" : les entrées float64 d'avant ne sont plus lues, l'éviction les purge
+        payload = f"{self.model_id}\0{kind}\0f32\0{text}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def _db(self):
+        """Open the SQLite store lazily (no file is created until first use)."""
+        if not self.path:
+            return None
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB, created REAL, accessed REAL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_accessed "
+                "ON embeddings (accessed)"
+            )
+        return self._connection
+
+    def _remember(self, key, vector, created):
+        with self._memory_lock:
+            # Date de création conservée : même TTL qu'en base
+            self._memory[key] = (vector, created)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _memory_lookup(self, keys, count=True):
+        """Return ({key: vector} found in memory, keys missing from memory)."""
+        found = {}
+        missing = []
+        now = time.time()
+        with self._memory_lock:
+            for key in keys:
+                entry = self._memory.get(key)
+                if entry is not None and now - entry[1] > self.ttl:
+                    del self._memory[key]
+                    entry = None
+                if entry is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = entry[0]
+                    self.stats["memory_hits"] += count
+                else:
+                    missing.append(key)
+        return found, missing
+
+    def _disk_lookup(self, keys, count=True):
+        """Return {key: vector} for keys found on disk (remembered in memory)."""
+        found = {}
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            if db is None or not keys:
+                return found
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = db.execute(
+                    "SELECT key, vector, created FROM embeddings "
+                    f"WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                fresh = [
+                    (key, blob, created)
+                    for key, blob, created in rows
+                    if now - created <= self.ttl
+                ]
+                for key, blob, created in fresh:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    found[key] = vector
+                    self._remember(key, vector, created)
+                    self.stats["disk_hits"] += count
+                db.executemany(
+                    "UPDATE embeddings SET accessed = ? WHERE key = ?",
+                    [(now, key) for key, _, _ in fresh],
+                )
+            db.commit()
+        return found
+
+    def _lookup(self, keys, count=True):
+        """Return {key: vector} for cached keys (memory first, then disk)."""
+        found, missing = self._memory_lookup(keys, count)
+        found.update(self._disk_lookup(missing, count))
+        return found
+
+    def _persist(self, items, now):
+        with self._lock:
+            db = self._db()
+            if db is None or not items:
+                return
+            db.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)",
+                [(key, vector.tobytes(), now, now) for key, vector in items],
+            )
+            self._writes_since_eviction += len(items)
+            # Éviction amortie : une passe toutes les 1000 écritures au plus
+            if self._writes_since_eviction >= min(1000, self.max_entries):
+                self.evict()
+            db.commit()
+
+    def _store(self, items):
+        now = time.time()
+        for key, vector in items:
+            self._remember(key, vector, now)
+        self._persist(items, now)
+
+    def evict(self):
+        """Drop expired entries, then the least recently used beyond max_entries."""
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return
+            db.execute(
+                "DELETE FROM embeddings WHERE created < ?", (time.time() - self.ttl,)
+            )
+            db.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings "
+                "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            db.commit()
+            self._writes_since_eviction = 0
+
+    def _embed(self, kind, texts, compute):
+        keys = [self._key(kind, text) for text in texts]
+        found = self._lookup(list(dict.fromkeys(keys)))
+
+        # Les textes absents (dédoublonnés) partent en un seul appel au modèle
+        todo = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                todo.setdefault(key, text)
+        self.stats["hits"] += len(keys) - sum(1 for key in keys if key in todo)
+        self.stats["misses"] += sum(1 for key in keys if key in todo)
+
+        if todo:
+            vectors = compute(list(todo.values()))
+            computed = [
+                (key, np.asarray(vector, dtype=np.float32))
+                for key, vector in zip(todo.keys(), vectors)
+            ]
+            self._store(computed)
+            found.update(computed)
+
+        return [found[key].tolist() for key in keys]
+
+    def uncached(self, texts):
+        """Documents among 'texts' that are not cached yet (stats unchanged)."""
+        keys = [self._key("doc", text) for text in texts]
+        found = self._lookup(list(dict.fromkeys(keys)), count=False)
+        return [text for key, text in zip(keys, texts) if key not in found]
+
+    def embed_documents(self, texts):
+        return self._embed("doc", texts, self.embeddings.embed_documents)
+
+    def embed_query(self, text):
+        return self._embed(
+            "query", [text], lambda texts: [self.embeddings.embed_query(texts[0])]
+        )[0]
+
+    def embed_queries(self, texts):
+        """
+        Query embeddings of several questions. The uncached ones go in a
+        single model call when queries embed like documents, otherwise
+        through the model's query path one by one.
+        """
+        if self.query_as_document:
+            return self._embed("query", texts, self.embeddings.embed_documents)
+        return self._embed(
+            "query",
+            texts,
+            lambda texts: [self.embeddings.embed_query(text) for text in texts],
+        )
+
+    async def aembed_query(self, text):
+        """
+        embed_query for the event loop: only the in-memory LRU is read on the
+        loop; the SQLite lookup and insert run in a worker thread, and only a
+        cache miss awaits the model.
+        """
+        key = self._key("query", text)
+        found, _ = self._memory_lookup([key])
+        if key not in found and self.path:
+            found = await asyncio.to_thread(self._disk_lookup, [key])
+        if key in found:
+            self.stats["hits"] += 1
+            return found[key].tolist()
+
+        self.stats["misses"] += 1
+        vector = np.asarray(await self.embeddings.aembed_query(text), dtype=np.float32)
+        now = time.time()
+        self._remember(key, vector, now)
+        if self.path:
+            await asyncio.to_thread(self._persist, [(key, vector)], now)
+        return vector.tolist()
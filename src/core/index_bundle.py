@@ -0,0 +1,182 @@
+import os
+import json
+import mmap
+import bisect
+from collections.abc import Mapping
+import faiss
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+# Fichiers du bundle : aucun pickle, tout est lisible en mémoire mappée
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.jsonl"
+OFFSETS_FILE = "offsets.npy"
+IDS_FILE = "ids.npy"
+IDS_ORDER_FILE = "ids_order.npy"
+# Store parent : une entrée par événement (contexte complet, sessions...)
+PARENTS = "parents"
+
+
+def _store_files(name):
+    """(documents, offsets, ids, ids order) files of a document store."""
+    if name == "docstore":
+        return DOCSTORE_FILE, OFFSETS_FILE, IDS_FILE, IDS_ORDER_FILE
+    return (
+        f"{name}.jsonl",
+        f"{name}_offsets.npy",
+        f"{name}_ids.npy",
+        f"{name}_ids_order.npy",
+    )
+
+
+def has_bundle(path):
+    return os.path.exists(os.path.join(path, DOCSTORE_FILE))
+
+
+def _write_store(path, name, ids, documents):
+    """
+    Write documents as one JSON line each with their byte offsets, and their
+    ids as a fixed-width array (plus its sort order).
+    """
+    documents_file, offsets_file, ids_file, order_file = _store_files(name)
+    offsets = [0]
+    with open(os.path.join(path, documents_file), "wb") as f:
+        for doc_id, doc in zip(ids, documents):
+            line = json.dumps(
+                {
+                    "id": doc_id,
+                    "page_content": doc.page_content,
+                    "metadata": doc.metadata,
+                },
+                ensure_ascii=False,
+            ).encode("utf-8")
+            f.write(line + b"\n")
+            offsets.append(offsets[-1] + len(line) + 1)
+
+    encoded = np.array([doc_id.encode("utf-8") for doc_id in ids], dtype=bytes)
+    np.save(os.path.join(path, offsets_file), np.asarray(offsets, dtype=np.int64))
+    np.save(os.path.join(path, ids_file), encoded)
+    np.save(os.path.join(path, order_file), np.argsort(encoded, kind="stable"))
+
+
+def save_bundle(vectorstore, path):
+    """
+    Write a LangChain FAISS vectorstore as a pickle-free bundle: the FAISS
+    index, then its documents in index order (see _write_store).
+    """
+    os.makedirs(path, exist_ok=True)
+    faiss.write_index(vectorstore.index, os.path.join(path, INDEX_FILE))
+
+    ids = [vectorstore.index_to_docstore_id[i] for i in range(vectorstore.index.ntotal)]
+    _write_store(path, "docstore", ids, (vectorstore.docstore.search(i) for i in ids))
+
+
+def save_parents(parents, path):
+    """Write the parent store ({event id: Document}) next to a bundle."""
+    os.makedirs(path, exist_ok=True)
+    _write_store(path, PARENTS, list(parents), list(parents.values()))
+
+
+def load_parents(path, writable=False):
+    """
+    Parent store of a bundle: a memory-mapped MmapDocstore, or a
+    {event id: Document} dict if 'writable'. None for older bundles.
+    """
+    if not os.path.exists(os.path.join(path, _store_files(PARENTS)[0])):
+        return None
+    store = MmapDocstore(path, PARENTS)
+    if not writable:
+        return store
+    documents = (store.document(i) for i in range(len(store)))
+    return {doc.id: doc for doc in documents}
+
+
+class _ChunkIds(Mapping):
+    """Index position -> chunk id, read lazily from the mapped ids array."""
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def __getitem__(self, position):
+        if not 0 <= position < len(self.ids):
+            raise KeyError(position)
+        return self.ids[position].decode("utf-8")
+
+    def __iter__(self):
+        return iter(range(len(self.ids)))
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class MmapDocstore(Docstore):
+    """
+    Read-only docstore over a bundle's docstore.jsonl (or another store
+    written alike, see 'name'), memory-mapped: pages are shared by every
+    process serving the same index, and a document is only parsed when a
+    search returns it.
+    """
+
+    def __init__(self, path, name="docstore"):
+        documents_file, offsets_file, ids_file, order_file = _store_files(name)
+        self.offsets = np.load(os.path.join(path, offsets_file), mmap_mode="r")
+        self.ids = np.load(os.path.join(path, ids_file), mmap_mode="r")
+        self.order = np.load(os.path.join(path, order_file), mmap_mode="r")
+        self._data = b""
+        if self.offsets[-1] > 0:
+            with open(os.path.join(path, documents_file), "rb") as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def position(self, doc_id):
+        """Index position of a chunk id (binary search), or None."""
+        key = doc_id.encode("utf-8")
+        i = bisect.bisect_left(range(len(self.order)), key, key=self._sorted_id)
+        if i < len(self.order) and self._sorted_id(i) == key:
+            return int(self.order[i])
+        return None
+
+    def _sorted_id(self, i):
+        return bytes(self.ids[self.order[i]])
+
+    def document(self, position):
+        start, end = int(self.offsets[position]), int(self.offsets[position + 1])
+        record = json.loads(self._data[start:end])
+        return Document(
+            id=record["id"],
+            page_content=record["page_content"],
+            metadata=record["metadata"],
+        )
+
+    def search(self, search):
+        position = self.position(search)
+        if position is None:
+            return f"ID {search} not found."
+        return self.document(position)
+
+
+def load_bundle(path, embeddings, mmap_flags=0, writable=False):
+    """
+    Load a bundle as a LangChain FAISS vectorstore. By default the index
+    ('mmap_flags', see IndexSpec.mmap_flags) and the documents stay memory-
+    mapped and read-only; 'writable' loads both in memory for updates.
+    """
+    if not writable:
+        index = faiss.read_index(os.path.join(path, INDEX_FILE), mmap_flags)
+        docstore = MmapDocstore(path)
+        return FAISS(embeddings, index, docstore, _ChunkIds(docstore.ids))
+
+    index = faiss.read_index(os.path.join(path, INDEX_FILE))
+    mapped = MmapDocstore(path)
+    documents = [mapped.document(i) for i in range(len(mapped))]
+    return FAISS(
+        embeddings,
+        index,
+        InMemoryDocstore({doc.id: doc for doc in documents}),
+        {i: doc.id for i, doc in enumerate(documents)},
+    )
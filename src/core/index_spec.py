@@ -0,0 +1,102 @@
+import faiss
+import numpy as np
+
+
+class IndexSpec:
+    """
+    FAISS index configuration, written as "<kind>[:param=value,...]", e.g.
+    "flat", "hnsw:m=32,ef_search=64", "ivf_flat:nlist=1024,nprobe=16" or
+    "ivf_pq:nlist=1024,m=16,nbits=8,nprobe=16".
+    """
+
+    DEFAULTS = {
+        "flat": {},
+        "hnsw": {"m": 32, "ef_construction": 40, "ef_search": 64},
+        "ivf_flat": {"nlist": 1024, "nprobe": 16},
+        "ivf_pq": {"nlist": 1024, "m": 16, "nbits": 8, "nprobe": 16},
+    }
+
+    def __init__(self, kind="flat", **params):
+        if kind not in self.DEFAULTS:
+            raise ValueError(
+                f"Unknown index type '{kind}' (expected one of {list(self.DEFAULTS)})"
+            )
+        unknown = set(params) - set(self.DEFAULTS[kind])
+        if unknown:
+            raise ValueError(f"Unknown parameters for '{kind}': {sorted(unknown)}")
+        self.kind = kind
+        self.params = {
+            **self.DEFAULTS[kind],
+            **{name: int(value) for name, value in params.items()},
+        }
+
+    @classmethod
+    def parse(cls, value):
+        """Build a spec from its string form (None = flat) or another spec."""
+        if isinstance(value, IndexSpec):
+            return value
+        kind, _, params = (value or "flat").strip().partition(":")
+        pairs = [param.split("=", 1) for param in params.split(",") if param.strip()]
+        return cls(
+            kind.strip().lower().replace("-", "_"),
+            **{name.strip(): value.strip() for name, value in pairs},
+        )
+
+    def __str__(self):
+        params = ",".join(f"{name}={value}" for name, value in self.params.items())
+        return f"{self.kind}:{params}" if params else self.kind
+
+    def __eq__(self, other):
+        return isinstance(other, IndexSpec) and str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    @property
+    def supports_removal(self):
+        """HNSW graphs cannot remove vectors: the index must be rebuilt."""
+        return self.kind != "hnsw"
+
+    @property
+    def mmap_flags(self):
+        """faiss.read_index flags mapping the index file instead of copying it."""
+        if self.kind in ("ivf_flat", "ivf_pq"):
+            return faiss.IO_FLAG_MMAP
+        return faiss.IO_FLAG_MMAP_IFC
+
+    def build(self, dim, train_vectors=None):
+        """
+        Empty FAISS index for this spec, trained on 'train_vectors' for the
+        IVF kinds. Sizes are capped to what the training set supports (small
+        corpora): ~39 points per IVF list and 2**nbits points per PQ codebook.
+        """
+        p = self.params
+        if self.kind == "flat":
+            return faiss.IndexFlatL2(dim)
+        if self.kind == "hnsw":
+            index = faiss.IndexHNSWFlat(dim, p["m"])
+            index.hnsw.efConstruction = p["ef_construction"]
+            self.configure(index)
+            return index
+
+        train = np.asarray(train_vectors, dtype=np.float32).reshape(-1, dim)
+        nlist = max(1, min(p["nlist"], len(train) // 39))
+        quantizer = faiss.IndexFlatL2(dim)
+        if self.kind == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+        else:
+            # m doit diviser la dimension
+            m = max(d for d in range(1, min(p["m"], dim) + 1) if dim % d == 0)
+            nbits = max(1, min(p["nbits"], int(np.log2(max(len(train), 2)))))
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, m, nbits)
+        index.train(train)
+        self.configure(index)
+        return index
+
+    def configure(self, index):
+        """Apply the search-time parameters (nprobe, efSearch) to an index."""
+        if self.kind == "hnsw":
+            index.hnsw.efSearch = self.params["ef_search"]
+        elif self.kind in ("ivf_flat", "ivf_pq"):
+            index.nprobe = min(self.params["nprobe"], index.nlist)
+        return index
@@ -0,0 +1,272 @@
+import os
+import re
+import unicodedata
+import numpy as np
+
+# Fichiers de l'index lexical, à côté du bundle FAISS (lus en mémoire mappée)
+VOCABULARY_FILE = "bm25_terms.npy"
+TERM_OFFSETS_FILE = "bm25_offsets.npy"
+POSTINGS_FILE = "bm25_postings.npy"
+FREQUENCIES_FILE = "bm25_freqs.npy"
+LENGTHS_FILE = "bm25_lengths.npy"
+
+# Mots outils français (sans accents, comme les tokens)
+STOPWORDS = set(
+    "a afin ai au aux avec ce ces cet cette d dans de des du elle en est et "
+    "il ils je l la le les leur leurs lui m ma mais me mes moi mon n ne nous "
+    "on ou par pas pour qu que quel quelle quelles quels qui s sa se ses si "
+    "son sont sur t ta te tes toi ton tu un une vos votre vous y "
+    # Libellés des champs de search_text, présents dans chaque chunk
+    "titre description lieu periode mots cles".split()
+)
+
+# Suffixes retirés par stem(), du plus long au plus court
+_SUFFIXES = (
+    ("issements", ""),
+    ("issement", ""),
+    ("atrices", ""),
+    ("ateurs", ""),
+    ("ations", ""),
+    ("atrice", ""),
+    ("ateur", ""),
+    ("ation", ""),
+    ("ements", ""),
+    ("ement", ""),
+    ("euses", ""),
+    ("euse", ""),
+    ("eaux", "eau"),
+    ("aux", "al"),
+    ("iques", ""),
+    ("ique", ""),
+    ("ites", ""),
+    ("ite", ""),
+    ("ives", "if"),
+    ("ive", "if"),
+    ("ifs", "if"),
+    ("elles", "el"),
+    ("elle", "el"),
+    ("es", ""),
+    ("s", ""),
+    ("x", ""),
+    ("e", ""),
+)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def fold(text):
+    """Lowercase and strip accents ("Été" -> "ete")."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def stem(word):
+    """
+    Light French stemmer: drops plural, feminine and the most common
+    derivational suffixes so that "concerts"/"concert" or
+    "expositions"/"exposition" share a term. Short words are kept as is.
+    """
+    if len(word) <= 4 or word.isdigit():
+        return word
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)] + replacement
+    return word
+
+
+def tokenize(text):
+    """Terms of a text: folded, stopwords removed, stemmed."""
+    return [
+        stem(word)
+        for word in re.findall(r"[a-z0-9]+", fold(text))
+        if word not in STOPWORDS
+    ]
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    Fuse several rankings (lists of ids, best first) by reciprocal rank:
+    score(id) = sum over rankings of 1 / (k + rank). Returns ids, best first.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda item: -scores[item])
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over the chunks of the FAISS index, documents being
+    index positions. Postings are stored compactly as flat arrays: a sorted
+    vocabulary, per-term offsets into (position, term frequency) arrays, and
+    document lengths; saved next to the index and loaded memory-mapped.
+    """
+
+    def __init__(self, terms, offsets, postings, freqs, lengths):
+        self.terms = terms
+        self.offsets = offsets
+        self.postings = postings
+        self.freqs = freqs
+        self.lengths = lengths
+        self.avg_length = float(lengths.mean()) if len(lengths) else 0.0
+
+    @classmethod
+    def from_texts(cls, texts):
+        """Build from chunk texts given in index position order."""
+        entries = {}
+        lengths = []
+        for position, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                entries.setdefault(token, []).append((position, count))
+
+        vocabulary = sorted(entries)
+        offsets = [0]
+        postings, freqs = [], []
+        for term in vocabulary:
+            for position, count in entries[term]:
+                postings.append(position)
+                freqs.append(min(count, np.iinfo(np.uint16).max))
+            offsets.append(len(postings))
+        return cls(
+            np.array([term.encode("utf-8") for term in vocabulary], dtype=bytes),
+            np.asarray(offsets, dtype=np.int64),
+            np.asarray(postings, dtype=np.int32),
+            np.asarray(freqs, dtype=np.uint16),
+            np.asarray(lengths, dtype=np.int32),
+        )
+
+    def updated(self, remap, texts):
+        """
+        Index after an in-place update of the FAISS index: 'remap' gives the
+        new position of each current position (-1 if the chunk was removed)
+        and 'texts' the {new position: text} of the added chunks. Postings of
+        the kept chunks are moved as is; only the added texts are tokenized.
+        """
+        remap = np.asarray(remap, dtype=np.int64)
+        size = int(max(remap.max(initial=-1), max(texts, default=-1))) + 1
+        term_ids = np.repeat(np.arange(len(self.terms)), np.diff(self.offsets))
+        positions = remap[self.postings] if len(remap) else np.empty(0, np.int64)
+        kept = positions >= 0
+
+        lengths = np.zeros(size, dtype=np.int32)
+        moved = remap >= 0
+        lengths[remap[moved]] = self.lengths[moved]
+        added_terms, added_positions, added_freqs = [], [], []
+        for position, text in texts.items():
+            tokens = tokenize(text)
+            lengths[position] = len(tokens)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                added_terms.append(token.encode("utf-8"))
+                added_positions.append(position)
+                added_freqs.append(min(count, np.iinfo(np.uint16).max))
+
+        old_terms = np.asarray(self.terms)
+        added_terms = np.array(added_terms, dtype=bytes)
+        vocabulary = np.unique(np.concatenate([old_terms, added_terms]))
+        term_ids = np.concatenate(
+            [
+                np.searchsorted(vocabulary, old_terms)[term_ids[kept]],
+                np.searchsorted(vocabulary, added_terms),
+            ]
+        )
+        positions = np.concatenate(
+            [positions[kept], np.asarray(added_positions, dtype=np.int64)]
+        )
+        freqs = np.concatenate(
+            [self.freqs[kept], np.asarray(added_freqs, dtype=np.uint16)]
+        )
+        order = np.lexsort((positions, term_ids))
+        counts = np.bincount(term_ids, minlength=len(vocabulary))
+        used = counts > 0
+        return LexicalIndex(
+            vocabulary[used],
+            np.concatenate([[0], np.cumsum(counts[used])]).astype(np.int64),
+            positions[order].astype(np.int32),
+            freqs[order].astype(np.uint16),
+            lengths,
+        )
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore):
+        return cls.from_texts(
+            vectorstore.docstore.search(
+                vectorstore.index_to_docstore_id[i]
+            ).page_content
+            for i in range(vectorstore.index.ntotal)
+        )
+
+    def save(self, path):
+        np.save(os.path.join(path, VOCABULARY_FILE), self.terms)
+        np.save(os.path.join(path, TERM_OFFSETS_FILE), self.offsets)
+        np.save(os.path.join(path, POSTINGS_FILE), self.postings)
+        np.save(os.path.join(path, FREQUENCIES_FILE), self.freqs)
+        np.save(os.path.join(path, LENGTHS_FILE), self.lengths)
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved lexical index (memory-mapped), or None if there is none."""
+        files = (
+            VOCABULARY_FILE,
+            TERM_OFFSETS_FILE,
+            POSTINGS_FILE,
+            FREQUENCIES_FILE,
+            LENGTHS_FILE,
+        )
+        if not all(os.path.exists(os.path.join(path, file)) for file in files):
+            return None
+        return cls(
+            *(np.load(os.path.join(path, file), mmap_mode="r") for file in files)
+        )
+
+    def _postings(self, term):
+        key = term.encode("utf-8")
+        i = int(np.searchsorted(self.terms, key))
+        if i == len(self.terms) or self.terms[i] != key:
+            return None
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.postings[start:end], self.freqs[start:end]
+
+    def search(self, query, k, positions=None):
+        """
+        BM25 top-k index positions for 'query', best first, optionally
+        restricted to the sorted 'positions' (e.g. TimeIndex.eligible).
+        Only the postings of the query terms are read.
+        """
+        n = len(self.lengths)
+        found, weights = [], []
+        for term in set(tokenize(query)):
+            postings = self._postings(term)
+            if postings is None:
+                continue
+            docs, tf = postings
+            idf = np.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            tf = tf.astype(np.float64)
+            norm = BM25_K1 * (
+                1 - BM25_B + BM25_B * self.lengths[docs] / max(self.avg_length, 1e-9)
+            )
+            found.append(np.asarray(docs, dtype=np.int64))
+            weights.append(idf * tf * (BM25_K1 + 1) / (tf + norm))
+        if not found:
+            return []
+
+        docs, inverse = np.unique(np.concatenate(found), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(weights))
+        if positions is not None:
+            positions = np.asarray(positions, dtype=np.int64)
+            if not len(positions):
+                return []
+            slots = np.searchsorted(positions, docs).clip(max=len(positions) - 1)
+            keep = positions[slots] == docs
+            docs, scores = docs[keep], scores[keep]
+        best = np.argsort(-scores, kind="stable")[:k]
+        return docs[best].tolist()
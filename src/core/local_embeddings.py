@@ -0,0 +1,115 @@
+import os
+import weakref
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from langchain_core.embeddings import Embeddings
+
+# Modèle chargé une seule fois par processus worker
+_worker_model = None
+
+
+def _load_model(model_name):
+    # pylint: disable=import-outside-toplevel
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name)
+
+
+def _init_worker(loader, model_name, threads):
+    """Load the model once per worker and cap its intra-op threads."""
+    global _worker_model  # pylint: disable=global-statement
+    try:
+        import torch  # pylint: disable=import-outside-toplevel
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_model = loader(model_name)
+
+
+def length_sorted_batches(texts, batch_size):
+    """
+    Cut texts into batches sorted by decreasing length (little padding per
+    batch). Returns (order, batches); see restore_order().
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    batches = [
+        [texts[i] for i in order[start : start + batch_size]]
+        for start in range(0, len(order), batch_size)
+    ]
+    return order, batches
+
+
+def restore_order(order, batch_results):
+    """Vectors of length_sorted_batches() batches, back in input order."""
+    vectors = [None] * len(order)
+    sorted_vectors = (vector for batch in batch_results for vector in batch)
+    for index, vector in zip(order, sorted_vectors):
+        vectors[index] = vector
+    return vectors
+
+
+def _encode_batch(texts):
+    return _worker_model.encode(texts, batch_size=len(texts)).tolist()
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    Sentence-Transformers embeddings spread over a pool of worker processes,
+    for CPU-only index builds. Texts are sorted by length before being cut
+    into batches, so each batch pads to a similar length; vectors are
+    returned in input order and match HuggingFaceEmbeddings for the model.
+    """
+
+    def __init__(
+        self,
+        model_name="all-MiniLM-L6-v2",
+        workers=0,
+        batch_size=32,
+        loader=_load_model,
+        start_method="spawn",
+    ):
+        self.model_name = model_name
+        # 0 = un worker par cœur
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.loader = loader
+        self.start_method = start_method
+        self._model = None
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_worker,
+                initargs=(self.loader, self.model_name, threads),
+            )
+            weakref.finalize(self, self._pool.shutdown)
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def embed_documents(self, texts):
+        order, batches = length_sorted_batches(texts, self.batch_size)
+
+        if self.workers > 1 and len(batches) > 1:
+            results = self._get_pool().map(_encode_batch, batches)
+        else:
+            if self._model is None:
+                self._model = self.loader(self.model_name)
+            results = (
+                self._model.encode(batch, batch_size=len(batch)).tolist()
+                for batch in batches
+            )
+        return restore_order(order, results)
+
+    def embed_query(self, text):
+        if self._model is None:
+            self._model = self.loader(self.model_name)
+        return self._model.encode(text).tolist()
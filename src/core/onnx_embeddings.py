@@ -0,0 +1,155 @@
+import os
+import json
+import argparse
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.core.local_embeddings import length_sorted_batches, restore_order
+
+try:
+    import onnxruntime
+    from tokenizers import Tokenizer
+except ImportError:  # Dépendances optionnelles (backend ONNX)
+    onnxruntime = None
+    Tokenizer = None
+
+MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+CONFIG_FILE = "onnx_config.json"
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    Sentence embeddings from an int8-quantized transformer exported with
+    export_quantized_model(), run with onnxruntime and a 'tokenizers'
+    tokenizer only: no PyTorch at runtime. Mean pooling and normalization
+    reproduce the Sentence-Transformers pipeline of the exported model.
+    """
+
+    def __init__(self, model_dir, batch_size=32, threads=0):
+        if onnxruntime is None:
+            raise ImportError(
+                "onnxruntime and tokenizers are required for the ONNX backend: "
+                "pip install onnxruntime tokenizers"
+            )
+        with open(os.path.join(model_dir, CONFIG_FILE), "r", encoding="utf-8") as f:
+            self.config = json.load(f)
+        # Vecteurs quantifiés : jamais mélangés avec ceux du modèle float32
+        self.model_name = f"{self.config['model_name']}-int8"
+        self.batch_size = batch_size
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(self.config["max_length"])
+        self.tokenizer.enable_padding(
+            pad_id=self.config["pad_id"], pad_token=self.config["pad_token"]
+        )
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, MODEL_FILE),
+            options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def _encode(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": mask,
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {n: feeds[n] for n in self.input_names})[0]
+
+        # Mean pooling sur les tokens réels (hors padding)
+        weights = mask[..., None].astype(np.float32)
+        vectors = (hidden * weights).sum(axis=1) / np.clip(
+            weights.sum(axis=1), 1e-9, None
+        )
+        if self.config.get("normalize", True):
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.clip(norms, 1e-12, None)
+        return vectors.tolist()
+
+    def embed_documents(self, texts):
+        order, batches = length_sorted_batches(texts, self.batch_size)
+        return restore_order(order, (self._encode(batch) for batch in batches))
+
+    def embed_query(self, text):
+        return self._encode([text])[0]
+
+
+def export_quantized_model(model_name, output_dir, opset=17):
+    """
+    Export a Sentence-Transformers model (mean pooling) to ONNX and quantize
+    its weights to int8. Needs torch, sentence-transformers and onnx, at
+    export time only.
+    """
+    # pylint: disable=import-outside-toplevel
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+
+    class _LastHiddenState(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.inner(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                token_type_ids=token_type_ids,
+            ).last_hidden_state
+
+    os.makedirs(output_dir, exist_ok=True)
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    sample = tokenizer(["Concert de jazz à Paris"], return_tensors="pt")
+    if "token_type_ids" not in sample:
+        sample["token_type_ids"] = torch.zeros_like(sample["input_ids"])
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    torch.onnx.export(
+        _LastHiddenState(transformer),
+        tuple(sample[name] for name in names),
+        fp32_path,
+        input_names=names,
+        output_names=["last_hidden_state"],
+        dynamic_axes={
+            name: {0: "batch", 1: "sequence"} for name in names + ["last_hidden_state"]
+        },
+        opset_version=opset,
+        dynamo=False,
+    )
+    quantize_dynamic(
+        fp32_path, os.path.join(output_dir, MODEL_FILE), weight_type=QuantType.QInt8
+    )
+    os.remove(fp32_path)
+
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, TOKENIZER_FILE))
+    config = {
+        "model_name": os.path.basename(os.path.normpath(model_name)),
+        "max_length": model.max_seq_length,
+        "pad_id": tokenizer.pad_token_id,
+        "pad_token": tokenizer.pad_token,
+        "normalize": any(type(m).__name__ == "Normalize" for m in model),
+    }
+    with open(os.path.join(output_dir, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    print(f"Quantized ONNX model saved to {output_dir}")
+    return output_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export int8 ONNX d'un modèle Sentence-Transformers."
+    )
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--output", default="data/onnx/all-MiniLM-L6-v2-int8")
+    args = parser.parse_args()
+    export_quantized_model(args.model, args.output)
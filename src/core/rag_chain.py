@@ -1,13 +1,26 @@
 import os
+import re
+import asyncio
+import hashlib
 import locale
 import calendar
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from langchain_core.documents import Document
 from langchain_mistralai import ChatMistralAI
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
+from src.core.answer_cache import AnswerCache, SemanticAnswerCache, date_bucket
+from src.core.lexical_index import reciprocal_rank_fusion
+from src.core.time_index import (
+    documents_at,
+    nearest_eligible,
+    nearest_eligible_many,
+    search_eligible,
+)
 from src.core.vectorstore import VectorStoreManager
+from src.timings import decode_sessions, overlaps
 
 load_dotenv()
 
@@ -20,24 +33,74 @@ except locale.Error:
     except locale.Error:
         pass
 
+# Mots sans portée thématique : une question qui ne contient que ceux-ci
+# (et des dates) est purement temporelle, ex. "quoi de prévu demain ?"
+NON_TOPICAL_WORDS = {
+    # Mots outils et formulations de demande
+    "a", "au", "aux", "avez", "ce", "ces", "cet", "cette", "de", "des", "du",
+    "en", "est", "et", "il", "je", "l", "la", "le", "les", "me", "moi", "nous",
+    "on", "ou", "peut", "peux", "pour", "qu", "que", "quel", "quelle",
+    "quelles", "quels", "quoi", "se", "sont", "t", "un", "une", "vous", "y",
+    "faire", "passe", "prévu", "prévue", "prévues", "prévus", "programme",
+    "sortir", "voir", "agenda", "activité", "activités", "animation",
+    "animations", "dispo", "disponible", "disponibles", "événement",
+    "événements", "evenement", "evenements", "sortie", "sorties",
+    # Vocabulaire des périodes reconnues par _get_date_range_from_query
+    "aujourd", "hui", "demain", "soir", "week", "end", "weekend", "we",
+    "semaine", "mois", "prochain", "prochaine", "été", "janvier", "février",
+    "mars", "avril", "mai", "juin", "juillet", "août", "septembre", "octobre",
+    "novembre", "décembre",
+}  # fmt: skip
+
+# Texte des questions purement temporelles dans la clé du cache exact
+CALENDAR_QUESTION = "\0calendar"
+
 
 class RAGChain:
-    def __init__(self):
+    def __init__(self, answer_cache=None, semantic_cache=None):
         self.vectorstore_manager = VectorStoreManager()
         self.vectorstore = self.vectorstore_manager.load_index()
         if self.vectorstore is None:
             raise ValueError("Vector store not found. Please run vectorstore.py first.")
 
-        self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": 3})
+        self.k = 3
+        self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": self.k})
+        # Index des sessions : filtre temporel appliqué pendant la recherche FAISS
+        self.time_index = self.vectorstore_manager.load_time_index()
+        # Contexte complet des événements, lu à la demande (chunks allégés)
+        self.parents = self.vectorstore_manager.load_parents()
+        # Index BM25 des chunks, fusionné avec la recherche vectorielle (RRF)
+        self.lexical_index = self.vectorstore_manager.load_lexical_index()
+        # Nombre d'événements du calendrier pour une question purement temporelle
+        self.calendar_size = 10
         self.llm = self._init_llm()
         self.prompt = self._get_prompt_template()
+        self.answer_chain = self._build_answer_chain()
         self.chain = self._build_chain()
+        # Appels LLM simultanés au plus pour une liste de questions (ask_many)
+        self.batch_concurrency = int(os.getenv("ASK_BATCH_CONCURRENCY", "8"))
+
+        # Cache des réponses : vidé dès que l'index change de version
+        self.index_version = self.vectorstore_manager.load_index_version()
+        self.prompt_hash = hashlib.sha256(
+            f"{self.prompt}\0{getattr(self.llm, 'model', '')}".encode("utf-8")
+        ).hexdigest()
+        self.answer_cache = (
+            AnswerCache.from_env() if answer_cache is None else answer_cache
+        )
+        self.answer_cache.bind(self.index_version)
+        # Second niveau : questions reformulées (même plage de dates)
+        self.semantic_cache = (
+            SemanticAnswerCache.from_env() if semantic_cache is None else semantic_cache
+        )
+        self.semantic_cache.bind((self.index_version, self.prompt_hash))
 
     def _init_llm(self):
         mistral_key = os.getenv("MISTRAL_API_KEY")
         return ChatMistralAI(api_key=mistral_key, model="mistral-tiny", temperature=0)
 
-    def _get_date_range_from_query(self, query: str):
+    @staticmethod
+    def _get_date_range_from_query(query: str):
         """Extrait une intention de date précise de la requête utilisateur."""
         now = datetime.now()
         query_lower = query.strip().lower()
@@ -60,8 +123,12 @@ class RAGChain:
             tomorrow = now + timedelta(days=1)
             result = {
                 "type": "day",
-                "start_ts": tomorrow.replace(hour=0, minute=0, second=0).timestamp(),
-                "end_ts": tomorrow.replace(hour=23, minute=59, second=59).timestamp(),
+                "start_ts": tomorrow.replace(
+                    hour=0, minute=0, second=0, microsecond=0
+                ).timestamp(),
+                "end_ts": tomorrow.replace(
+                    hour=23, minute=59, second=59, microsecond=0
+                ).timestamp(),
                 "display": tomorrow.strftime("%A %d %B %Y"),
             }
 
@@ -73,9 +140,11 @@ class RAGChain:
         ):
             days_to_saturday = 5 - now.weekday()
             sat = (now + timedelta(days=days_to_saturday)).replace(
-                hour=0, minute=0, second=0
+                hour=0, minute=0, second=0, microsecond=0
+            )
+            sun = (sat + timedelta(days=1)).replace(
+                hour=23, minute=59, second=59, microsecond=0
             )
-            sun = (sat + timedelta(days=1)).replace(hour=23, minute=59, second=59)
             result = {
                 "type": "weekend",
                 "start_ts": sat.timestamp(),
@@ -148,10 +217,12 @@ class RAGChain:
 
         filtered = []
         for doc in docs:
-            sessions = doc.metadata.get("all_sessions_ts", [])
-            if sessions:
-                # On valide si au moins une session tombe dans la plage demandée
-                if any(start_ts <= ts <= end_ts for ts in sessions):
+            sessions = decode_sessions(
+                doc.metadata.get("sessions_ts", doc.metadata.get("all_sessions_ts"))
+            )
+            if len(sessions):
+                # On valide si au moins une session chevauche la plage demandée
+                if overlaps(sessions, start_ts, end_ts):
                     filtered.append(doc)
             else:
                 # Fallback plage globale (compatibilité)
@@ -161,6 +232,136 @@ class RAGChain:
                     filtered.append(doc)
         return filtered
 
+    def _retrieve(self, question: str, date_context: dict, embedding=None):
+        """
+        Top-k documents among the events having a session in the requested
+        range. With a time index, the range restricts the candidates inside
+        the FAISS search, and purely temporal questions skip it for the
+        calendar; older indexes filter the similarity top-k instead.
+        'embedding' is the query embedding when already computed.
+        """
+        if date_context.get("type") == "greeting":
+            return []
+        if self.time_index is None:
+            docs = (
+                self.retriever.invoke(question)
+                if embedding is None
+                else self.vectorstore.similarity_search_by_vector(embedding, k=self.k)
+            )
+            return self._filter_retrieved_docs(docs, date_context)
+
+        if not self._has_topic(question):
+            return self._calendar_docs(date_context)
+
+        positions = self.time_index.eligible(
+            date_context.get("start_ts", 0), date_context.get("end_ts", float("inf"))
+        )
+        if not len(positions):
+            return []
+        if embedding is None:
+            embedding = self.vectorstore.embeddings.embed_query(question)
+        if self.lexical_index is None:
+            return search_eligible(self.vectorstore, embedding, self.k, positions)
+
+        # Titres, lieux et mots-clés exacts : BM25 complète les k voisins
+        # sans augmenter k ni le contexte envoyé au LLM
+        dense = nearest_eligible(self.vectorstore.index, embedding, self.k, positions)
+        sparse = self.lexical_index.search(question, self.k, positions)
+        fused = reciprocal_rank_fusion([dense, sparse])[: self.k]
+        return documents_at(self.vectorstore, fused)
+
+    async def _aretrieve(self, question: str, date_context: dict):
+        """
+        _retrieve() for the event loop: the query embedding is awaited (no
+        thread held during the network call), the CPU-bound index searches
+        run in a worker thread.
+        """
+        embedding = None
+        if date_context.get("type") != "greeting" and (
+            self.time_index is None or self._has_topic(question)
+        ):
+            embedding = await self.vectorstore.embeddings.aembed_query(question)
+        return await asyncio.to_thread(
+            self._retrieve, question, date_context, embedding
+        )
+
+    def _retrieve_many(self, questions: list, date_contexts: list, embeddings):
+        """
+        _retrieve() for several questions, as a list of documents or of the
+        exception raised, in order. Topical questions on the same date range
+        share one FAISS search over their embedding matrix; 'embeddings' maps
+        a question's position to its query embedding.
+        """
+        results = [None] * len(questions)
+        groups = {}
+        for i, (question, date_context) in enumerate(zip(questions, date_contexts)):
+            if (
+                date_context.get("type") == "greeting"
+                or self.time_index is None
+                or not self._has_topic(question)
+                or i not in embeddings
+            ):
+                try:
+                    results[i] = self._retrieve(
+                        question, date_context, embeddings.get(i)
+                    )
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    results[i] = e
+                continue
+            bounds = (
+                date_context.get("start_ts", 0),
+                date_context.get("end_ts", float("inf")),
+            )
+            groups.setdefault(bounds, []).append(i)
+
+        for (start_ts, end_ts), members in groups.items():
+            try:
+                positions = self.time_index.eligible(start_ts, end_ts)
+                dense = nearest_eligible_many(
+                    self.vectorstore.index,
+                    [embeddings[i] for i in members],
+                    self.k,
+                    positions,
+                )
+                for i, found in zip(members, dense):
+                    if self.lexical_index is not None and len(positions):
+                        sparse = self.lexical_index.search(
+                            questions[i], self.k, positions
+                        )
+                        found = reciprocal_rank_fusion([found, sparse])[: self.k]
+                    results[i] = documents_at(self.vectorstore, found)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                for i in members:
+                    results[i] = e
+        return results
+
+    @staticmethod
+    def _has_topic(question: str):
+        """True if the question has topical terms besides dates and filler words."""
+        words = re.findall(r"[^\W\d_]+", question.lower())
+        return any(word not in NON_TOPICAL_WORDS for word in words)
+
+    def _calendar_docs(self, date_context: dict):
+        """
+        Events having a session in the requested range, in calendar order,
+        straight from the time index: no embedding call, no similarity search.
+        """
+        positions = self.time_index.chronological(
+            date_context.get("start_ts", 0), date_context.get("end_ts", float("inf"))
+        )
+        docs, seen = [], set()
+        for position in positions:
+            (doc,) = documents_at(self.vectorstore, [position])
+            # Un seul chunk par événement
+            event = doc.metadata.get("event_id", doc.metadata.get("url"))
+            if event is not None and event in seen:
+                continue
+            seen.add(event)
+            docs.append(doc)
+            if len(docs) >= self.calendar_size:
+                break
+        return docs
+
     def _get_prompt_template(self):
         template = """
         Tu es l'assistant expert de l'agenda Puls-Events.
@@ -192,6 +393,15 @@ class RAGChain:
 
         unique_contents = {}
         for doc in docs:
+            event_id = doc.metadata.get("event_id")
+            if self.parents is not None and event_id is not None:
+                # Un seul contexte par événement, lu dans le store parent
+                if str(event_id) in unique_contents:
+                    continue
+                parent = self.parents.search(str(event_id))
+                if isinstance(parent, Document):
+                    unique_contents[str(event_id)] = parent.page_content
+                    continue
             url = doc.metadata.get("url")
             content = doc.metadata.get("full_context", doc.page_content)
             if url:
@@ -201,7 +411,26 @@ class RAGChain:
 
         return "\n\n---\n\n".join(unique_contents.values())
 
+    def _build_answer_chain(self):
+        """Prompt and LLM, from a question with its date context and documents."""
+        return (
+            {
+                "context": lambda x: self._format_docs(
+                    x["retrieved_docs"],
+                    x["date_context"],
+                ),
+                "question": lambda x: x["question"],
+                "current_date": lambda x: x["current_date"],
+            }
+            | self.prompt
+            | self.llm
+            | StrOutputParser()
+        )
+
     def _build_chain(self):
+        async def aretrieve(x):
+            return await self._aretrieve(x["question"], x["date_context"])
+
         chain = (
             {
                 "question": RunnablePassthrough(),
@@ -211,27 +440,254 @@ class RAGChain:
                 date_context=lambda x: self._get_date_range_from_query(x["question"])
             )
             | RunnablePassthrough.assign(
-                retrieved_docs=lambda x: self._filter_retrieved_docs(
-                    self.retriever.invoke(x["question"]),
-                    x["date_context"],
+                retrieved_docs=RunnableLambda(
+                    lambda x: self._retrieve(x["question"], x["date_context"]),
+                    afunc=aretrieve,
                 )
             )
-            | {
-                "context": lambda x: self._format_docs(
-                    x["retrieved_docs"],
-                    x["date_context"],
-                ),
-                "question": lambda x: x["question"],
-                "current_date": lambda x: x["current_date"],
-            }
-            | self.prompt
-            | self.llm
-            | StrOutputParser()
+            | self.answer_chain
         )
         return chain
 
+    def _is_calendar_question(self, query: str, date_context: dict):
+        """
+        True for purely temporal questions ("Qu'y a-t-il ce weekend ?"),
+        answered from the time index alone: the answer depends on the date
+        range only, not on the wording.
+        """
+        return (
+            self.time_index is not None
+            and date_context.get("type") != "greeting"
+            and not self._has_topic(query)
+        )
+
+    def _cache_key(self, query: str, date_context: dict, bucket: str):
+        """
+        Exact-cache key of a query. Calendar questions are keyed on their
+        date bucket only, so their rewordings share one entry without any
+        embedding call.
+        """
+        if self._is_calendar_question(query, date_context):
+            query = CALENDAR_QUESTION
+        return AnswerCache.key(query, bucket, self.prompt_hash, self.index_version)
+
+    def _semantic_lookup(self, query: str, date_context: dict):
+        """
+        True if the semantic cache level applies: questions whose retrieval
+        embeds them anyway. Greetings and calendar questions skip it (no
+        embedding call), the exact cache covers them.
+        """
+        return (
+            self.semantic_cache.enabled
+            and date_context.get("type") != "greeting"
+            and not self._is_calendar_question(query, date_context)
+        )
+
+    def _exact_lookup(self, query: str):
+        """Exact-cache answer of a query, with its date context, key and bucket."""
+        date_context = self._get_date_range_from_query(query)
+        bucket = date_bucket(date_context)
+        key = self._cache_key(query, date_context, bucket)
+        answer = self.answer_cache.get(key) if self.answer_cache.enabled else None
+        return answer, date_context, key, bucket
+
+    def _semantic_get(self, key: str, bucket: str, vector):
+        answer = self.semantic_cache.get(vector, bucket)
+        if answer is not None:
+            self.answer_cache.put(key, answer)
+        return answer
+
+    def _lookup(self, query: str):
+        """
+        Cached answer of a query (exact, then semantic level), and the cache
+        slot to fill on a miss as (key, bucket, query embedding).
+        """
+        answer, date_context, key, bucket = self._exact_lookup(query)
+        vector = None
+        if answer is None and self._semantic_lookup(query, date_context):
+            # Embedding de requête mis en cache : réutilisé par la recherche
+            vector = self.vectorstore.embeddings.embed_query(query)
+            answer = self._semantic_get(key, bucket, vector)
+        return answer, (key, bucket, vector)
+
+    async def _alookup(self, query: str):
+        """_lookup() for the event loop: the query embedding is awaited."""
+        answer, date_context, key, bucket = self._exact_lookup(query)
+        vector = None
+        if answer is None and self._semantic_lookup(query, date_context):
+            vector = await self.vectorstore.embeddings.aembed_query(query)
+            answer = self._semantic_get(key, bucket, vector)
+        return answer, (key, bucket, vector)
+
+    def _remember(self, slot, answer: str):
+        key, bucket, vector = slot
+        if vector is not None:
+            self.semantic_cache.put(vector, bucket, answer)
+        self.answer_cache.put(key, answer)
+
     def ask(self, query: str):
-        return self.chain.invoke(query)
+        answer, slot = self._lookup(query)
+        if answer is None:
+            answer = self.chain.invoke(query)
+            self._remember(slot, answer)
+        return answer
+
+    async def aask(self, query: str):
+        """
+        Async ask() built on the chain's ainvoke: the LLM and embedding calls
+        are awaited, so one worker serves many questions in flight.
+        """
+        answer, slot = await self._alookup(query)
+        if answer is None:
+            answer = await self.chain.ainvoke(query)
+            self._remember(slot, answer)
+        return answer
+
+    def stream(self, query: str):
+        """
+        Yield the answer as it is generated (tokens of the LLM). A cached
+        answer is yielded at once; a complete streamed answer is cached.
+        """
+        answer, slot = self._lookup(query)
+        if answer is not None:
+            yield answer
+            return
+        parts = []
+        for token in self.chain.stream(query):
+            parts.append(token)
+            yield token
+        self._remember(slot, "".join(parts))
+
+    async def astream(self, query: str):
+        """Async version of stream(), for the API event loop."""
+        answer, slot = await self._alookup(query)
+        if answer is not None:
+            yield answer
+            return
+        parts = []
+        async for token in self.chain.astream(query):
+            parts.append(token)
+            yield token
+        self._remember(slot, "".join(parts))
+
+    def _prepare_many(self, queries: list):
+        """
+        Cache lookups, query embeddings (one call for all the questions
+        missing from the exact cache) and retrievals of a list of questions.
+        Returns the results known so far (answers or exceptions) and, for
+        each distinct question left, its positions in the list, its cache
+        slot and its chain input.
+        """
+        results = [None] * len(queries)
+        date_contexts = [self._get_date_range_from_query(q) for q in queries]
+        pending = {}
+        for i, (query, date_context) in enumerate(zip(queries, date_contexts)):
+            bucket = date_bucket(date_context)
+            key = self._cache_key(query, date_context, bucket)
+            if key in pending:
+                # Question répétée dans le lot : une seule génération
+                pending[key][0].append(i)
+                continue
+            answer = self.answer_cache.get(key) if self.answer_cache.enabled else None
+            if answer is not None:
+                results[i] = answer
+            else:
+                pending[key] = ([i], bucket)
+
+        firsts = [members[0] for members, _ in pending.values()]
+        to_embed = [
+            i
+            for i in firsts
+            if self._semantic_lookup(queries[i], date_contexts[i])
+            or (
+                date_contexts[i].get("type") != "greeting"
+                and self.time_index is not None
+                and self._has_topic(queries[i])
+            )
+        ]
+        embeddings = {}
+        if to_embed:
+            vectors = self.vectorstore.embeddings.embed_queries(
+                [queries[i] for i in to_embed]
+            )
+            embeddings = dict(zip(to_embed, vectors))
+
+        todo = []
+        for key, (members, bucket) in pending.items():
+            vector = embeddings.get(members[0])
+            if vector is not None and self._semantic_lookup(
+                queries[members[0]], date_contexts[members[0]]
+            ):
+                answer = self.semantic_cache.get(vector, bucket)
+                if answer is not None:
+                    self.answer_cache.put(key, answer)
+                    for i in members:
+                        results[i] = answer
+                    continue
+            todo.append((members, (key, bucket, vector)))
+
+        questions = [queries[members[0]] for members, _ in todo]
+        contexts = [date_contexts[members[0]] for members, _ in todo]
+        retrieved = self._retrieve_many(
+            questions,
+            contexts,
+            {n: slot[2] for n, (_, slot) in enumerate(todo) if slot[2] is not None},
+        )
+        current_date = self._get_current_date(None)
+        items = []
+        for (members, slot), question, date_context, docs in zip(
+            todo, questions, contexts, retrieved
+        ):
+            if isinstance(docs, Exception):
+                for i in members:
+                    results[i] = docs
+                continue
+            chain_input = {
+                "question": question,
+                "current_date": current_date,
+                "date_context": date_context,
+                "retrieved_docs": docs,
+            }
+            items.append((members, slot, chain_input))
+        return results, items
+
+    def _collect_many(self, results: list, items: list, answers: list):
+        for (members, slot, _), answer in zip(items, answers):
+            if not isinstance(answer, Exception):
+                self._remember(slot, answer)
+            for i in members:
+                results[i] = answer
+        return results
+
+    def ask_many(self, queries: list, max_concurrency: int = None):
+        """
+        Answers to a list of questions, in order. Query embeddings take one
+        call, retrievals on the same date range one FAISS search, and the
+        LLM calls run through the chain's batch() with at most
+        'max_concurrency' in flight. A question that fails gets its
+        exception in place of an answer.
+        """
+        results, items = self._prepare_many(queries)
+        if items:
+            answers = self.answer_chain.batch(
+                [chain_input for _, _, chain_input in items],
+                config={"max_concurrency": max_concurrency or self.batch_concurrency},
+                return_exceptions=True,
+            )
+            self._collect_many(results, items, answers)
+        return results
+
+    async def aask_many(self, queries: list, max_concurrency: int = None):
+        """Async ask_many(): the LLM calls are awaited through abatch()."""
+        results, items = await asyncio.to_thread(self._prepare_many, queries)
+        if items:
+            answers = await self.answer_chain.abatch(
+                [chain_input for _, _, chain_input in items],
+                config={"max_concurrency": max_concurrency or self.batch_concurrency},
+                return_exceptions=True,
+            )
+            self._collect_many(results, items, answers)
+        return results
 
 
 if __name__ == "__main__":
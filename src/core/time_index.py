@@ -0,0 +1,213 @@
+import os
+import faiss
+import numpy as np
+from src.timings import BEGIN, END, decode_sessions
+
+TIME_INDEX_FILE = "time_index.npy"
+TIME_BUCKETS_FILE = "time_buckets.npy"
+
+# En dessous de cette part de candidats, la recherche n'est plus approchée
+# (IVF : toutes les listes, HNSW : vecteurs bruts) pour trouver k résultats
+# parmi eux en une seule passe
+SELECTIVE_FRACTION = 0.1
+
+
+def _chunk_sessions(metadata):
+    """(begin, end) rows of a chunk; no date at all means always eligible."""
+    sessions = decode_sessions(
+        metadata.get("sessions_ts", metadata.get("all_sessions_ts"))
+    )
+    if len(sessions):
+        return sessions[:, [BEGIN, END]]
+    # Plage globale (compatibilité), sinon toujours éligible
+    return np.array(
+        [[metadata.get("start_ts", 0), metadata.get("end_ts", float("inf"))]],
+        dtype=np.float64,
+    )
+
+
+def _duration_class(durations):
+    """log2 class of session durations (seconds); open-ended sessions last."""
+    classes = np.floor(np.log2(np.clip(durations, 1, None)))
+    return np.where(np.isfinite(durations), classes, 64)
+
+
+class TimeIndex:
+    """
+    Interval index over the sessions of every chunk of the FAISS index, as a
+    (3, n) array of (begin, end, index position). Sessions are grouped by
+    duration class (powers of two) and sorted by begin within a group: a
+    session of a group overlaps a range only if it begins at most the
+    group's longest duration before it, so a query is a binary search per
+    group plus the matches, without reading any document. Saved next to the
+    index and loaded memory-mapped.
+    """
+
+    def __init__(self, table, buckets=None):
+        self.table = table
+        self.begins, self.ends, self.positions = table
+        # (début, fin, durée max) de chaque groupe ; un seul groupe sans borne
+        # pour les index enregistrés avant les groupes
+        if buckets is None:
+            buckets = np.array([[0], [table.shape[1]], [np.inf]], dtype=np.float64)
+        self.buckets = buckets
+
+    @classmethod
+    def from_metadatas(cls, metadatas):
+        """Build from chunk metadatas given in index position order."""
+        return cls._from_rows(enumerate(metadatas))
+
+    @classmethod
+    def _from_rows(cls, metadatas, rows=None):
+        """
+        Build from the (position, metadata) of some chunks plus already
+        decoded (begin, end, position) 'rows' of the other chunks.
+        """
+        rows = [] if rows is None else [rows]
+        for position, metadata in metadatas:
+            sessions = _chunk_sessions(metadata)
+            rows.append(np.column_stack([sessions, np.full(len(sessions), position)]))
+        rows = np.concatenate(rows) if rows else np.empty((0, 3))
+        if not len(rows):
+            return cls(np.empty((3, 0), dtype=np.float64))
+        durations = rows[:, 1] - rows[:, 0]
+        classes = _duration_class(durations)
+        # Ordre total : même table qu'on parte de zéro ou d'une mise à jour
+        order = np.lexsort((rows[:, 1], rows[:, 2], rows[:, 0], classes))
+        rows, durations, classes = rows[order], durations[order], classes[order]
+
+        _, starts = np.unique(classes, return_index=True)
+        stops = np.append(starts[1:], len(rows))
+        longest = np.maximum(np.maximum.reduceat(durations, starts), 0)
+        buckets = np.array([starts, stops, longest], dtype=np.float64)
+        return cls(np.ascontiguousarray(rows.T), buckets)
+
+    def updated(self, remap, metadatas):
+        """
+        Index after an in-place update of the FAISS index: 'remap' gives the
+        new position of each current position (-1 if the chunk was removed)
+        and 'metadatas' the {new position: metadata} of the added chunks,
+        the only sessions decoded.
+        """
+        remap = np.asarray(remap, dtype=np.int64)
+        positions = self.positions.astype(np.int64)
+        rows = np.array(self.table.T, dtype=np.float64)
+        if len(rows):
+            rows[:, 2] = remap[positions]
+            rows = rows[rows[:, 2] >= 0]
+        return self._from_rows(metadatas.items(), rows)
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, parents=None):
+        """
+        Build from the chunks of a LangChain FAISS vectorstore; the sessions
+        of slim chunks are read from 'parents' ({event id: Document}).
+        """
+
+        def metadata(position):
+            chunk = vectorstore.docstore.search(
+                vectorstore.index_to_docstore_id[position]
+            )
+            parent = (parents or {}).get(str(chunk.metadata.get("event_id")))
+            return chunk.metadata if parent is None else parent.metadata
+
+        return cls.from_metadatas(
+            metadata(position) for position in range(vectorstore.index.ntotal)
+        )
+
+    def save(self, path):
+        np.save(os.path.join(path, TIME_INDEX_FILE), self.table)
+        np.save(os.path.join(path, TIME_BUCKETS_FILE), self.buckets)
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved time index (memory-mapped), or None if there is none."""
+        file = os.path.join(path, TIME_INDEX_FILE)
+        if not os.path.exists(file):
+            return None
+        buckets_file = os.path.join(path, TIME_BUCKETS_FILE)
+        buckets = np.load(buckets_file) if os.path.exists(buckets_file) else None
+        return cls(np.load(file, mmap_mode="r"), buckets)
+
+    def overlapping(self, start_ts, end_ts):
+        """Row numbers of the sessions overlapping [start_ts, end_ts]."""
+        hits = []
+        for first, stop, longest in self.buckets.T:
+            first, stop = int(first), int(stop)
+            begins = self.begins[first:stop]
+            # Seules les sessions commençant dans [start - durée max, end]
+            lo = np.searchsorted(begins, start_ts - longest, side="left")
+            hi = np.searchsorted(begins, end_ts, side="right")
+            rows = np.arange(first + lo, first + hi)
+            hits.append(rows[self.ends[first + lo : first + hi] >= start_ts])
+        return np.concatenate(hits) if hits else np.empty(0, dtype=np.int64)
+
+    def eligible(self, start_ts, end_ts):
+        """Sorted index positions having a session overlapping [start_ts, end_ts]."""
+        rows = self.overlapping(start_ts, end_ts)
+        return np.unique(self.positions[rows].astype(np.int64))
+
+    def chronological(self, start_ts, end_ts):
+        """
+        Index positions having a session overlapping [start_ts, end_ts],
+        ordered by their first moment within the range (calendar order).
+        """
+        rows = self.overlapping(start_ts, end_ts)
+        moments = np.maximum(self.begins[rows], start_ts)
+        positions = self.positions[rows].astype(np.int64)
+        order = np.lexsort((positions, moments))
+        positions = positions[order]
+        _, first = np.unique(positions, return_index=True)
+        return positions[np.sort(first)]
+
+
+def nearest_eligible_many(index, embeddings, k, positions):
+    """
+    Top-k index positions for each row of 'embeddings' among 'positions'
+    only: one FAISS search for the whole matrix, restricted by an ID
+    selector (no post-filtering, no over-fetching).
+    """
+    if not len(positions) or not len(embeddings):
+        return [[] for _ in embeddings]
+    selector = faiss.IDSelectorBatch(np.asarray(positions, dtype=np.int64))
+    selective = len(positions) < SELECTIVE_FRACTION * index.ntotal
+
+    if hasattr(index, "nprobe"):
+        nprobe = index.nlist if selective else index.nprobe
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+    elif hasattr(index, "hnsw"):
+        if selective:
+            # Le parcours du graphe n'atteint pas des candidats rares et
+            # éloignés : recherche exacte sur ses vecteurs, candidats seuls
+            index = index.storage
+            params = faiss.SearchParameters(sel=selector)
+        else:
+            params = faiss.SearchParametersHNSW(
+                sel=selector, efSearch=index.hnsw.efSearch
+            )
+    else:
+        params = faiss.SearchParameters(sel=selector)
+
+    queries = np.asarray(embeddings, dtype=np.float32)
+    _, found = index.search(queries, min(k, len(positions)), params=params)
+    return [[int(position) for position in row if position != -1] for row in found]
+
+
+def nearest_eligible(index, embedding, k, positions):
+    """Top-k index positions for 'embedding' among 'positions' only."""
+    return nearest_eligible_many(index, [embedding], k, positions)[0]
+
+
+def documents_at(vectorstore, positions):
+    """Documents of a LangChain FAISS vectorstore at the given index positions."""
+    return [
+        vectorstore.docstore.search(vectorstore.index_to_docstore_id[int(position)])
+        for position in positions
+    ]
+
+
+def search_eligible(vectorstore, embedding, k, positions):
+    """Top-k documents of a LangChain FAISS vectorstore among 'positions' only."""
+    return documents_at(
+        vectorstore, nearest_eligible(vectorstore.index, embedding, k, positions)
+    )
@@ -1,11 +1,29 @@
 import os
 import json
+import time
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.documents import Document
 from langchain_mistralai import MistralAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from src.core.embedding_cache import CachedEmbeddings
+from src.core.index_bundle import (
+    has_bundle,
+    load_bundle,
+    load_parents,
+    save_bundle,
+    save_parents,
+)
+from src.core.index_spec import IndexSpec
+from src.core.lexical_index import LexicalIndex
+from src.core.time_index import TimeIndex
+from src.core.local_embeddings import LocalEmbeddings
+from src.core.onnx_embeddings import OnnxEmbeddings
+from src.ratelimit import RateLimiter
+from src.storage import iter_records, record_hash
 
 load_dotenv()
 
@@ -13,7 +31,32 @@ load_dotenv()
 class VectorStoreManager:
     def __init__(self, index_path="data/faiss_index"):
         self.index_path = index_path
-        self.embeddings = self._get_embeddings()
+        self.manifest_path = os.path.join(index_path, "manifest.json")
+        # Cache partagé par l'indexation et les requêtes (retriever du RAGChain)
+        model = self._get_embeddings()
+        self.embeddings = CachedEmbeddings.from_env(
+            model,
+            self._embeddings_id(model),
+            query_as_document=self._query_as_document(model),
+        )
+        # Étape d'embedding : lots concurrents sous limites de requêtes et de tokens.
+        # En local multi-processus, de grands lots séquentiels : le pool du
+        # modèle répartit déjà chaque lot (trié par longueur) sur les cœurs
+        local = isinstance(model, LocalEmbeddings)
+        self.batch_size = int(
+            os.getenv("EMBEDDING_BATCH_SIZE", "4096" if local else "64")
+        )
+        self.concurrency = int(
+            os.getenv("EMBEDDING_CONCURRENCY", "1" if local else "4")
+        )
+        self.max_retries = int(os.getenv("EMBEDDING_MAX_RETRIES", "4"))
+        # Attente entre deux essais d'un lot (remplaçable dans les tests)
+        self.sleep = time.sleep
+        self.request_limiter = RateLimiter(float(os.getenv("EMBEDDING_MAX_RPS", "0")))
+        self.token_limiter = RateLimiter(float(os.getenv("EMBEDDING_MAX_TPS", "0")))
+        # Type d'index FAISS des nouvelles constructions (voir IndexSpec)
+        self.index_spec = IndexSpec.parse(os.getenv("FAISS_INDEX_SPEC", "flat"))
+        self.stats = {}
 
     def _get_embeddings(self):
         mistral_key = os.getenv("MISTRAL_API_KEY")
@@ -29,47 +72,589 @@ class VectorStoreManager:
             "MISTRAL_API_KEY not found, invalid, or set to 'none'. "
             "Falling back to Sentence-Transformers (Local)."
         )
+        batch_size = int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "32"))
+        # Moteur ONNX int8 : pas de PyTorch, démarrage et requêtes plus rapides
+        if os.getenv("LOCAL_EMBEDDING_BACKEND", "torch").lower() == "onnx":
+            model_dir = os.getenv("ONNX_MODEL_DIR", "data/onnx/all-MiniLM-L6-v2-int8")
+            print(f"Using quantized ONNX embeddings from {model_dir}")
+            return OnnxEmbeddings(model_dir, batch_size=batch_size)
+
+        # 1 = un seul processus, 0 = un worker par cœur
+        workers = int(os.getenv("LOCAL_EMBEDDING_WORKERS", "1"))
+        if workers != 1:
+            return LocalEmbeddings(
+                model_name="all-MiniLM-L6-v2",
+                workers=workers,
+                batch_size=batch_size,
+            )
+        # Import différé : le moteur ONNX ou Mistral n'a pas besoin de PyTorch
+        # pylint: disable=import-outside-toplevel
+        from langchain_huggingface import HuggingFaceEmbeddings
+
         return HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
 
-    def create_index(self, processed_events_file="data/processed_events.json"):
-        if not os.path.exists(processed_events_file):
-            print(f"File {processed_events_file} not found.")
-            return
+    @staticmethod
+    def _query_as_document(model):
+        """True if the model embeds a query exactly like a document."""
+        name = type(model).__name__
+        if name in ("MistralAIEmbeddings", "LocalEmbeddings", "OnnxEmbeddings"):
+            return True
+        # Sentence-Transformers : identiques tant qu'aucun encodage de requête
+        # (prompt d'instruction) n'est configuré
+        return name == "HuggingFaceEmbeddings" and not getattr(
+            model, "query_encode_kwargs", None
+        )
+
+    def _embeddings_id(self, embeddings=None):
+        """Identify the embedding model, so vectors are never mixed across models."""
+        embeddings = embeddings or self.embeddings
+        if isinstance(embeddings, CachedEmbeddings):
+            return embeddings.model_id
+        # Mêmes vecteurs que HuggingFaceEmbeddings : index et cache restent valides
+        if isinstance(embeddings, LocalEmbeddings):
+            return f"HuggingFaceEmbeddings:{embeddings.model_name}"
+        model = getattr(embeddings, "model", None) or getattr(
+            embeddings, "model_name", None
+        )
+        return f"{type(embeddings).__name__}:{model}"
 
-        with open(processed_events_file, "r", encoding="utf-8") as f:
-            events = json.load(f)
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (ValueError, OSError):
+            return {}
 
-        documents = []
-        for event in events:
-            doc = Document(page_content=event["text"], metadata=event["metadata"])
-            documents.append(doc)
+    def load_index_spec(self):
+        """Index type of the persisted index (flat for older indexes)."""
+        return IndexSpec.parse(self._read_manifest().get("index"))
 
-        if not documents:
-            print("No documents to index.")
-            return
+    def load_index_version(self):
+        """
+        Version of the persisted index, changed by every save. Older indexes
+        fall back to the modification time of their directory.
+        """
+        version = self._read_manifest().get("version")
+        if version is None and os.path.exists(self.index_path):
+            version = f"mtime-{os.path.getmtime(self.index_path)}"
+        return version
+
+    def load_manifest(self):
+        """
+        Return the {event_id: {"hash", "chunks"}} manifest of the persisted
+        index, or {} if it is missing or was built with another model.
+        """
+        manifest = self._read_manifest()
+        if not manifest or manifest.get("embeddings") != self._embeddings_id():
+            return {}
+        events = manifest.get("events", {})
+        # Manifeste sans identifiants de chunks : mise à jour en place impossible
+        if any(not isinstance(entry, dict) for entry in events.values()):
+            return {}
+        return events
+
+    def _save(self, vectorstore, manifest, spec, parents, previous=None):
+        """
+        Save the index, its parent store and its manifest into a new versioned
+        directory, then point 'index_path' (a symlink) at it with an atomic
+        rename, so readers always find a complete index at 'index_path'.
+        'previous' (see _derived_indexes) marks an in-place update.
+        """
+        version = f"{time.time_ns():x}"
+        target = f"{self.index_path}.v{version}"
+        try:
+            save_bundle(vectorstore, target)
+            save_parents(parents, target)
+            time_index, lexical_index = self._derived_indexes(
+                vectorstore, parents, previous
+            )
+            time_index.save(target)
+            lexical_index.save(target)
+            os.makedirs(target, exist_ok=True)
+            with open(
+                os.path.join(target, "manifest.json"), "w", encoding="utf-8"
+            ) as f:
+                json.dump(
+                    {
+                        "embeddings": self._embeddings_id(),
+                        "index": str(spec),
+                        # Identifiant de cette sauvegarde (caches de réponses)
+                        "version": version,
+                        "events": manifest,
+                    },
+                    f,
+                    ensure_ascii=False,
+                )
+        except Exception:
+            shutil.rmtree(target, ignore_errors=True)
+            raise
+        self._swap(target)
+
+    def _derived_indexes(self, vectorstore, parents, previous):
+        """
+        Time and BM25 indexes of 'vectorstore'. After an in-place update,
+        'previous' lists the chunk id of each position before the update
+        (None for removed or replaced chunks): the persisted indexes are then
+        patched for the changed chunks only instead of being rebuilt.
+        """
+        time_index = lexical_index = None
+        if previous is not None:
+            time_index = self.load_time_index()
+            lexical_index = self.load_lexical_index()
+        if (
+            time_index is None
+            or lexical_index is None
+            or len(lexical_index.lengths) != len(previous)
+        ):
+            return (
+                TimeIndex.from_vectorstore(vectorstore, parents),
+                LexicalIndex.from_vectorstore(vectorstore),
+            )
+
+        positions = {
+            doc_id: position
+            for position, doc_id in vectorstore.index_to_docstore_id.items()
+        }
+        remap = [
+            -1 if doc_id is None else positions.get(doc_id, -1) for doc_id in previous
+        ]
+        added = sorted(set(range(vectorstore.index.ntotal)) - set(remap))
+        chunks = {
+            position: vectorstore.docstore.search(
+                vectorstore.index_to_docstore_id[position]
+            )
+            for position in added
+        }
+        metadatas = {}
+        for position, chunk in chunks.items():
+            parent = parents.get(str(chunk.metadata.get("event_id")))
+            metadatas[position] = chunk.metadata if parent is None else parent.metadata
+        return (
+            time_index.updated(remap, metadatas),
+            lexical_index.updated(
+                remap,
+                {position: chunk.page_content for position, chunk in chunks.items()},
+            ),
+        )
+
+    def _swap(self, target):
+        """
+        Point 'index_path' at the 'target' directory. The previous version is
+        kept for the readers still loading it; older ones are removed.
+        """
+        previous = None
+        if os.path.islink(self.index_path):
+            previous = os.path.join(
+                os.path.dirname(self.index_path), os.readlink(self.index_path)
+            )
+        elif os.path.isdir(self.index_path):
+            # Index enregistré en dossier réel : converti une fois (non atomique)
+            previous = f"{self.index_path}.v0"
+            shutil.rmtree(previous, ignore_errors=True)
+            os.replace(self.index_path, previous)
+
+        link = f"{self.index_path}.link"
+        if os.path.lexists(link):
+            os.remove(link)
+        # Cible relative : le dossier data/ reste déplaçable
+        os.symlink(os.path.basename(target), link)
+        os.replace(link, self.index_path)
 
+        directory = os.path.dirname(self.index_path) or "."
+        prefix = f"{os.path.basename(self.index_path)}.v"
+        keep = {os.path.basename(target)}
+        if previous:
+            keep.add(os.path.basename(previous))
+        for name in os.listdir(directory):
+            if name.startswith(prefix) and name not in keep:
+                shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+    @staticmethod
+    def _to_document(event):
+        """Processed event -> Document stamped with its uid and content hash."""
+        content_hash = event.get("hash") or record_hash(
+            {"text": event["text"], "metadata": event["metadata"]}
+        )
+        metadata = dict(
+            event["metadata"], event_id=event.get("id"), content_hash=content_hash
+        )
+        return Document(page_content=event["text"], metadata=metadata)
+
+    @staticmethod
+    def _parent(doc):
+        """
+        Event-level payload of a document (full context as content, sessions
+        and other metadata), stored once per event in the parent store.
+        """
+        metadata = dict(doc.metadata)
+        content = metadata.pop("full_context", doc.page_content)
+        return Document(
+            id=str(metadata["event_id"]), page_content=content, metadata=metadata
+        )
+
+    @staticmethod
+    def _split(documents):
+        """
+        Split documents into chunks with stable ids '<uid>#<n>', so every chunk
+        of an event can be found again to replace or delete it. Chunks only
+        carry their event id: the event payload lives in the parent store.
+        """
         # Découpage en chunks pour gérer les textes longs
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=4000,
             chunk_overlap=200,
             length_function=len,
         )
-        split_docs = text_splitter.split_documents(documents)
+        split_docs = text_splitter.split_documents(
+            Document(
+                page_content=doc.page_content,
+                metadata={"event_id": doc.metadata["event_id"]},
+            )
+            for doc in documents
+        )
+
+        chunk_counts = {}
+        ids = []
+        for doc in split_docs:
+            event_id = str(doc.metadata.get("event_id"))
+            ids.append(f"{event_id}#{chunk_counts.get(event_id, 0)}")
+            chunk_counts[event_id] = chunk_counts.get(event_id, 0) + 1
+        return split_docs, ids, chunk_counts
+
+    def _embed_batch(self, texts):
+        """Embed one batch under the rate limits, retrying with backoff."""
+        pending = texts
+        if isinstance(self.embeddings, CachedEmbeddings):
+            pending = self.embeddings.uncached(texts)
+
+        for attempt in range(self.max_retries + 1):
+            if pending:
+                self.request_limiter.wait()
+                # Estimation grossière : ~4 caractères par token
+                self.token_limiter.wait(sum(len(text) for text in pending) // 4 + 1)
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                if attempt == self.max_retries:
+                    raise
+                delay = min(30.0, 0.5 * 2**attempt)
+                print(f"Embedding batch failed ({e}), retrying in {delay:.1f}s")
+                self.sleep(delay)
+        return []
+
+    def _embed_chunks(self, split_docs):
+        """
+        Embed chunks in batches of 'batch_size', 'concurrency' batches at a
+        time. Each completed batch is written to the on-disk embedding cache,
+        which acts as the build checkpoint: after an interruption, a new build
+        only embeds the batches that had not completed.
+        """
+        texts = [doc.page_content for doc in split_docs]
+        if not (isinstance(self.embeddings, CachedEmbeddings) and self.embeddings.path):
+            print(
+                "⚠️ EMBEDDING_CACHE_PATH vide : un build interrompu "
+                "ne pourra pas reprendre, tout sera ré-embeddé."
+            )
+        batches = [
+            texts[i : i + self.batch_size]
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as pool:
+            futures = [pool.submit(self._embed_batch, batch) for batch in batches]
+            try:
+                vectors = [vector for future in futures for vector in future.result()]
+            except Exception:
+                pool.shutdown(cancel_futures=True)
+                raise
+        elapsed = time.perf_counter() - start
+
+        rate = len(texts) / elapsed if elapsed > 0 else 0.0
+        if texts:
+            print(
+                f"Embedded {len(texts)} chunks in {len(batches)} batches "
+                f"({rate:.0f} embeddings/s)"
+            )
+        return vectors, rate
+
+    @staticmethod
+    def _remove_chunks(vectorstore, chunk_ids, spec):
+        """
+        Remove chunks from the index. Index types without removal (HNSW) are
+        rebuilt from the stored vectors of the remaining chunks.
+        """
+        if spec.supports_removal:
+            vectorstore.delete(chunk_ids)
+            return
+
+        stale = set(chunk_ids)
+        kept = [
+            (position, doc_id)
+            for position, doc_id in sorted(vectorstore.index_to_docstore_id.items())
+            if doc_id not in stale
+        ]
+        old_index = vectorstore.index
+        vectors = old_index.reconstruct_n(0, old_index.ntotal)[
+            [position for position, _ in kept]
+        ]
+        index = spec.build(old_index.d, vectors)
+        index.add(vectors)
+        vectorstore.index = index
+        vectorstore.index_to_docstore_id = {
+            position: doc_id for position, (_, doc_id) in enumerate(kept)
+        }
+        vectorstore.docstore.delete(list(stale))
+
+    def _load_parents_for_update(self, vectorstore):
+        """
+        Parent store of the persisted index as a {event id: Document} dict.
+        Indexes built before the parent store keep the event payload in every
+        chunk: it is moved to the parent store and the chunks are slimmed.
+        """
+        parents = load_parents(self.index_path, writable=True)
+        if parents is not None:
+            return parents
+        parents = {}
+        for doc_id in vectorstore.index_to_docstore_id.values():
+            chunk = vectorstore.docstore.search(doc_id)
+            event_id = chunk.metadata.get("event_id")
+            if str(event_id) not in parents:
+                parents[str(event_id)] = self._parent(chunk)
+            chunk.metadata = {"event_id": event_id}
+        return parents
+
+    def _apply(self, vectorstore, manifest, documents, removed_ids, spec):
+        """
+        Delete the chunks of removed and changed events, embed and add the
+        chunks of new or changed events, then save index and manifest.
+        """
+        parents = self._load_parents_for_update(vectorstore)
+        replaced = [str(doc.metadata["event_id"]) for doc in documents]
+        stale_chunks = [
+            f"{event_id}#{n}"
+            for event_id in set(removed_ids) | set(replaced)
+            if event_id in manifest
+            for n in range(manifest[event_id]["chunks"])
+        ]
+        # Chunks avant mise à jour : index temporel et BM25 patchés, pas rebâtis
+        stale = set(stale_chunks)
+        previous = [
+            None if doc_id in stale else doc_id
+            for _, doc_id in sorted(vectorstore.index_to_docstore_id.items())
+        ]
+        if stale_chunks:
+            self._remove_chunks(vectorstore, stale_chunks, spec)
+        for event_id in removed_ids:
+            manifest.pop(event_id, None)
+            parents.pop(event_id, None)
+
+        split_docs = []
+        rate = 0.0
+        if documents:
+            split_docs, ids, chunk_counts = self._split(documents)
+            vectors, rate = self._embed_chunks(split_docs)
+            vectorstore.add_embeddings(
+                zip([doc.page_content for doc in split_docs], vectors),
+                metadatas=[doc.metadata for doc in split_docs],
+                ids=ids,
+            )
+            for doc in documents:
+                event_id = str(doc.metadata["event_id"])
+                manifest[event_id] = {
+                    "hash": doc.metadata["content_hash"],
+                    "chunks": chunk_counts.get(event_id, 0),
+                }
+                parents[event_id] = self._parent(doc)
+
+        self._save(vectorstore, manifest, spec, parents, previous)
+        total_chunks = vectorstore.index.ntotal
+        self.stats = {
+            "events": len(manifest),
+            "chunks": total_chunks,
+            "embedded_chunks": len(split_docs),
+            "reused_chunks": total_chunks - len(split_docs),
+            "changed_events": len(documents),
+            "deleted_events": len(removed_ids),
+            "embeddings_per_sec": rate,
+        }
+        return self.stats
+
+    def _load_for_update(self):
+        manifest = self.load_manifest()
+        if not manifest:
+            return None, {}, self.index_spec
+        return self.load_index(writable=True), manifest, self.load_index_spec()
+
+    def upsert_events(self, events):
+        """
+        Add or replace processed events (keyed by their OpenAgenda uid) in the
+        persisted index. Unchanged events (same content hash) are skipped;
+        only the chunks of new or changed events are embedded.
+        """
+        vectorstore, manifest, spec = self._load_for_update()
+        documents = [self._to_document(event) for event in events]
+        if vectorstore is None:
+            if not documents:
+                print(f"Index path {self.index_path} has no manifest, nothing added.")
+                return {}
+            return self._build(documents, spec)
+
+        documents = [
+            doc
+            for doc in documents
+            if manifest.get(str(doc.metadata["event_id"]), {}).get("hash")
+            != doc.metadata["content_hash"]
+        ]
+        return self._apply(vectorstore, manifest, documents, [], spec)
+
+    def delete_events(self, ids):
+        """Remove events (by OpenAgenda uid) and all their chunks from the index."""
+        vectorstore, manifest, spec = self._load_for_update()
+        if vectorstore is None:
+            print(f"Index path {self.index_path} has no manifest, nothing deleted.")
+            return {}
+        removed = [str(event_id) for event_id in ids if str(event_id) in manifest]
+        return self._apply(vectorstore, manifest, [], removed, spec)
+
+    def _build(self, documents, spec):
+        """Build a brand new index of type 'spec' from documents."""
+        split_docs, ids, chunk_counts = self._split(documents)
         print(f"Split {len(documents)} events into {len(split_docs)} chunks.")
 
-        vectorstore = FAISS.from_documents(split_docs, self.embeddings)
-        vectorstore.save_local(self.index_path)
-        print(f"Index created and saved to {self.index_path}")
+        vectors, rate = self._embed_chunks(split_docs)
+        text_embeddings = zip([doc.page_content for doc in split_docs], vectors)
+        metadatas = [doc.metadata for doc in split_docs]
+        if spec.kind == "flat":
+            vectorstore = FAISS.from_embeddings(
+                text_embeddings, self.embeddings, metadatas=metadatas, ids=ids
+            )
+        else:
+            # Index approché : entraîné (IVF) sur les vecteurs du corpus
+            index = spec.build(len(vectors[0]), vectors)
+            vectorstore = FAISS(self.embeddings, index, InMemoryDocstore(), {})
+            vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+        manifest = {
+            str(doc.metadata["event_id"]): {
+                "hash": doc.metadata["content_hash"],
+                "chunks": chunk_counts.get(str(doc.metadata["event_id"]), 0),
+            }
+            for doc in documents
+        }
+        parents = {
+            str(doc.metadata["event_id"]): self._parent(doc) for doc in documents
+        }
+        self._save(vectorstore, manifest, spec, parents)
+        self.stats = {
+            "events": len(manifest),
+            "chunks": len(split_docs),
+            "embedded_chunks": len(split_docs),
+            "reused_chunks": 0,
+            "changed_events": len(manifest),
+            "deleted_events": 0,
+            "embeddings_per_sec": rate,
+        }
+        return self.stats
+
+    def create_index(
+        self,
+        processed_events_file="data/processed_events.json",
+        incremental=True,
+        index_spec=None,
+    ):
+        """
+        Build the FAISS index from the processed events.
+        'index_spec' selects the index type (IndexSpec or its string form,
+        default FAISS_INDEX_SPEC); it is persisted in the manifest.
+        In incremental mode, an existing index of the same type is updated in
+        place: events whose content hash changed are upserted, removed events
+        are deleted, and unchanged events are neither re-embedded nor re-added.
+        """
+        if not os.path.exists(processed_events_file):
+            print(f"File {processed_events_file} not found.")
+            return
+
+        spec = self.index_spec if index_spec is None else IndexSpec.parse(index_spec)
+        vectorstore, manifest = None, {}
+        if incremental:
+            vectorstore, manifest, persisted_spec = self._load_for_update()
+            if vectorstore is not None and persisted_spec != spec:
+                print(f"Index type changed ({persisted_spec} -> {spec}), full rebuild.")
+                vectorstore, manifest = None, {}
 
-    def load_index(self):
+        if vectorstore is None:
+            documents = [
+                self._to_document(event)
+                for event in iter_records(processed_events_file)
+            ]
+            if not documents:
+                print("No documents to index.")
+                return
+            self._build(documents, spec)
+        else:
+            changed = []
+            seen = set()
+            for event in iter_records(processed_events_file):
+                doc = self._to_document(event)
+                event_id = str(event.get("id"))
+                seen.add(event_id)
+                if (
+                    manifest.get(event_id, {}).get("hash")
+                    != doc.metadata["content_hash"]
+                ):
+                    changed.append(doc)
+            removed = [event_id for event_id in manifest if event_id not in seen]
+            self._apply(vectorstore, manifest, changed, removed, spec)
+
+        print(
+            f"Index created and saved to {self.index_path} "
+            f"({self.stats['embedded_chunks']} chunks embedded, "
+            f"{self.stats['reused_chunks']} reused, "
+            f"{self.stats['deleted_events']} events removed)"
+        )
+
+    def load_index(self, writable=False):
+        """
+        Load the persisted index. Read-only loads memory-map the vectors and
+        documents (instant startup, pages shared between workers); 'writable'
+        loads them in memory for in-place updates.
+        """
         if os.path.exists(self.index_path):
-            return FAISS.load_local(
-                self.index_path, self.embeddings, allow_dangerous_deserialization=True
-            )
+            spec = self.load_index_spec()
+            if has_bundle(self.index_path):
+                vectorstore = load_bundle(
+                    self.index_path, self.embeddings, spec.mmap_flags, writable
+                )
+            else:
+                # Index au format LangChain (pickle) antérieur aux bundles
+                vectorstore = FAISS.load_local(
+                    self.index_path,
+                    self.embeddings,
+                    allow_dangerous_deserialization=True,
+                )
+            # Paramètres de recherche (nprobe, efSearch) du type d'index persisté
+            spec.configure(vectorstore.index)
+            return vectorstore
 
         print(f"Index path {self.index_path} does not exist.")
         return None
 
+    def load_time_index(self):
+        """Session time index of the persisted index (None for older indexes)."""
+        return TimeIndex.load(self.index_path)
+
+    def load_parents(self):
+        """
+        Parent store (event id -> Document with the full context) of the
+        persisted index, memory-mapped; None for older indexes.
+        """
+        return load_parents(self.index_path)
+
+    def load_lexical_index(self):
+        """BM25 index of the persisted index (None for older indexes)."""
+        return LexicalIndex.load(self.index_path)
+
 
 if __name__ == "__main__":
     manager = VectorStoreManager()
@@ -1,3 +1,4 @@
+import json
 import streamlit as st
 import requests
 import pandas as pd
@@ -10,6 +11,29 @@ st.set_page_config(page_title="Puls-Events Assistant", page_icon="🎭", layout=
 # API Configuration
 API_URL = "http://localhost:8000"
 
+
+def stream_answer(question):
+    """Tokens de /ask/stream (server-sent events), au fil de la génération."""
+    with requests.post(
+        f"{API_URL}/ask/stream", json={"question": question}, stream=True, timeout=120
+    ) as response:
+        if response.status_code != 200:
+            raise RuntimeError(f"Erreur API: {response.status_code} - {response.text}")
+        event = None
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                event = None
+            elif line.startswith("event:"):
+                event = line[len("event:") :].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[len("data:") :])
+                if event == "error":
+                    raise RuntimeError(f"Erreur API: {data['detail']}")
+                if event == "done":
+                    return
+                yield data["token"]
+
+
 # Header
 st.title("🎭 Culture IA - Assistant Puls-Events")
 st.markdown("---")
@@ -35,27 +59,19 @@ with tab1:
         st.chat_message("user").markdown(prompt)
         st.session_state.messages.append({"role": "user", "content": prompt})
 
-        # Appel API
+        # Appel API en streaming : la réponse s'affiche dès le premier token
         with st.chat_message("assistant"):
             try:
-                with st.spinner("Recherche en cours..."):
-                    response = requests.post(
-                        f"{API_URL}/ask", json={"question": prompt}
-                    )
-                    if response.status_code == 200:
-                        answer = response.json()["answer"]
-                        st.markdown(answer)
-                        st.session_state.messages.append(
-                            {"role": "assistant", "content": answer}
-                        )
-                    else:
-                        error_msg = (
-                            f"Erreur API: {response.status_code} - {response.text}"
-                        )
-                        st.error(error_msg)
-                        st.session_state.messages.append(
-                            {"role": "assistant", "content": error_msg}
-                        )
+                answer = st.write_stream(stream_answer(prompt))
+                st.session_state.messages.append(
+                    {"role": "assistant", "content": answer}
+                )
+            except RuntimeError as e:
+                error_msg = str(e)
+                st.error(error_msg)
+                st.session_state.messages.append(
+                    {"role": "assistant", "content": error_msg}
+                )
             except requests.exceptions.ConnectionError:
                 st.error(
                     "❌ Impossible de contacter l'API. Vérifiez qu'elle est bien lancée."
@@ -1,6 +1,27 @@
-import json
 import os
+import time
+import locale
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+import numpy as np
+from src.storage import iter_records, record_hash, write_records
+from src.timings import BEGIN, END, encode_sessions, event_sessions, session_datetime
+
+
+def _init_worker(lc_time):
+    """Reproduce the parent LC_TIME in workers (French day/month names)."""
+    try:
+        locale.setlocale(locale.LC_TIME, lc_time)
+    except locale.Error:
+        pass
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
 
 
 class EventProcessor:
@@ -8,35 +29,28 @@ class EventProcessor:
         self,
         input_file="data/raw_events.json",
         output_file="data/processed_events.json",
+        workers=None,
+        chunk_size=500,
+        incremental=True,
     ):
         self.input_file = input_file
         self.output_file = output_file
+        # 1 = traitement séquentiel, 0 = un worker par cœur
+        if workers is None:
+            workers = int(os.getenv("PROCESSOR_WORKERS", "1"))
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        # Réutilise les enregistrements du précédent store si l'événement brut
+        # n'a pas changé (le store de sortie sert de manifeste)
+        self.incremental = incremental
+        self.stats = {}
 
-    def _parse_timings(self, timings):
-        """Parse timings to extract formatted dates and timestamps."""
-        timestamps = []
-        dates_objects = []
-        now = datetime.now().astimezone()
-
-        for timing in timings:
-            try:
-                begin_str = timing.get("begin")
-                end_str = timing.get("end")
-                if begin_str and end_str:
-                    dt_begin = datetime.fromisoformat(begin_str)
-                    dt_end = datetime.fromisoformat(end_str)
-                    timestamps.append(dt_begin.timestamp())
-                    timestamps.append(dt_end.timestamp())
-                    dates_objects.append(dt_begin)
-            except (ValueError, TypeError):
-                continue
-
-        # Tri chronologique absolu
-        dates_objects.sort()
-
-        # Séparation Passé / Futur
-        future_dates = [d for d in dates_objects if d >= now]
-        past_dates = [d for d in dates_objects if d < now]
+    def _parse_timings(self, sessions):
+        """Format a sorted sessions array (see src.timings) into date strings."""
+        # Séparation Passé / Futur (débuts triés : une recherche dichotomique)
+        split = int(np.searchsorted(sessions[:, BEGIN], time.time(), side="left"))
+        future_dates = [session_datetime(b, o) for b, _, o in sessions[split:]]
+        past_dates = [session_datetime(b, o) for b, _, o in sessions[:split]]
 
         formatted_parts = []
         next_dates_str = ""
@@ -58,9 +72,9 @@ class EventProcessor:
 
         # Si aucune date n'est trouvée
         if not formatted_parts:
-            return ["Date non spécifiée"], timestamps, ""
+            return ["Date non spécifiée"], ""
 
-        return formatted_parts, timestamps, next_dates_str
+        return formatted_parts, next_dates_str
 
     def _create_metadata(
         self,
@@ -71,15 +85,19 @@ class EventProcessor:
         description,
         keywords,
         url,
-        timestamps,
+        sessions,
         full_dates_str,
         next_dates_short_str,
     ):
         """Create metadata dictionary and search text."""
+        bounds = sessions[:, [BEGIN, END]]
+        start_ts = float(bounds.min()) if len(sessions) else 0
+        end_ts = float(bounds.max()) if len(sessions) else 0
+
         # Résumé des dates pour le vecteur (Recherche sémantique)
-        if timestamps:
-            min_date = datetime.fromtimestamp(min(timestamps)).strftime("%d/%m/%Y")
-            max_date = datetime.fromtimestamp(max(timestamps)).strftime("%d/%m/%Y")
+        if len(sessions):
+            min_date = datetime.fromtimestamp(start_ts).strftime("%d/%m/%Y")
+            max_date = datetime.fromtimestamp(end_ts).strftime("%d/%m/%Y")
             summary_dates_str = (
                 f"Événement du {min_date} au {max_date}. {next_dates_short_str}"
             )
@@ -87,8 +105,6 @@ class EventProcessor:
             summary_dates_str = "Date non spécifiée"
 
         # Métadonnées structurées
-        start_ts = min(timestamps) if timestamps else 0
-        end_ts = max(timestamps) if timestamps else 0
         city = location.get("city", "Inconnu")
 
         # 1. Search Text (Optimisé pour la recherche vectorielle)
@@ -118,7 +134,7 @@ class EventProcessor:
             "city": city,
             "start_ts": start_ts,
             "end_ts": end_ts,
-            "all_sessions_ts": timestamps,
+            "sessions_ts": encode_sessions(sessions),
             "full_context": full_context,
         }
 
@@ -127,65 +143,143 @@ class EventProcessor:
             print(f"Input file {self.input_file} not found.")
             return
 
-        with open(self.input_file, "r", encoding="utf-8") as f:
-            events = json.load(f)
-
-        processed_events = []
-        for event in events:
-            # Basic extraction
-            title = event.get("title", {}).get("fr", "Sans titre")
-            description = event.get("longDescription", {}).get("fr") or event.get(
-                "description", {}
-            ).get("fr", "")
-
-            location = event.get("location", {})
-            location_str = (
-                f"{location.get('name', '')}, {location.get('address', '')}, "
-                f"{location.get('city', '')} {location.get('postalCode', '')}"
-            ).strip(", ")
-
-            keywords = ", ".join(event.get("keywords", {}).get("fr", []))
-            url = event.get("canonicalUrl", "")
-
-            # Extraction des dates via helper
-            dates_list, timestamps, next_dates_short_str = self._parse_timings(
-                event.get("timings", [])
-            )
+        previous = {}
+        if self.incremental and os.path.exists(self.output_file):
+            previous = {r.get("id"): r for r in iter_records(self.output_file)}
 
-            full_dates_str = (
-                "\n".join(dates_list) if dates_list else "Date non spécifiée"
-            )
+        items = (
+            (event, previous.get(event.get("uid")))
+            for event in iter_records(self.input_file)
+        )
+        if self.workers > 1:
+            processed = self._iter_processed_parallel(items)
+        else:
+            processed = (self._process_event(*item) for item in items)
 
-            # Création des métadonnées et du texte de recherche
-            search_text, metadata = self._create_metadata(
-                event,
-                location,
-                location_str,
-                title,
-                description,
-                keywords,
-                url,
-                timestamps,
-                full_dates_str,
-                next_dates_short_str,
-            )
+        changes = {"new": 0, "changed": 0, "unchanged": 0}
+        start = time.perf_counter()
+        count = write_records(
+            self.output_file, self._track_changes(processed, previous, changes)
+        )
+        elapsed = time.perf_counter() - start
+
+        self.stats = {
+            "events": count,
+            "seconds": elapsed,
+            "events_per_sec": count / elapsed if elapsed > 0 else 0.0,
+            "workers": self.workers,
+            **changes,
+            "deleted": len(previous),
+        }
+        print(
+            f"Processed {count} events and saved to {self.output_file} "
+            f"({self.stats['events_per_sec']:.0f} événements/s, "
+            f"{self.workers} worker(s)) : {changes['new']} nouveaux, "
+            f"{changes['changed']} modifiés, {changes['unchanged']} inchangés, "
+            f"{len(previous)} supprimés"
+        )
 
-            processed_events.append(
-                {
-                    "id": event.get("uid"),
-                    "text": search_text,
-                    "metadata": metadata,
-                }
+    @staticmethod
+    def _track_changes(records, previous, changes):
+        """Count new/changed/unchanged records; leftovers in 'previous' are deleted."""
+        for record in records:
+            old = previous.pop(record["id"], None)
+            if old is None:
+                changes["new"] += 1
+            elif old.get("hash") == record["hash"]:
+                changes["unchanged"] += 1
+            else:
+                changes["changed"] += 1
+            yield record
+
+    def _process_event(self, event, previous=None):
+        """
+        Transform a raw OpenAgenda event into an indexable record carrying a
+        content hash of its text and metadata. 'previous' (the record of the
+        last run) is reused as is while the raw event is unchanged and none of
+        its sessions has moved from "upcoming" to "past" since.
+        """
+        raw_hash = record_hash(event)
+        if (
+            previous
+            and previous.get("raw_hash") == raw_hash
+            and (
+                previous.get("valid_until") is None
+                or previous["valid_until"] > time.time()
             )
+        ):
+            return previous
 
-        os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
-        with open(self.output_file, "w", encoding="utf-8") as f:
-            json.dump(processed_events, f, ensure_ascii=False, indent=4)
+        # Basic extraction
+        title = event.get("title", {}).get("fr", "Sans titre")
+        description = event.get("longDescription", {}).get("fr") or event.get(
+            "description", {}
+        ).get("fr", "")
 
-        print(
-            f"Processed {len(processed_events)} events and saved to {self.output_file}"
+        location = event.get("location", {})
+        location_str = (
+            f"{location.get('name', '')}, {location.get('address', '')}, "
+            f"{location.get('city', '')} {location.get('postalCode', '')}"
+        ).strip(", ")
+
+        keywords = ", ".join(event.get("keywords", {}).get("fr", []))
+        url = event.get("canonicalUrl", "")
+
+        # Extraction des dates via helper (sessions parsées une fois par événement)
+        sessions = event_sessions(event)
+        dates_list, next_dates_short_str = self._parse_timings(sessions)
+
+        full_dates_str = "\n".join(dates_list) if dates_list else "Date non spécifiée"
+
+        # Création des métadonnées et du texte de recherche
+        search_text, metadata = self._create_metadata(
+            event,
+            location,
+            location_str,
+            title,
+            description,
+            keywords,
+            url,
+            sessions,
+            full_dates_str,
+            next_dates_short_str,
         )
 
+        # Le texte dépend de "maintenant" (sessions à venir / archives) :
+        # l'enregistrement reste valable jusqu'au début de la prochaine session
+        upcoming = sessions[sessions[:, BEGIN] >= time.time(), BEGIN]
+
+        return {
+            "id": event.get("uid"),
+            "text": search_text,
+            "metadata": metadata,
+            "hash": record_hash({"text": search_text, "metadata": metadata}),
+            "raw_hash": raw_hash,
+            "valid_until": float(upcoming[0]) if len(upcoming) else None,
+        }
+
+    def _process_chunk(self, chunk):
+        return [self._process_event(*item) for item in chunk]
+
+    def _iter_processed_parallel(self, items):
+        """
+        Transform the (event, previous record) stream in a process pool.
+        At most 2 chunks per worker are in flight, and results are yielded in
+        input order so the output store keeps the raw store ordering.
+        """
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(locale.setlocale(locale.LC_TIME),),
+        ) as pool:
+            pending = deque()
+            for chunk in _chunked(items, self.chunk_size):
+                pending.append(pool.submit(self._process_chunk, chunk))
+                if len(pending) >= self.workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
 
 if __name__ == "__main__":
     processor = EventProcessor()
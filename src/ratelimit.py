@@ -0,0 +1,25 @@
+import time
+import threading
+
+
+class RateLimiter:
+    """
+    Thread-safe global rate limit: at most 'rate' units per second.
+    A unit is a request by default; wait(weight) reserves several units at
+    once (e.g. the estimated tokens of an embedding batch).
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self, weight=1):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval * weight
+        if slot > now:
+            time.sleep(slot - now)
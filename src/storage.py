@@ -0,0 +1,81 @@
+import os
+import json
+import gzip
+import hashlib
+
+try:
+    import zstandard
+except ImportError:  # Dépendance optionnelle (stores .zst)
+    zstandard = None
+
+
+def _open_text(path, mode):
+    """Open a store in text mode, compressed according to its suffix (.gz/.zst)."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError(
+                "zstandard is required for .zst stores: pip install zstandard"
+            )
+        return zstandard.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def iter_records(path):
+    """
+    Yield the records of an event store one at a time.
+    Reads NDJSON line by line; stores written before the NDJSON format
+    (a single JSON array) are still supported, at the cost of a full load.
+    """
+    with _open_text(path, "r") as f:
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+
+        if head == "[":
+            # Format legacy : tableau JSON monolithique
+            yield from json.loads(head + f.read())
+            return
+
+        first_line = head + f.readline()
+        if first_line.strip():
+            yield json.loads(first_line)
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_records(path, records):
+    """
+    Write records (list or stream) as NDJSON, one compact JSON object per line.
+    The store is written to a temporary file then atomically swapped in, so it
+    is safe to stream from the previous version of the same store.
+    Returns the number of records written.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Le suffixe de compression est conservé pour le fichier temporaire
+    tmp_path = os.path.join(directory, f".tmp.{os.path.basename(path)}")
+    count = 0
+    try:
+        with _open_text(tmp_path, "w") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+                count += 1
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return count
+
+
+def record_hash(record):
+    """Stable SHA-256 of a JSON-serialisable record (key order independent)."""
+    payload = json.dumps(
+        record, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
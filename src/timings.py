@@ -0,0 +1,92 @@
+import base64
+from datetime import datetime, timedelta, timezone
+import numpy as np
+
+# Colonnes d'une session : début, fin (timestamps UTC) et décalage UTC du début
+BEGIN, END, OFFSET = 0, 1, 2
+_EMPTY = np.empty((0, 3), dtype=np.float64)
+
+
+def parse_iso(value):
+    """Parse an ISO 8601 date (with 'Z' or offset) into (timestamp, utc_offset)."""
+    # Handle Z for UTC if present (Python 3.10 compatibility)
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp(), dt.utcoffset().total_seconds()
+
+
+def parse_timings(timings):
+    """
+    Parse OpenAgenda timings once into a (n, 3) float64 array of
+    (begin_ts, end_ts, begin_utc_offset), sorted by begin.
+    A timing without 'end' or with an invalid date is skipped; a missing
+    'begin' falls back to 'end'.
+    """
+    rows = []
+    for timing in timings or []:
+        try:
+            end_str = timing.get("end")
+            if not end_str:
+                continue
+            begin_str = timing.get("begin") or end_str
+            begin_ts, offset = parse_iso(begin_str)
+            end_ts, _ = parse_iso(end_str)
+            rows.append((begin_ts, end_ts, offset))
+        except (ValueError, TypeError, AttributeError):
+            continue
+
+    if not rows:
+        return _EMPTY
+    sessions = np.array(rows, dtype=np.float64)
+    return sessions[np.argsort(sessions[:, BEGIN], kind="stable")]
+
+
+def event_sessions(event):
+    """
+    Sessions array of a raw event. The raw event is left untouched: the
+    encoded sessions are only stored in the processed record.
+    """
+    return parse_timings(event.get("timings", []))
+
+
+def encode_sessions(sessions):
+    """Compact, JSON-friendly encoding of a sessions array (base64 float64)."""
+    return base64.b64encode(np.ascontiguousarray(sessions).tobytes()).decode("ascii")
+
+
+def decode_sessions(value):
+    """
+    Decode encode_sessions() output. Also accepts the legacy 'all_sessions_ts'
+    list of interleaved begin/end timestamps found in older indexes.
+    """
+    if value is None or len(value) == 0:
+        return _EMPTY
+    if isinstance(value, str):
+        return np.frombuffer(base64.b64decode(value), dtype=np.float64).reshape(-1, 3)
+    if isinstance(value, np.ndarray):
+        return value
+
+    pairs = np.asarray(value, dtype=np.float64)
+    pairs = pairs[: len(pairs) // 2 * 2].reshape(-1, 2)
+    sessions = np.column_stack([pairs, np.zeros(len(pairs))])
+    return sessions[np.argsort(sessions[:, BEGIN], kind="stable")]
+
+
+def session_datetime(ts, offset):
+    """Aware datetime of a session bound, in the event's own UTC offset."""
+    return datetime.fromtimestamp(ts, timezone(timedelta(seconds=offset)))
+
+
+def ends_after(sessions, cutoff_ts):
+    """True if at least one session ends at or after cutoff_ts."""
+    return bool(len(sessions)) and bool(sessions[:, END].max() >= cutoff_ts)
+
+
+def overlaps(sessions, start_ts, end_ts):
+    """
+    True if at least one session overlaps [start_ts, end_ts].
+    Begins are sorted: only sessions starting before end_ts are compared.
+    """
+    candidates = np.searchsorted(sessions[:, BEGIN], end_ts, side="right")
+    return bool(np.any(sessions[:candidates, END] >= start_ts))
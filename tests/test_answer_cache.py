@@ -0,0 +1,212 @@
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from src.bench.semantic_cache_bench import evaluate_pairs
+from src.core.answer_cache import (
+    AnswerCache,
+    SemanticAnswerCache,
+    date_bucket,
+    normalize_question,
+)
+from src.core.rag_chain import RAGChain
+
+
+def test_normalize_and_date_bucket():
+    """Test la normalisation des questions et les buckets de dates."""
+    assert normalize_question("  Que faire   CE week-end ? ") == "que faire ce week-end"
+
+    tomorrow = {"type": "day", "start_ts": 100.0, "end_ts": 200.0}
+    today = date(2025, 12, 22)
+    assert date_bucket(tomorrow, today) == date_bucket(dict(tomorrow), today)
+    # "demain" change de sens à minuit
+    assert date_bucket(tomorrow, today) != date_bucket(tomorrow, date(2025, 12, 23))
+    # "Tout le futur" démarre à l'instant présent : regroupé par jour
+    assert date_bucket({"type": "any_future", "start_ts": 1.0}, today) == date_bucket(
+        {"type": "any_future", "start_ts": 2.0}, today
+    )
+
+
+def test_lru_ttl_and_invalidation():
+    """Test l'éviction LRU, l'expiration et l'invalidation par version d'index."""
+    cache = AnswerCache(max_entries=2, ttl=60)
+    cache.bind("v1")
+    with patch("src.core.answer_cache.time.monotonic", return_value=0):
+        cache.put("a", "A")
+        cache.put("b", "B")
+        assert cache.get("a") == "A"
+        cache.put("c", "C")  # "b" est le moins récemment utilisé
+        assert cache.get("b") is None
+    with patch("src.core.answer_cache.time.monotonic", return_value=61):
+        assert cache.get("a") is None
+
+    assert cache.summary()["hits"] == 1
+    assert cache.hit_rate == 1 / 3
+
+    cache.put("d", "D")
+    cache.bind("v1")
+    assert cache.get("d") == "D"
+    cache.bind("v2")
+    assert cache.get("d") is None
+    assert cache.stats["invalidations"] == 1
+
+
+@patch("src.core.rag_chain.VectorStoreManager")
+@patch("src.core.rag_chain.ChatMistralAI")
+def test_rag_chain_ask_uses_answer_cache(mock_llm, mock_vector_mgr):
+    """Test qu'une question répétée ne relance pas la chaîne, jusqu'au nouvel index."""
+    # pylint: disable=unused-argument
+    manager = mock_vector_mgr.return_value
+    manager.load_index.return_value = MagicMock()
+    manager.load_index_version.return_value = "v1"
+    cache = AnswerCache()
+
+    rag = RAGChain(answer_cache=cache)
+    rag.chain = MagicMock()
+    rag.chain.invoke.return_value = "Réponse"
+
+    assert rag.ask("Que faire ce week-end ?") == "Réponse"
+    assert rag.ask("que faire ce week-end") == "Réponse"
+    assert rag.chain.invoke.call_count == 1
+    assert cache.hit_rate == 0.5
+
+    # Reconstruction : nouvel index, nouvelle chaîne, même cache
+    manager.load_index_version.return_value = "v2"
+    rebuilt = RAGChain(answer_cache=cache)
+    rebuilt.chain = MagicMock()
+    rebuilt.chain.invoke.return_value = "Nouvelle réponse"
+    assert rebuilt.ask("Que faire ce week-end ?") == "Nouvelle réponse"
+
+
+def test_semantic_cache_threshold_bucket_and_eviction():
+    """Test le seuil de similarité, le bucket de dates et l'éviction bornée."""
+    cache = SemanticAnswerCache(max_entries=2, threshold=0.9)
+    cache.bind("v1")
+    cache.put([1.0, 0.0], "weekend", "Réponse week-end")
+
+    assert cache.get([0.95, 0.1], "weekend") == "Réponse week-end"
+    assert cache.get([0.95, 0.1], "demain") is None  # Autre plage de dates
+    assert cache.get([0.5, 0.5], "weekend") is None  # Trop éloignée
+
+    cache.put([0.0, 1.0], "demain", "Réponse demain")
+    cache.get([1.0, 0.0], "weekend")  # "weekend" devient le plus récent
+    cache.put([0.7, 0.7], "mois", "Réponse mois")
+    assert len(cache) == 2
+    assert cache.get([0.0, 1.0], "demain") is None
+    assert cache.get([1.0, 0.0], "weekend") == "Réponse week-end"
+
+    cache.bind("v2")
+    assert cache.get([1.0, 0.0], "weekend") is None
+
+
+@patch("src.core.rag_chain.VectorStoreManager")
+@patch("src.core.rag_chain.ChatMistralAI")
+def test_rag_chain_serves_topical_paraphrase_from_semantic_cache(
+    mock_llm, mock_vector_mgr
+):
+    """Test qu'une reformulation thématique de même plage réutilise la réponse."""
+    # pylint: disable=unused-argument
+    manager = mock_vector_mgr.return_value
+    vectorstore = MagicMock()
+    vectors = {
+        "Des concerts ce weekend ?": [1.0, 0.0],
+        "Y a-t-il des concerts ce week-end ?": [0.98, 0.05],
+        "Des concerts le mois prochain ?": [0.98, 0.05],
+    }
+    vectorstore.embeddings.embed_query.side_effect = vectors.get
+    manager.load_index.return_value = vectorstore
+    manager.load_index_version.return_value = "v1"
+
+    rag = RAGChain(
+        answer_cache=AnswerCache(),
+        semantic_cache=SemanticAnswerCache(threshold=0.95),
+    )
+    rag.chain = MagicMock()
+    rag.chain.invoke.return_value = "Réponse"
+
+    rag.ask("Des concerts ce weekend ?")
+    assert rag.ask("Y a-t-il des concerts ce week-end ?") == "Réponse"
+    assert rag.chain.invoke.call_count == 1
+    # Même embedding mais autre plage de dates : la chaîne est relancée
+    rag.ask("Des concerts le mois prochain ?")
+    assert rag.chain.invoke.call_count == 2
+
+
+@patch("src.core.rag_chain.VectorStoreManager")
+@patch("src.core.rag_chain.ChatMistralAI")
+def test_rag_chain_serves_paraphrase_from_semantic_cache(mock_llm, mock_vector_mgr):
+    """Test qu'une reformulation de même plage de dates réutilise la réponse."""
+    # pylint: disable=unused-argument
+    manager = mock_vector_mgr.return_value
+    vectorstore = MagicMock()
+    manager.load_index.return_value = vectorstore
+    manager.load_index_version.return_value = "v1"
+
+    rag = RAGChain(
+        answer_cache=AnswerCache(),
+        semantic_cache=SemanticAnswerCache(threshold=0.95),
+    )
+    rag.chain = MagicMock()
+    rag.chain.invoke.return_value = "Réponse"
+
+    rag.ask("Qu'y a-t-il ce weekend ?")
+    assert rag.ask("Des sorties ce week-end ?") == "Réponse"
+    assert rag.chain.invoke.call_count == 1
+    # Autre plage de dates : la chaîne est relancée
+    rag.ask("Des sorties le mois prochain ?")
+    assert rag.chain.invoke.call_count == 2
+    # Clé du cache exact sur la plage de dates : aucun embedding
+    vectorstore.embeddings.embed_query.assert_not_called()
+
+
+def test_evaluate_false_hits():
+    """Test l'évaluation hors ligne : faux succès comptés parmi les succès."""
+    vectors = {
+        "Des concerts ce week-end ?": [1.0, 0.0],
+        "Y a-t-il des concerts ce weekend ?": [0.99, 0.1],
+        "Des expositions ce week-end ?": [0.96, 0.28],
+        "Des concerts demain ?": [1.0, 0.0],
+        # Questions temporelles : servies sur la plage, quelle que soit la similarité
+        "Qu'y a-t-il ce weekend ?": [1.0, 0.0],
+        "Des sorties ce week-end ?": [0.0, 1.0],
+    }
+    embeddings = MagicMock()
+    embeddings.embed_documents.side_effect = lambda texts: [vectors[t] for t in texts]
+    pairs = [
+        {
+            "cached": "Des concerts ce week-end ?",
+            "query": "Y a-t-il des concerts ce weekend ?",
+            "same_answer": True,
+        },
+        {
+            "cached": "Des concerts ce week-end ?",
+            "query": "Des expositions ce week-end ?",
+            "same_answer": False,
+        },
+        {
+            "cached": "Des concerts ce week-end ?",
+            "query": "Des concerts demain ?",
+            "same_answer": False,
+        },
+        {
+            "cached": "Qu'y a-t-il ce weekend ?",
+            "query": "Des sorties ce week-end ?",
+            "same_answer": True,
+        },
+        {
+            "cached": "Qu'y a-t-il ce weekend ?",
+            "query": "Des concerts ce week-end ?",
+            "same_answer": False,
+        },
+    ]
+
+    result = evaluate_pairs(embeddings, pairs, thresholds=(0.9, 0.98))
+
+    # 0.9 : la question sur les expositions est un faux succès ; "demain" est
+    # écarté par le bucket de dates, la question thématique face à la question
+    # temporelle par la règle _has_topic, malgré une similarité de 1
+    assert result["thresholds"]["0.9"] == {
+        "paraphrase_hit_rate": 1.0,
+        "false_hit_rate": 0.3333,
+        "false_hits": 1,
+    }
+    assert result["thresholds"]["0.98"]["false_hits"] == 0
@@ -1,7 +1,7 @@
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 import pytest
 from fastapi.testclient import TestClient
-from src.api.app import app
+from src.api.app import answer_cache, app
 
 # On doit mocker RAGChain avant que app ne soit importé/utilisé si possible,
 # mais comme TestClient charge app, le module est déjà exécuté.
@@ -22,13 +22,13 @@ def test_read_root(api_client):
 @patch("src.api.app.rag_chain")
 def test_ask_question_nominal(mock_rag, api_client):
     """Test nominal de /ask."""
-    mock_rag.ask.return_value = "Réponse mockée"
+    mock_rag.aask = AsyncMock(return_value="Réponse mockée")
 
     response = api_client.post("/ask", json={"question": "Test"})
 
     assert response.status_code == 200
     assert response.json() == {"answer": "Réponse mockée"}
-    mock_rag.ask.assert_called_with("Test")
+    mock_rag.aask.assert_awaited_with("Test")
 
 
 def test_ask_question_empty(api_client):
@@ -52,7 +52,7 @@ def test_ask_rag_not_initialized(mock_rag, api_client):
 @patch("src.api.app.rag_chain")
 def test_ask_internal_error(mock_rag, api_client):
     """Test erreur 500 si le RAG plante."""
-    mock_rag.ask.side_effect = Exception("Boom")
+    mock_rag.aask = AsyncMock(side_effect=Exception("Boom"))
 
     response = api_client.post("/ask", json={"question": "Test"})
     assert response.status_code == 500
@@ -68,7 +68,7 @@ def test_rebuild_index(mock_rag_cls, mock_vector, mock_proc, mock_coll, api_clie
 
     # Setup mocks
     mock_collector = mock_coll.return_value
-    mock_collector.fetch_events.return_value = []
+    mock_collector.sync.return_value = {"mode": "delta"}
 
     response = api_client.post("/rebuild")
 
@@ -76,12 +76,12 @@ def test_rebuild_index(mock_rag_cls, mock_vector, mock_proc, mock_coll, api_clie
     assert "reconstruit avec succès" in response.json()["message"]
 
     # Vérifie que toute la chaîne a été appelée
-    mock_collector.fetch_events.assert_called_once()
-    mock_collector.save_to_json.assert_called()
+    mock_collector.sync.assert_called_once_with(full=False)
     mock_proc.return_value.process.assert_called_once()
     mock_vector.return_value.create_index.assert_called_once()
-    # Vérifie que RAGChain a été réinstancié
+    # Vérifie que RAGChain a été réinstancié, avec le cache de réponses partagé
     mock_rag_cls.assert_called()
+    assert mock_rag_cls.call_args.kwargs["answer_cache"] is answer_cache
 
 
 @patch("src.api.app.OpenAgendaCollector")
@@ -92,3 +92,92 @@ def test_rebuild_index_error(mock_coll, api_client):
     response = api_client.post("/rebuild")
     assert response.status_code == 500
     assert "Rebuild fail" in response.json()["detail"]
+
+
+@patch("src.api.app.OpenAgendaCollector")
+@patch("src.api.app.EventProcessor")
+@patch("src.api.app.rag_chain")
+def test_rebuild_index_not_modified(mock_rag, mock_proc, mock_coll, api_client):
+    """Test que /rebuild saute traitement et indexation si rien n'a changé."""
+    # pylint: disable=unused-argument
+    mock_coll.return_value.sync.return_value = {"mode": "not_modified"}
+
+    response = api_client.post("/rebuild")
+
+    assert response.status_code == 200
+    assert "index conservé" in response.json()["message"]
+    mock_proc.return_value.process.assert_not_called()
+
+
+def test_cache_stats(api_client):
+    """Test l'exposition des statistiques du cache de réponses."""
+    response = api_client.get("/cache")
+    assert response.status_code == 200
+    for level in ("exact", "semantic"):
+        assert {"hits", "misses", "hit_rate", "size"} <= response.json()[level].keys()
+
+
+@patch("src.api.app.rag_chain")
+def test_ask_stream(mock_rag, api_client):
+    """Test du flux server-sent events de /ask/stream."""
+
+    async def tokens(_):
+        for token in ["Un concert", "\nsamedi"]:
+            yield token
+
+    mock_rag.astream.side_effect = tokens
+
+    response = api_client.post("/ask/stream", json={"question": "Test"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == (
+        'data: {"token": "Un concert"}\n\n'
+        'data: {"token": "\\nsamedi"}\n\n'
+        "event: done\ndata: {}\n\n"
+    )
+
+
+@patch("src.api.app.rag_chain")
+def test_ask_stream_error(mock_rag, api_client):
+    """Test qu'une erreur pendant la génération est signalée dans le flux."""
+
+    async def failing(_):
+        yield "Début"
+        raise RuntimeError("Boom")
+
+    mock_rag.astream.side_effect = failing
+
+    response = api_client.post("/ask/stream", json={"question": "Test"})
+
+    assert response.status_code == 200
+    assert response.text.endswith('event: error\ndata: {"detail": "Boom"}\n\n')
+    assert api_client.post("/ask/stream", json={"question": " "}).status_code == 400
+
+
+@patch("src.api.app.rag_chain")
+def test_ask_batch(mock_rag, api_client):
+    """Test /ask/batch : réponses dans l'ordre, erreurs par question."""
+    mock_rag.aask_many = AsyncMock(return_value=["Réponse A", RuntimeError("LLM")])
+
+    response = api_client.post(
+        "/ask/batch", json={"questions": ["Question A", " ", "Question B"]}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "results": [
+            {"answer": "Réponse A", "error": None},
+            {"answer": None, "error": "La question ne peut pas être vide."},
+            {"answer": None, "error": "LLM"},
+        ]
+    }
+    mock_rag.aask_many.assert_awaited_with(["Question A", "Question B"])
+
+
+@patch("src.api.app.ASK_BATCH_MAX_SIZE", 2)
+def test_ask_batch_size_limits(api_client):
+    """Test les lots vides ou trop grands."""
+    assert api_client.post("/ask/batch", json={"questions": []}).status_code == 400
+    response = api_client.post("/ask/batch", json={"questions": ["a", "b", "c"]})
+    assert response.status_code == 413
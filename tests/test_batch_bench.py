@@ -0,0 +1,23 @@
+from unittest.mock import MagicMock, patch
+
+from src.bench.batch_bench import DEFAULT_QUESTIONS, run_benchmark
+from src.core.rag_chain import RAGChain
+
+
+@patch("src.core.rag_chain.VectorStoreManager")
+@patch("src.core.rag_chain.ChatMistralAI")
+def test_batch_is_faster_than_serial(mock_llm, mock_vector_mgr):
+    """Test que ask_many lance les appels LLM en parallèle, dans la limite fixée."""
+    # pylint: disable=unused-argument
+    manager = mock_vector_mgr.return_value
+    manager.load_index.return_value = MagicMock()
+    manager.load_time_index.return_value = None
+    manager.load_parents.return_value = None
+    rag = RAGChain()
+    rag.retriever.invoke.return_value = []
+
+    result = run_benchmark(rag, DEFAULT_QUESTIONS[:8], latency=0.1, max_concurrency=4)
+
+    assert result["errors"] == 0
+    assert result["serial_peak_in_flight"] == 1
+    assert 1 < result["batch_peak_in_flight"] <= 4
@@ -1,8 +1,10 @@
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta, timezone
-from src.collector import OpenAgendaCollector
+import pytest
+from src.collector import OpenAgendaCollector, RateLimiter
+from src.storage import iter_records
 
 
 # Données simulées pour le filtrage
@@ -35,8 +37,9 @@ def test_fetch_events_api_call():
     """Test fetch_events avec un appel API simulé."""
     # Désactiver le mock data s'il est actif dans l'env global
     with patch.dict(os.environ, {"MOCK_DATA": "false"}), patch(
-        "src.collector.requests.get"
-    ) as mock_get:
+        "src.collector.requests.Session"
+    ) as mock_session:
+        mock_get = mock_session.return_value.get
 
         # Setup du mock response
         mock_response = MagicMock()
@@ -61,12 +64,41 @@ def test_fetch_events_api_call():
         assert params["limit"] == 100
 
 
+def test_iter_events_follows_after_cursor():
+    """Test la pagination v2 via le curseur 'after'."""
+    with patch.dict(os.environ, {"MOCK_DATA": "false"}), patch(
+        "src.collector.requests.Session"
+    ) as mock_session:
+        mock_get = mock_session.return_value.get
+
+        page1 = MagicMock()
+        page1.json.return_value = {"events": [{"uid": 1}, {"uid": 2}], "after": [2]}
+        page2 = MagicMock()
+        page2.json.return_value = {"events": [{"uid": 3}], "after": None}
+        mock_get.side_effect = [page1, page2]
+
+        collector = OpenAgendaCollector(api_key="test_key")
+        stream = collector.iter_events()
+
+        # Le générateur ne fait aucun appel avant d'être consommé
+        mock_get.assert_not_called()
+        uids = [e["uid"] for e in stream]
+
+        assert uids == [1, 2, 3]
+        assert mock_get.call_count == 2
+        first_params = mock_get.call_args_list[0].kwargs["params"]
+        second_params = mock_get.call_args_list[1].kwargs["params"]
+        assert "after[]" not in first_params
+        assert second_params["after[]"] == [2]
+
+
 def test_fetch_events_legacy_call():
     """Test fetch_events sans API key (mode legacy)."""
     # On vide OPENAGENDA_API_KEY en plus de désactiver MOCK_DATA
     with patch.dict(
         os.environ, {"MOCK_DATA": "false", "OPENAGENDA_API_KEY": ""}
-    ), patch("src.collector.requests.get") as mock_get:
+    ), patch("src.collector.requests.Session") as mock_session:
+        mock_get = mock_session.return_value.get
 
         mock_response = MagicMock()
         mock_response.json.return_value = {"events": [{"uid": 2}]}
@@ -111,6 +143,265 @@ def test_save_to_json(tmp_path):
     collector.save_to_json(events, filename=str(output_file))
 
     assert output_file.exists()
-    with open(output_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = list(iter_records(str(output_file)))
     assert data[0]["uid"] == 123
+
+
+def test_save_to_json_from_stream(tmp_path):
+    """Test la sauvegarde d'un flux filtré (générateur) en tableau JSON."""
+    collector = OpenAgendaCollector()
+    events = (mock_event(uid, offset) for uid, offset in [(1, -400), (2, 5), (3, 8)])
+    output_file = tmp_path / "stream_events.json"
+
+    count = collector.save_to_json(
+        collector.iter_recent_events(events), filename=str(output_file)
+    )
+
+    assert count == 2
+    data = list(iter_records(str(output_file)))
+    assert [e["uid"] for e in data] == [2, 3]
+
+
+def test_save_to_json_empty_stream(tmp_path):
+    """Test qu'un flux vide produit un tableau JSON valide."""
+    collector = OpenAgendaCollector()
+    output_file = tmp_path / "empty.json"
+
+    collector.save_to_json(iter([]), filename=str(output_file))
+
+    assert not list(iter_records(str(output_file)))
+
+
+def test_sync_full_then_delta(tmp_path):
+    """Test la collecte complète puis la fusion d'un delta (maj, ajout, suppression)."""
+    raw_file = tmp_path / "raw_events.json"
+    old = dict(mock_event(1, 10), updatedAt="2025-01-01T00:00:00.000Z")
+    gone = dict(mock_event(2, 10), updatedAt="2025-01-02T00:00:00.000Z")
+    kept = dict(mock_event(3, 10), updatedAt="2025-01-03T00:00:00.000Z")
+    hidden = dict(mock_event(5, 10), updatedAt="2025-01-03T00:00:00.000Z")
+    withdrawn = dict(mock_event(6, 10), updatedAt="2025-01-03T00:00:00.000Z")
+
+    with patch.dict(os.environ, {"MOCK_DATA": "false"}), patch(
+        "src.collector.requests.Session"
+    ) as mock_session:
+        mock_get = mock_session.return_value.get
+        full_page = MagicMock()
+        full_page.json.return_value = {"events": [old, gone, kept, hidden, withdrawn]}
+        mock_get.return_value = full_page
+
+        collector = OpenAgendaCollector(api_key="test_key", agenda_uid="42")
+        stats = collector.sync(filename=str(raw_file))
+
+        assert stats["mode"] == "full"
+        assert stats["total"] == 5
+        assert collector.load_checkpoint(str(raw_file))["updatedAt"] == (
+            "2025-01-03T00:00:00.000Z"
+        )
+
+        updated = dict(old, title={"fr": "Nouveau titre"})
+        updated["updatedAt"] = "2025-02-01T00:00:00.000Z"
+        removed = dict(gone, state=-1, updatedAt="2025-02-02T00:00:00.000Z")
+        # Dépublié (à modérer) et retiré de l'agenda : supprimés du store
+        unpublished = dict(hidden, state=0, updatedAt="2025-02-02T00:00:00.000Z")
+        retired = {"uid": 6, "removed": True, "updatedAt": "2025-02-02T00:00:00.000Z"}
+        new = dict(mock_event(4, 10), updatedAt="2025-02-03T00:00:00.000Z")
+        delta_page = MagicMock()
+        delta_page.json.return_value = {
+            "events": [updated, removed, unpublished, retired, new]
+        }
+        mock_get.return_value = delta_page
+
+        stats = collector.sync(filename=str(raw_file))
+
+        params = mock_get.call_args.kwargs["params"]
+        assert params["updatedAt[gte]"] == "2025-01-03T00:00:00.000Z"
+        assert "relative[]" not in params
+        assert params["state[]"] == [-1, 0, 1, 2]
+        assert params["removed"] == "true"
+
+    assert stats["mode"] == "delta"
+    assert (stats["changed"], stats["deleted"], stats["total"]) == (2, 3, 3)
+    assert stats["http"]["requests"] == 2
+    data = list(iter_records(str(raw_file)))
+    assert [e["uid"] for e in data] == [1, 3, 4]
+    # Aucune donnée dérivée dans le store brut
+    assert not any("sessions_ts" in e for e in data)
+    assert data[0]["title"]["fr"] == "Nouveau titre"
+    assert collector.load_checkpoint(str(raw_file))["updatedAt"] == (
+        "2025-02-03T00:00:00.000Z"
+    )
+
+
+def test_sync_delta_without_changes_short_circuits(tmp_path):
+    """Test qu'un delta ne renvoyant que l'événement du checkpoint ne réécrit rien."""
+    raw_file = tmp_path / "raw_events.json"
+    first = dict(mock_event(1, 10), updatedAt="2025-01-01T00:00:00.000Z")
+    last = dict(mock_event(2, 10), updatedAt="2025-01-03T00:00:00.000Z")
+
+    with patch.dict(os.environ, {"MOCK_DATA": "false"}), patch(
+        "src.collector.requests.Session"
+    ) as mock_session:
+        mock_get = mock_session.return_value.get
+        page = MagicMock()
+        page.json.return_value = {"events": [first, last]}
+        mock_get.return_value = page
+
+        collector = OpenAgendaCollector(api_key="test_key", agenda_uid="42")
+        collector.sync(filename=str(raw_file))
+        mtime = os.path.getmtime(raw_file)
+
+        # updatedAt[gte] renvoie l'événement du checkpoint
+        page.json.return_value = {"events": [last]}
+        stats = collector.sync(filename=str(raw_file))
+
+    assert stats["mode"] == "not_modified"
+    assert os.path.getmtime(raw_file) == mtime
+    assert collector.load_checkpoint(str(raw_file))["updatedAt_uids"] == ["2"]
+
+
+def http_response(status_code=200, payload=None, headers=None, content=b"{}"):
+    """Réponse HTTP simulée avec statut, en-têtes et corps."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.content = content
+    response.json.return_value = payload or {}
+    return response
+
+
+def test_get_retries_with_retry_after():
+    """Test le retry sur 429/503 en respectant l'en-tête Retry-After."""
+    with patch("src.collector.requests.Session") as mock_session, patch(
+        "src.collector.time.sleep"
+    ) as mock_sleep:
+        mock_session.return_value.get.side_effect = [
+            http_response(429, headers={"Retry-After": "2"}),
+            http_response(503),
+            http_response(200, {"events": [{"uid": 7}]}),
+        ]
+
+        collector = OpenAgendaCollector(api_key="test_key")
+        # pylint: disable=protected-access
+        response = collector._get("https://api.example/events")
+
+    assert response.status_code == 200
+    assert collector.http_stats["requests"] == 3
+    assert collector.http_stats["retries"] == 2
+    assert mock_sleep.call_args_list[0].args[0] == 2.0
+    # Backoff avec jitter borné par backoff_factor * 2**attempt
+    assert 0 <= mock_sleep.call_args_list[1].args[0] <= collector.backoff_factor * 2
+
+
+def test_sync_legacy_not_modified(tmp_path):
+    """Test l'export legacy conditionnel : un 304 conserve le store local."""
+    raw_file = tmp_path / "raw_events.json"
+    export = {"events": [mock_event(1, 10)]}
+
+    with patch.dict(
+        os.environ, {"MOCK_DATA": "false", "OPENAGENDA_API_KEY": ""}
+    ), patch("src.collector.requests.Session") as mock_session:
+        mock_get = mock_session.return_value.get
+        mock_get.return_value = http_response(
+            200,
+            export,
+            headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2025 00:00:00 GMT"},
+            content=b"x" * 1234,
+        )
+        collector = OpenAgendaCollector(api_key=None)
+        assert collector.sync(filename=str(raw_file))["mode"] == "full"
+
+        mock_get.return_value = http_response(304)
+        collector = OpenAgendaCollector(api_key=None)
+        stats = collector.sync(filename=str(raw_file))
+
+        headers = mock_get.call_args.kwargs["headers"]
+
+    assert headers["If-None-Match"] == '"v1"'
+    assert headers["If-Modified-Since"] == "Mon, 01 Jan 2025 00:00:00 GMT"
+    assert stats["mode"] == "not_modified"
+    assert stats["http"]["bytes_saved"] == 1234
+    assert [e["uid"] for e in iter_records(str(raw_file))] == [1]
+
+
+def agenda_pages(url, **kwargs):
+    """Répond par agenda selon l'URL ; l'agenda 'broken' échoue."""
+    # pylint: disable=unused-argument
+    if "/broken/" in url:
+        raise ValueError("agenda indisponible")
+    agenda_uid = url.split("/agendas/")[1].split("/")[0]
+    return http_response(200, {"events": [mock_event(f"{agenda_uid}-1", 10)]})
+
+
+def test_multi_agenda_iter_events_isolates_errors():
+    """Test la collecte concurrente : événements tagués, erreurs isolées."""
+    with patch.dict(os.environ, {"MOCK_DATA": "false"}), patch(
+        "src.collector.requests.Session"
+    ) as mock_session:
+        mock_session.return_value.get.side_effect = agenda_pages
+
+        collector = OpenAgendaCollector(api_key="test_key", agenda_uid="a, broken,b")
+        events = collector.fetch_events()
+
+    assert collector.agenda_uids == ["a", "broken", "b"]
+    assert sorted((e["agenda_uid"], e["uid"]) for e in events) == [
+        ("a", "a-1"),
+        ("b", "b-1"),
+    ]
+    assert "agenda indisponible" in collector.agenda_errors["broken"]
+    assert collector.http_stats["requests"] == 3
+
+
+def test_multi_agenda_sync_merges_stores(tmp_path):
+    """Test la fusion des stores par agenda dans un unique store brut."""
+    raw_file = tmp_path / "raw_events.json"
+    with patch.dict(os.environ, {"MOCK_DATA": "false"}), patch(
+        "src.collector.requests.Session"
+    ) as mock_session:
+        mock_session.return_value.get.side_effect = agenda_pages
+
+        collector = OpenAgendaCollector(
+            api_key="test_key", agenda_uid=["a", "b", "broken"]
+        )
+        stats = collector.sync(filename=str(raw_file))
+
+    assert stats["mode"] == "multi"
+    assert stats["total"] == 2
+    assert set(stats["errors"]) == {"broken"}
+    assert (tmp_path / "agendas" / "raw_events_a.json").exists()
+    data = list(iter_records(str(raw_file)))
+    assert [(e["agenda_uid"], e["uid"]) for e in data] == [("a", "a-1"), ("b", "b-1")]
+
+
+def test_concurrent_checkpoints_are_all_kept(tmp_path):
+    """Test que des agendas synchronisés en parallèle gardent tous leur checkpoint."""
+    raw_file = str(tmp_path / "agendas" / "raw_events_1.json")
+    collectors = [
+        OpenAgendaCollector(api_key="test_key", agenda_uid=str(uid)) for uid in range(8)
+    ]
+
+    def save(collector):
+        for n in range(20):
+            collector.save_checkpoint(raw_file, updatedAt=f"2025-01-{n + 1:02d}")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(save, collectors))
+
+    for uid in range(8):
+        checkpoint = OpenAgendaCollector(
+            api_key="test_key", agenda_uid=str(uid)
+        ).load_checkpoint(raw_file)
+        assert checkpoint["updatedAt"] == "2025-01-20"
+
+
+def test_rate_limiter_spaces_requests():
+    """Test que le rate limiter global espace les créneaux de requêtes."""
+    limiter = RateLimiter(rate=10)
+    with patch("src.collector.time.sleep") as mock_sleep, patch(
+        "src.collector.time.monotonic", return_value=100.0
+    ):
+        limiter.wait()
+        limiter.wait()
+        limiter.wait()
+
+    delays = [c.args[0] for c in mock_sleep.call_args_list]
+    assert delays == [pytest.approx(0.1), pytest.approx(0.2)]
@@ -0,0 +1,17 @@
+from src.bench.concurrency_bench import run_benchmark
+
+
+def test_async_handler_is_not_capped_by_threadpool():
+    """
+    Test sur la vraie chaîne : /ask asynchrone dépasse la limite de threads
+    du handler synchrone, sans aucun appel d'embedding bloquant.
+    """
+    result = run_benchmark(
+        levels=(60,), latency=0.05, embedding_latency=0.01, requests_per_client=1
+    )
+
+    # Handler synchrone : 40 threads AnyIO au plus ; asynchrone : tous en vol
+    assert result["sync"][60]["peak_in_flight"] <= 40
+    assert result["sync"][60]["blocking_embedding_calls"] > 0
+    assert result["async"][60]["peak_in_flight"] == 60
+    assert result["async"][60]["blocking_embedding_calls"] == 0
@@ -0,0 +1,172 @@
+# pylint: disable=protected-access
+import time
+import asyncio
+import numpy as np
+from unittest.mock import patch
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from src.core.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Embeddings factices qui comptent les textes réellement calculés."""
+
+    calls: list
+
+    def embed_documents(self, texts):
+        self.calls.extend(texts)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.calls.append(text)
+        return super().embed_query(text)
+
+
+def as_float32(vectors):
+    """Vecteurs arrondis en float32, la précision conservée par le cache."""
+    return np.asarray(vectors, dtype=np.float32).tolist()
+
+
+def make_cache(tmp_path, **kwargs):
+    model = CountingEmbeddings(size=4, calls=[])
+    path = str(tmp_path / "cache.sqlite")
+    return model, CachedEmbeddings(model, "fake:4", path=path, **kwargs)
+
+
+def test_hits_and_misses(tmp_path):
+    """Seuls les textes absents du cache sont envoyés au modèle."""
+    model, cache = make_cache(tmp_path)
+
+    first = cache.embed_documents(["a", "b", "a"])
+    assert model.calls == ["a", "b"]
+    assert first[0] == first[2]
+
+    assert cache.embed_documents(["b", "c"])[0] == first[1]
+    assert model.calls == ["a", "b", "c"]
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 4
+    assert cache.hit_rate == 1 / 5
+
+
+def test_persisted_across_instances(tmp_path):
+    """Le store SQLite survit au processus : un nouveau cache le relit."""
+    _, cache = make_cache(tmp_path)
+    vector = cache.embed_query("concert jazz")
+
+    model, reloaded = make_cache(tmp_path)
+    assert reloaded.embed_query("concert jazz") == vector
+    assert not model.calls
+    assert reloaded.stats["disk_hits"] == 1
+
+
+def test_keyed_by_model_and_kind(tmp_path):
+    """Un autre modèle, ou une requête vs un document, ne partage pas d'entrée."""
+    _, cache = make_cache(tmp_path)
+    cache.embed_documents(["expo"])
+
+    model = CountingEmbeddings(size=4, calls=[])
+    other = CachedEmbeddings(model, "fake:other", path=cache.path)
+    other.embed_documents(["expo"])
+    cache.embeddings = model
+    cache.embed_query("expo")
+    assert model.calls == ["expo", "expo"]
+
+
+class AsymmetricEmbeddings(CountingEmbeddings):
+    """Embeddings factices dont les requêtes diffèrent des documents."""
+
+    def embed_query(self, text):
+        return [-x for x in super().embed_query(text)]
+
+
+def test_embed_queries_uses_query_path(tmp_path):
+    """Test que les requêtes groupées restent des embeddings de requête."""
+    model = AsymmetricEmbeddings(size=4, calls=[])
+    cache = CachedEmbeddings(model, "fake:asym", path=str(tmp_path / "c.sqlite"))
+    batched = cache.embed_queries(["jazz", "expo"])
+
+    assert batched == as_float32([model.embed_query("jazz"), model.embed_query("expo")])
+    model.calls.clear()
+    assert cache.embed_query("jazz") == batched[0]
+    assert model.calls == []
+
+    # Modèle symétrique déclaré : un seul appel au modèle pour le lot
+    model, cache = make_cache(tmp_path, query_as_document=True)
+    assert cache.embed_queries(["jazz", "expo"]) == as_float32(
+        [model.embed_query("jazz"), model.embed_query("expo")]
+    )
+    assert model.calls[:2] == ["jazz", "expo"] and len(model.calls) == 4
+
+
+def test_size_and_ttl_eviction(tmp_path):
+    """Éviction LRU au-delà de max_entries et expiration par TTL."""
+    model, cache = make_cache(tmp_path, memory_size=1, max_entries=2)
+    cache.embed_documents(["a", "b"])
+    time.sleep(0.01)
+    cache.embed_documents(["a"])  # "a" devient le plus récent
+    time.sleep(0.01)
+    cache.embed_documents(["c"])
+    cache.evict()
+    count = cache._db().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    assert count == 2
+
+    model.calls.clear()
+    cache.embed_documents(["a", "b"])
+    assert model.calls == ["b"]
+
+    cache.ttl = 0
+    time.sleep(0.01)
+    model.calls.clear()
+    cache.embed_documents(["a"])
+    assert model.calls == ["a"]
+
+
+def test_memory_entries_expire(tmp_path):
+    """Test que le cache mémoire applique le TTL, comme la base."""
+    model, cache = make_cache(tmp_path, ttl=60)
+    cache.path = ""  # Mémoire seule
+    with patch("src.core.embedding_cache.time.time", return_value=1000.0):
+        cache.embed_query("jazz")
+    with patch("src.core.embedding_cache.time.time", return_value=1059.0):
+        cache.embed_query("jazz")
+    assert model.calls == ["jazz"]
+    with patch("src.core.embedding_cache.time.time", return_value=1061.0):
+        cache.embed_query("jazz")
+    assert model.calls == ["jazz", "jazz"]
+
+
+def test_vectors_kept_as_float32(tmp_path):
+    """Test le stockage float32 en mémoire et sur disque, listes en sortie."""
+    _, cache = make_cache(tmp_path)
+    vector = cache.embed_query("jazz")
+
+    assert isinstance(vector, list) and isinstance(vector[0], float)
+    ((entry, _),) = cache._memory.values()
+    assert entry.dtype == np.float32
+    blob = cache._db().execute("SELECT vector FROM embeddings").fetchone()[0]
+    assert len(blob) == 4 * len(vector)
+    # Chaque hit renvoie une nouvelle liste : l'entrée en cache reste intacte
+    cache.embed_query("jazz")[0] = 99.0
+    assert cache.embed_query("jazz") == vector
+
+
+def test_aembed_query_keeps_sqlite_off_the_event_loop(tmp_path):
+    """Test que seul le LRU mémoire est lu sur la boucle, SQLite dans un thread."""
+    _, cache = make_cache(tmp_path)
+    vector = cache.embed_query("jazz")
+    reloaded = make_cache(tmp_path)[1]
+    offloaded = []
+
+    async def to_thread(func, *args):
+        offloaded.append(func.__name__)
+        return func(*args)
+
+    async def run():
+        with patch("src.core.embedding_cache.asyncio.to_thread", to_thread):
+            assert await reloaded.aembed_query("jazz") == vector  # Disque
+            assert await reloaded.aembed_query("jazz") == vector  # Mémoire
+            await reloaded.aembed_query("expo")  # Absent : modèle puis insertion
+
+    asyncio.run(run())
+    assert offloaded == ["_disk_lookup", "_disk_lookup", "_persist"]
+    assert reloaded.stats["memory_hits"] == 1
+    assert make_cache(tmp_path)[1].embed_query("expo") == reloaded.embed_query("expo")
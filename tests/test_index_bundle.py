@@ -0,0 +1,72 @@
+import os
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from src.core.index_bundle import MmapDocstore, load_bundle, save_bundle
+from src.core.index_spec import IndexSpec
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=8)
+TEXTS = ["Concert jazz", "Expo photo", "Théâtre", "Cirque", "Opéra"]
+
+
+def build_vectorstore():
+    return FAISS.from_texts(
+        TEXTS,
+        EMBEDDINGS,
+        metadatas=[{"title": text, "rank": i} for i, text in enumerate(TEXTS)],
+        ids=[f"{i}#0" for i in range(len(TEXTS))],
+    )
+
+
+def test_bundle_round_trip_without_pickle(tmp_path):
+    """Le bundle se relit en mémoire mappée, sans aucun fichier pickle."""
+    save_bundle(build_vectorstore(), str(tmp_path))
+    assert not any(name.endswith(".pkl") for name in os.listdir(tmp_path))
+
+    flags = IndexSpec.parse("flat").mmap_flags
+    vectorstore = load_bundle(str(tmp_path), EMBEDDINGS, flags)
+    assert isinstance(vectorstore.docstore, MmapDocstore)
+    assert sorted(vectorstore.index_to_docstore_id.values()) == [
+        "0#0",
+        "1#0",
+        "2#0",
+        "3#0",
+        "4#0",
+    ]
+
+    hit = vectorstore.similarity_search("Théâtre", k=1)[0]
+    assert hit.page_content == "Théâtre"
+    assert hit.metadata == {"title": "Théâtre", "rank": 2}
+    assert hit.id == "2#0"
+    assert vectorstore.docstore.search("404#0") == "ID 404#0 not found."
+
+
+def test_writable_bundle_supports_updates(tmp_path):
+    """Le chargement 'writable' permet ajout et suppression en place."""
+    save_bundle(build_vectorstore(), str(tmp_path))
+    vectorstore = load_bundle(str(tmp_path), EMBEDDINGS, writable=True)
+    vectorstore.delete(["1#0"])
+    vectorstore.add_texts(["Festival"], ids=["9#0"])
+    save_bundle(vectorstore, str(tmp_path))
+
+    reloaded = load_bundle(str(tmp_path), EMBEDDINGS)
+    assert reloaded.index.ntotal == 5
+    assert reloaded.docstore.search("1#0") == "ID 1#0 not found."
+    assert reloaded.similarity_search("Festival", k=1)[0].id == "9#0"
+
+
+def test_ivf_bundle_is_memory_mapped(tmp_path):
+    """Les index IVF se relisent aussi en mémoire mappée."""
+    spec = IndexSpec.parse("ivf_flat:nlist=2,nprobe=2")
+    vectors = EMBEDDINGS.embed_documents(TEXTS * 20)
+    vectorstore = FAISS(EMBEDDINGS, spec.build(8, vectors), InMemoryDocstore(), {})
+    vectorstore.add_embeddings(
+        zip(TEXTS, vectors[: len(TEXTS)]), ids=[f"{i}#0" for i in range(len(TEXTS))]
+    )
+    save_bundle(vectorstore, str(tmp_path))
+
+    reloaded = load_bundle(str(tmp_path), EMBEDDINGS, spec.mmap_flags)
+    assert isinstance(reloaded.index, faiss.IndexIVFFlat)
+    spec.configure(reloaded.index)
+    assert reloaded.similarity_search("Cirque", k=1)[0].id == "3#0"
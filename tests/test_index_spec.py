@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from src.bench.index_bench import run_benchmark, synthetic_corpus
+from src.core.index_spec import IndexSpec
+
+
+def test_parse_and_format_round_trip():
+    """Test la forme texte des specs et les valeurs par défaut."""
+    spec = IndexSpec.parse("IVF-PQ:nlist=64,m=8")
+    assert spec.kind == "ivf_pq"
+    assert spec.params == {"nlist": 64, "m": 8, "nbits": 8, "nprobe": 16}
+    assert IndexSpec.parse(str(spec)) == spec
+    assert str(IndexSpec.parse(None)) == "flat"
+    assert IndexSpec.parse("hnsw") != IndexSpec.parse("hnsw:m=16")
+
+    with pytest.raises(ValueError):
+        IndexSpec.parse("annoy")
+    with pytest.raises(ValueError):
+        IndexSpec.parse("flat:nprobe=4")
+
+
+def test_build_caps_parameters_to_small_corpus():
+    """Un petit corpus réduit nlist / nbits au lieu de faire échouer l'entraînement."""
+    vectors = np.random.default_rng(0).normal(size=(100, 12)).astype(np.float32)
+    index = IndexSpec.parse("ivf_pq:nlist=1024,m=16,nbits=8,nprobe=64").build(
+        12, vectors
+    )
+    index.add(vectors)
+    assert index.nlist == 2
+    assert index.nprobe == 2
+    assert index.pq.M == 12  # Plus grand diviseur de la dimension <= 16
+    assert index.pq.nbits == 6
+    assert index.ntotal == 100
+
+
+def test_benchmark_reports_recall_latency_and_memory():
+    """Test le benchmark : rappel@k vs recherche exacte, latences et mémoire."""
+    vectors, queries = synthetic_corpus(2_000, 16, 20)
+    result = run_benchmark(
+        vectors,
+        queries,
+        specs=["flat", "hnsw:m=16", "ivf_flat:nlist=16,nprobe=16"],
+        k=5,
+    )
+    assert result["flat"]["recall@5"] == 1.0
+    # nprobe = nlist : recherche IVF exhaustive, donc exacte
+    assert result["ivf_flat:nlist=16,nprobe=16"]["recall@5"] == 1.0
+    assert result["hnsw:m=16,ef_construction=40,ef_search=64"]["recall@5"] > 0.8
+    assert result["flat"]["memory_mb"] > 0
+    assert result["flat"]["query_ms"]["p50"] <= result["flat"]["query_ms"]["p99"]
@@ -0,0 +1,54 @@
+import numpy as np
+
+from src.core.lexical_index import (
+    LexicalIndex,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+
+TEXTS = [
+    "Titre: Festival de jazz\nLieu: Salle Pleyel, Paris\nMots-clés: musique",
+    "Titre: Exposition Monet\nLieu: Musée d'Orsay, Paris\nMots-clés: peinture",
+    "Titre: Concert classique\nLieu: Philharmonie\nMots-clés: piano, jazz",
+    "Titre: Atelier poterie\nLieu: Maison des associations\nMots-clés: enfants",
+]
+
+
+def test_tokenize_french():
+    """Test la normalisation : accents, mots outils, pluriels et libellés."""
+    assert tokenize("Les Expositions du Musée d'Orsay") == [
+        "exposition",
+        "muse",
+        "orsay",
+    ]
+    assert tokenize("Concerts") == tokenize("concert")
+    assert tokenize("Mots-clés: théâtre") == tokenize("THEATRE")
+
+
+def test_search_and_reload(tmp_path):
+    """Test le classement BM25 et la relecture des postings en mémoire mappée."""
+    index = LexicalIndex.from_texts(TEXTS)
+    index.save(str(tmp_path))
+    loaded = LexicalIndex.load(str(tmp_path))
+
+    assert isinstance(loaded.postings, np.memmap)
+    for lexical in (index, loaded):
+        assert lexical.search("salle Pleyel", 3) == [0]
+        # Le terme rare (pleyel) l'emporte sur le terme partagé (jazz)
+        assert lexical.search("jazz Pleyel", 3) == [0, 2]
+        assert lexical.search("expositions au musée", 3) == [1]
+        assert lexical.search("cinéma", 3) == []
+    assert LexicalIndex.load(str(tmp_path / "absent")) is None
+
+
+def test_search_restricted_to_positions():
+    """Test la restriction aux positions éligibles (filtre temporel)."""
+    index = LexicalIndex.from_texts(TEXTS)
+    assert index.search("jazz", 3, np.array([1, 2, 3])) == [2]
+    assert index.search("jazz", 3, np.array([], dtype=np.int64)) == []
+
+
+def test_reciprocal_rank_fusion():
+    """Test la fusion : un document classé par les deux listes passe devant."""
+    assert reciprocal_rank_fusion([[1, 2, 3], [3, 4]]) == [3, 1, 2, 4]
+    assert reciprocal_rank_fusion([[], [7]]) == [7]
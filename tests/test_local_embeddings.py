@@ -0,0 +1,48 @@
+import os
+import time
+import numpy as np
+from src.core.local_embeddings import LocalEmbeddings
+
+
+class FakeModel:
+    """Modèle factice : vecteur = (longueur du texte, taille du lot, pid)."""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def encode(self, texts, batch_size=32):
+        if isinstance(texts, str):
+            return np.array([len(texts), 1.0, os.getpid()])
+        time.sleep(0.02)
+        return np.array([[len(text), len(texts), os.getpid()] for text in texts])
+
+
+TEXTS = ["a" * n for n in (5, 1, 9, 3, 7, 2, 8, 4, 6)]
+
+
+def test_sorted_batches_keep_input_order():
+    """Les lots sont triés par longueur mais les vecteurs restent dans l'ordre."""
+    embeddings = LocalEmbeddings(workers=1, batch_size=4, loader=FakeModel)
+    vectors = embeddings.embed_documents(TEXTS)
+
+    assert [v[0] for v in vectors] == [len(text) for text in TEXTS]
+    # Les 4 textes les plus longs forment le premier lot, etc.
+    batch_sizes = {int(v[0]): int(v[1]) for v in vectors}
+    assert [batch_sizes[n] for n in (9, 8, 7, 6, 5, 4, 3, 2, 1)] == [4] * 8 + [1]
+    assert embeddings.embed_query("abc")[0] == 3
+
+
+def test_worker_pool_spreads_batches():
+    """En multi-processus, les lots sont encodés par plusieurs workers."""
+    embeddings = LocalEmbeddings(
+        workers=2, batch_size=1, loader=FakeModel, start_method="fork"
+    )
+    try:
+        vectors = embeddings.embed_documents(TEXTS)
+    finally:
+        embeddings.close()
+
+    assert [v[0] for v in vectors] == [len(text) for text in TEXTS]
+    pids = {v[2] for v in vectors}
+    assert os.getpid() not in pids
+    assert len(pids) == 2
@@ -0,0 +1,97 @@
+import string
+import pytest
+from langchain_huggingface import HuggingFaceEmbeddings
+from src.bench.embedding_bench import cosine_agreement, run_benchmark
+from src.core.onnx_embeddings import OnnxEmbeddings, export_quantized_model
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+
+TEXTS = [
+    "Concert de jazz au Parc de la Villette",
+    "Exposition photo",
+    "Atelier poterie pour enfants, samedi matin à Lyon",
+    "Visite guidée du Vieux-Port de Marseille avec une conférencière",
+]
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    """Petit modèle Sentence-Transformers (BERT aléatoire) construit hors ligne."""
+    # pylint: disable=import-outside-toplevel
+    import torch
+    from sentence_transformers import SentenceTransformer, models
+    from tokenizers import Tokenizer, normalizers, pre_tokenizers, processors
+    from tokenizers.models import WordPiece
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    torch.manual_seed(0)
+    base = tmp_path_factory.mktemp("bert")
+    specials = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    letters = list(string.ascii_lowercase + string.digits + ",.-'")
+    tokens = specials + letters + [f"##{c}" for c in letters]
+    vocab = {token: i for i, token in enumerate(tokens)}
+
+    tokenizer = Tokenizer(WordPiece(vocab, unk_token="[UNK]"))
+    tokenizer.normalizer = normalizers.BertNormalizer(strip_accents=True)
+    tokenizer.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]",
+        special_tokens=[("[CLS]", vocab["[CLS]"]), ("[SEP]", vocab["[SEP]"])],
+    )
+    BertTokenizerFast(
+        tokenizer_object=tokenizer,
+        unk_token="[UNK]",
+        pad_token="[PAD]",
+        cls_token="[CLS]",
+        sep_token="[SEP]",
+        mask_token="[MASK]",
+    ).save_pretrained(base)
+    config = BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        intermediate_size=128,
+    )
+    BertModel(config).save_pretrained(base)
+
+    transformer = models.Transformer(str(base), max_seq_length=128)
+    pooling = models.Pooling(64, pooling_mode="mean")
+    st_dir = tmp_path_factory.mktemp("tiny-minilm")
+    SentenceTransformer(modules=[transformer, pooling, models.Normalize()]).save(
+        str(st_dir)
+    )
+
+    onnx_dir = tmp_path_factory.mktemp("onnx")
+    export_quantized_model(str(st_dir), str(onnx_dir))
+    return str(st_dir), str(onnx_dir)
+
+
+def test_onnx_int8_parity_with_current_embeddings(tiny_model):
+    """Les vecteurs ONNX int8 concordent (cosinus) avec HuggingFaceEmbeddings."""
+    st_dir, onnx_dir = tiny_model
+    reference = HuggingFaceEmbeddings(model_name=st_dir)
+    onnx = OnnxEmbeddings(onnx_dir, batch_size=2)
+
+    cosines = cosine_agreement(
+        reference.embed_documents(TEXTS), onnx.embed_documents(TEXTS)
+    )
+    assert cosines.min() > 0.99
+    query = cosine_agreement(
+        [reference.embed_query(TEXTS[0])], [onnx.embed_query(TEXTS[0])]
+    )
+    assert query[0] > 0.99
+    # Identifiant distinct du modèle float32 (cache et manifeste)
+    assert onnx.model_name.endswith("-int8")
+
+
+def test_embedding_benchmark_reports_latency_and_throughput(tiny_model):
+    """Test le benchmark : latences par requête, débit et concordance."""
+    st_dir, onnx_dir = tiny_model
+    result = run_benchmark(
+        model_name=st_dir, onnx_dir=onnx_dir, texts=20, queries=10, batch_size=8
+    )
+    assert result["onnx"]["build_docs_per_sec"] > 0
+    assert result["onnx"]["query_ms"]["p50"] <= result["onnx"]["query_ms"]["p99"]
+    assert result["onnx"]["cosine_vs_torch"]["min"] > 0.99
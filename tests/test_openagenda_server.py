@@ -0,0 +1,67 @@
+import os
+from unittest.mock import patch
+import pytest
+from src.bench.collector_bench import run_benchmark
+from src.bench.openagenda_server import OpenAgendaStandIn, SyntheticAgenda
+from src.collector import OpenAgendaCollector
+
+
+@pytest.fixture
+def stand_in():
+    """Serveur OpenAgenda local : 250 événements, 30 % de fautes injectées."""
+    server = OpenAgendaStandIn(
+        SyntheticAgenda(250), error_rate=0.3, retry_after=0, seed=42
+    ).start()
+    env = {
+        "OPENAGENDA_API_URL": f"{server.url}/v2",
+        "OPENAGENDA_BASE_URL": f"{server.url}/agendas",
+        "OPENAGENDA_MAX_RPS": "0",
+        "MOCK_DATA": "false",
+    }
+    with patch.dict(os.environ, env):
+        yield server
+    server.stop()
+
+
+def make_collector():
+    collector = OpenAgendaCollector(api_key="bench", agenda_uid="1")
+    collector.backoff_factor = 0
+    collector.max_retries = 10
+    return collector
+
+
+def test_collector_paginates_through_faults(stand_in):
+    """Test pagination par curseur et retries contre le serveur de substitution."""
+    collector = make_collector()
+
+    uids = [event["uid"] for event in collector.iter_events()]
+
+    assert uids == list(range(1, 251))
+    assert stand_in.stats["faults"] > 0
+    assert collector.http_stats["retries"] == stand_in.stats["faults"]
+
+
+def test_stand_in_delta_and_legacy_etag(stand_in, tmp_path):
+    """Test le filtre updatedAt[gte] et le 304 de l'export legacy."""
+    stand_in.error_rate = 0
+    collector = make_collector()
+    since = SyntheticAgenda.updated_at(240)
+    delta = list(collector.iter_events(updated_since=since))
+    assert [e["uid"] for e in delta] == list(range(241, 251))
+
+    with patch.dict(os.environ, {"OPENAGENDA_API_KEY": ""}):
+        raw_file = str(tmp_path / "raw_events.json")
+        legacy = OpenAgendaCollector(api_key=None, agenda_uid="1")
+        assert legacy.sync(filename=raw_file)["total"] == 250
+        legacy = OpenAgendaCollector(api_key=None, agenda_uid="1")
+        assert legacy.sync(filename=raw_file)["mode"] == "not_modified"
+
+
+def test_run_benchmark_reports_throughput():
+    """Test le point d'entrée du benchmark (débit et mémoire)."""
+    result = run_benchmark(events=300, page_size=50, trace_memory=True)
+
+    assert result["events"] == 300
+    assert result["http"]["requests"] == 6
+    assert result["events_per_sec"] > 0
+    assert result["python_peak_mb"] is not None
@@ -1,5 +1,7 @@
 import json
+from unittest.mock import patch
 from src.processor import EventProcessor
+from src.storage import iter_records
 
 # Données brutes simulées (mock)
 MOCK_RAW_EVENTS = [
@@ -47,8 +49,7 @@ def test_process_creates_output_file(tmp_path):
     # Assertions
     assert output_file.exists()
 
-    with open(output_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = list(iter_records(str(output_file)))
 
     assert len(data) == 2
 
@@ -85,3 +86,93 @@ def test_process_handles_missing_input_file(tmp_path, capsys):
 
     # Vérifier qu'aucun fichier n'a été créé
     assert not output_file.exists()
+
+
+def test_process_parallel_matches_sequential(tmp_path):
+    """Test que le mode process-pool produit la même sortie, dans le même ordre."""
+    raw_events = []
+    for i in range(25):
+        event = dict(MOCK_RAW_EVENTS[i % 2], uid=str(i))
+        event["timings"] = [
+            {
+                "begin": f"2030-01-{(i % 28) + 1:02d}T10:00:00+01:00",
+                "end": f"2030-01-{(i % 28) + 1:02d}T12:00:00+01:00",
+            }
+        ]
+        raw_events.append(event)
+
+    input_file = tmp_path / "raw_events.json"
+    with open(input_file, "w", encoding="utf-8") as f:
+        json.dump(raw_events, f)
+
+    sequential_file = tmp_path / "sequential.json"
+    EventProcessor(str(input_file), str(sequential_file), workers=1).process()
+
+    parallel_file = tmp_path / "parallel.json"
+    processor = EventProcessor(
+        str(input_file), str(parallel_file), workers=2, chunk_size=4
+    )
+    processor.process()
+
+    parallel = list(iter_records(str(parallel_file)))
+    assert [e["id"] for e in parallel] == [str(i) for i in range(25)]
+    assert parallel == list(iter_records(str(sequential_file)))
+    assert processor.stats["events"] == 25
+    assert processor.stats["events_per_sec"] > 0
+
+
+def test_process_incremental_reuses_unchanged_records(tmp_path):
+    """Test le hash de contenu et la réutilisation des événements inchangés."""
+    input_file = tmp_path / "raw_events.json"
+    output_file = tmp_path / "processed_events.json"
+    with open(input_file, "w", encoding="utf-8") as f:
+        json.dump(MOCK_RAW_EVENTS, f)
+
+    EventProcessor(str(input_file), str(output_file)).process()
+    first = {r["id"]: r for r in iter_records(str(output_file))}
+    assert len(first["123"]["hash"]) == 64
+
+    changed = dict(MOCK_RAW_EVENTS[0], title={"fr": "Concert de Blues"})
+    new = dict(MOCK_RAW_EVENTS[1], uid="789")
+    with open(input_file, "w", encoding="utf-8") as f:
+        json.dump([changed, new], f)
+
+    processor = EventProcessor(str(input_file), str(output_file))
+    # pylint: disable=protected-access
+    with patch.object(
+        processor, "_create_metadata", wraps=processor._create_metadata
+    ) as spy:
+        processor.process()
+
+    second = {r["id"]: r for r in iter_records(str(output_file))}
+    assert set(second) == {"123", "789"}
+    assert second["123"]["hash"] != first["123"]["hash"]
+    assert spy.call_count == 2
+    assert processor.stats["new"] == 1
+    assert processor.stats["changed"] == 1
+    assert processor.stats["deleted"] == 1
+
+    # Relance sans changement : aucune transformation
+    processor = EventProcessor(str(input_file), str(output_file))
+    with patch.object(processor, "_create_metadata") as spy:
+        processor.process()
+    spy.assert_not_called()
+    assert processor.stats["unchanged"] == 2
+
+
+def test_process_event_expires_when_session_starts():
+    """Test qu'un enregistrement n'est plus réutilisé une fois la session commencée."""
+    event = dict(
+        MOCK_RAW_EVENTS[0],
+        timings=[
+            {"begin": "2030-01-01T10:00:00+01:00", "end": "2030-01-01T12:00:00+01:00"}
+        ],
+    )
+    processor = EventProcessor()
+    # pylint: disable=protected-access
+    record = processor._process_event(event)
+    assert record["valid_until"] == record["metadata"]["start_ts"]
+
+    assert processor._process_event(event, record) is record
+    with patch("src.processor.time.time", return_value=record["valid_until"] + 1):
+        assert processor._process_event(event, record) is not record
@@ -5,6 +5,7 @@ import pytest
 from langchain_core.documents import Document
 
 from src.core.rag_chain import RAGChain
+from src.timings import encode_sessions, parse_timings
 
 
 @pytest.fixture
@@ -148,3 +149,156 @@ def test_filter_retrieved_docs(mock_rag_chain_instance):
     assert len(filtered) == 2
     assert filtered[0].metadata["title"] == "Event 1"
     assert filtered[1].metadata["title"] == "Event 2"
+
+
+def test_filter_retrieved_docs_with_sessions(mock_rag_chain_instance):
+    """Test le filtrage par sessions compactes (et l'ancien format en liste)."""
+    sessions = parse_timings(
+        [
+            {"begin": "2026-03-07T10:00:00+01:00", "end": "2026-03-07T12:00:00+01:00"},
+            {"begin": "2026-04-04T10:00:00+02:00", "end": "2026-04-04T12:00:00+02:00"},
+        ]
+    )
+    doc_compact = Document(
+        page_content="atelier",
+        metadata={"title": "Atelier", "sessions_ts": encode_sessions(sessions)},
+    )
+    doc_legacy = Document(
+        page_content="visite",
+        metadata={
+            "title": "Visite",
+            "all_sessions_ts": [
+                datetime(2026, 3, 20, 10).timestamp(),
+                datetime(2026, 3, 20, 12).timestamp(),
+            ],
+        },
+    )
+
+    # Mois de mars 2026 : les deux événements ont une session
+    march = {
+        "type": "specific_month",
+        "start_ts": datetime(2026, 3, 1).timestamp(),
+        "end_ts": datetime(2026, 3, 31, 23, 59, 59).timestamp(),
+    }
+    # pylint: disable=protected-access
+    filtered = mock_rag_chain_instance._filter_retrieved_docs(
+        [doc_compact, doc_legacy], march
+    )
+    assert [d.metadata["title"] for d in filtered] == ["Atelier", "Visite"]
+
+    # Entre les deux sessions de l'atelier : aucune ne chevauche la plage
+    mid_march = {
+        "type": "day",
+        "start_ts": datetime(2026, 3, 14).timestamp(),
+        "end_ts": datetime(2026, 3, 14, 23, 59, 59).timestamp(),
+    }
+    # pylint: disable=protected-access
+    assert not mock_rag_chain_instance._filter_retrieved_docs([doc_compact], mid_march)
+
+
+def test_retrieve_filters_inside_search(mock_rag_chain_instance):
+    """Test que la plage de dates restreint les candidats de la recherche FAISS."""
+    rag = mock_rag_chain_instance
+    rag.time_index = MagicMock()
+    rag.time_index.eligible.return_value = [4, 7]
+    rag.lexical_index = None
+    date_context = {"type": "month", "start_ts": 10.0, "end_ts": 20.0}
+
+    with patch("src.core.rag_chain.search_eligible") as mock_search:
+        mock_search.return_value = ["doc"]
+        # pylint: disable=protected-access
+        assert rag._retrieve("Concerts en janvier", date_context) == ["doc"]
+
+    rag.time_index.eligible.assert_called_once_with(10.0, 20.0)
+    args = mock_search.call_args[0]
+    assert args[0] is rag.vectorstore
+    assert args[2:] == (3, [4, 7])
+    rag.retriever.invoke.assert_not_called()
+
+    # Aucun événement dans la plage : pas d'appel d'embedding
+    rag.time_index.eligible.return_value = []
+    rag.vectorstore.embeddings.embed_query.reset_mock()
+    # pylint: disable=protected-access
+    assert rag._retrieve("Concerts en janvier", date_context) == []
+    rag.vectorstore.embeddings.embed_query.assert_not_called()
+
+
+def test_retrieve_without_time_index(mock_rag_chain_instance):
+    """Test le repli sur le post-filtrage pour un index sans index temporel."""
+    rag = mock_rag_chain_instance
+    rag.time_index = None
+    doc = Document(page_content="event", metadata={"start_ts": 0, "end_ts": 5})
+    rag.retriever.invoke.return_value = [doc]
+
+    # pylint: disable=protected-access
+    assert rag._retrieve("q", {"type": "day", "start_ts": 1, "end_ts": 2}) == [doc]
+    assert rag._retrieve("q", {"type": "day", "start_ts": 6, "end_ts": 7}) == []
+    assert rag._retrieve("bonjour", {"type": "greeting"}) == []
+
+
+def test_retrieve_temporal_question_skips_embedding(mock_rag_chain_instance):
+    """Test qu'une question purement temporelle lit le calendrier sans embedding."""
+    rag = mock_rag_chain_instance
+    rag.calendar_size = 2
+    rag.time_index = MagicMock()
+    rag.time_index.chronological.return_value = [5, 6, 2, 9]
+    docs = {
+        5: Document(page_content="a", metadata={"event_id": "e1"}),
+        6: Document(page_content="a bis", metadata={"event_id": "e1"}),
+        2: Document(page_content="b", metadata={"event_id": "e2"}),
+        9: Document(page_content="c", metadata={"event_id": "e3"}),
+    }
+    rag.vectorstore.index_to_docstore_id = {p: p for p in docs}
+    rag.vectorstore.docstore.search.side_effect = docs.get
+    date_context = {"type": "day", "start_ts": 1.0, "end_ts": 2.0}
+
+    # pylint: disable=protected-access
+    retrieved = rag._retrieve("Quoi de prévu demain ?", date_context)
+
+    assert [doc.page_content for doc in retrieved] == ["a", "b"]
+    rag.time_index.chronological.assert_called_once_with(1.0, 2.0)
+    rag.vectorstore.embeddings.embed_query.assert_not_called()
+    rag.retriever.invoke.assert_not_called()
+
+
+def test_retrieve_fuses_bm25_and_vector_ranks(mock_rag_chain_instance):
+    """Test la fusion RRF des rangs BM25 et vectoriels, sans augmenter k."""
+    rag = mock_rag_chain_instance
+    rag.time_index = MagicMock()
+    rag.time_index.eligible.return_value = [1, 2, 3, 4, 5]
+    rag.lexical_index = MagicMock()
+    rag.lexical_index.search.return_value = [5, 2, 4]
+    rag.vectorstore.index_to_docstore_id = {p: p for p in range(6)}
+    rag.vectorstore.docstore.search.side_effect = lambda p: f"doc{p}"
+
+    with patch("src.core.rag_chain.nearest_eligible") as mock_nearest:
+        mock_nearest.return_value = [1, 2, 3]
+        # pylint: disable=protected-access
+        docs = rag._retrieve("Concert de jazz salle Pleyel", {"type": "any_future"})
+
+    # 2 est dans les deux classements ; 1 et 5 sont premiers de l'un d'eux
+    assert docs == ["doc2", "doc1", "doc5"]
+    assert mock_nearest.call_args[0][2] == 3
+    rag.lexical_index.search.assert_called_once_with(
+        "Concert de jazz salle Pleyel", 3, [1, 2, 3, 4, 5]
+    )
+
+
+def test_format_docs_resolves_parents_once_per_event(mock_rag_chain_instance):
+    """Test que le contexte complet est lu dans le store parent, une fois par événement."""
+    rag = mock_rag_chain_instance
+    rag.parents = MagicMock()
+    rag.parents.search.side_effect = lambda event_id: Document(
+        id=event_id, page_content=f"Contexte {event_id}"
+    )
+    docs = [
+        Document(page_content="chunk 1", metadata={"event_id": 7}),
+        Document(page_content="chunk 2", metadata={"event_id": 7}),
+        Document(page_content="chunk 3", metadata={"event_id": 8}),
+    ]
+
+    # pylint: disable=protected-access
+    context = rag._format_docs(docs, {"type": "any_future"})
+
+    assert context == "Contexte 7\n\n---\n\nContexte 8"
+    assert [c.args for c in rag.parents.search.call_args_list] == [("7",), ("8",)]
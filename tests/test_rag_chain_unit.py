@@ -1,5 +1,10 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
+from langchain_core.documents import Document
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+from src.core.answer_cache import AnswerCache, SemanticAnswerCache
 from src.core.rag_chain import RAGChain
 
 
@@ -52,3 +57,170 @@ def test_rag_chain_init_failure(mock_vector_mgr):
         ValueError, match="Vector store not found. Please run vectorstore.py first."
     ):
         RAGChain()
+
+
+@patch("src.core.rag_chain.VectorStoreManager")
+@patch("src.core.rag_chain.ChatMistralAI")
+def test_rag_chain_stream(mock_llm, mock_vector_mgr):
+    """Test le streaming des tokens, puis la mise en cache de la réponse complète."""
+    # pylint: disable=unused-argument
+    mock_vector_mgr.return_value.load_index.return_value = MagicMock()
+    chain = RAGChain(
+        answer_cache=AnswerCache(), semantic_cache=SemanticAnswerCache(max_entries=0)
+    )
+    chain.chain = MagicMock()
+    chain.chain.stream.return_value = iter(["Un ", "concert ", "samedi."])
+
+    assert list(chain.stream("Que faire ce week-end ?")) == [
+        "Un ",
+        "concert ",
+        "samedi.",
+    ]
+    # Réponse en cache : servie d'un bloc, sans relancer le LLM
+    assert list(chain.stream("Que faire ce week-end ?")) == ["Un concert samedi."]
+    assert chain.ask("Que faire ce week-end ?") == "Un concert samedi."
+    chain.chain.stream.assert_called_once_with("Que faire ce week-end ?")
+
+
+@patch("src.core.rag_chain.VectorStoreManager")
+@patch("src.core.rag_chain.ChatMistralAI")
+def test_rag_chain_astream(mock_llm, mock_vector_mgr):
+    """Test la version asynchrone du streaming."""
+    # pylint: disable=unused-argument
+    mock_vector_mgr.return_value.load_index.return_value = MagicMock()
+    chain = RAGChain(
+        answer_cache=AnswerCache(), semantic_cache=SemanticAnswerCache(max_entries=0)
+    )
+
+    async def tokens(_):
+        for token in ["Bon", "jour"]:
+            yield token
+
+    chain.chain = MagicMock()
+    chain.chain.astream.side_effect = tokens
+
+    async def collect():
+        return [token async for token in chain.astream("Quoi de prévu demain ?")]
+
+    assert asyncio.run(collect()) == ["Bon", "jour"]
+    assert chain.ask("Quoi de prévu demain ?") == "Bonjour"
+
+
+@patch("src.core.rag_chain.search_eligible")
+@patch("src.core.rag_chain.VectorStoreManager")
+@patch("src.core.rag_chain.ChatMistralAI")
+def test_rag_chain_aask(mock_llm, mock_vector_mgr, mock_search):
+    """
+    Test aask avec le cache sémantique par défaut : embeddings attendus
+    (await), jamais d'appel bloquant, LLM appelé via ainvoke.
+    """
+    manager = mock_vector_mgr.return_value
+    vectorstore = MagicMock()
+    vectorstore.embeddings.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+    manager.load_index.return_value = vectorstore
+    manager.load_time_index.return_value.eligible.return_value = [0, 1]
+    manager.load_lexical_index.return_value = None
+    mock_llm.return_value = FakeListChatModel(responses=["Un concert"])
+    mock_search.return_value = []
+
+    chain = RAGChain(answer_cache=AnswerCache(), semantic_cache=SemanticAnswerCache())
+
+    assert asyncio.run(chain.aask("Des concerts de jazz ce week-end ?")) == (
+        "Un concert"
+    )
+    # Niveau sémantique puis recherche (même embedding, en cache en production)
+    assert vectorstore.embeddings.aembed_query.await_count == 2
+    vectorstore.embeddings.embed_query.assert_not_called()
+    assert mock_search.call_args[0][1] == [0.1, 0.2]
+
+    # Reformulation servie par le cache sémantique, sans relancer la chaîne
+    chain.chain = MagicMock()
+    assert asyncio.run(chain.aask("Y a-t-il des concerts de jazz ce week-end ?")) == (
+        "Un concert"
+    )
+    chain.chain.ainvoke.assert_not_called()
+    vectorstore.embeddings.embed_query.assert_not_called()
+
+
+@patch("src.core.rag_chain.VectorStoreManager")
+@patch("src.core.rag_chain.ChatMistralAI")
+def test_rag_chain_aretrieve_without_time_index(mock_llm, mock_vector_mgr):
+    """Test qu'un ancien index (sans index temporel) réutilise l'embedding attendu."""
+    # pylint: disable=unused-argument
+    manager = mock_vector_mgr.return_value
+    vectorstore = MagicMock()
+    vectorstore.embeddings.aembed_query = AsyncMock(return_value=[0.3, 0.4])
+    vectorstore.similarity_search_by_vector.return_value = []
+    manager.load_index.return_value = vectorstore
+    manager.load_time_index.return_value = None
+
+    chain = RAGChain()
+    # pylint: disable=protected-access
+    asyncio.run(chain._aretrieve("Du théâtre ce soir ?", {"type": "any_future"}))
+
+    vectorstore.similarity_search_by_vector.assert_called_once_with([0.3, 0.4], k=3)
+    chain.retriever.invoke.assert_not_called()
+
+
+def _echo_llm(prompt):
+    """LLM factice : répond avec la question posée, échoue sur "panne"."""
+    text = prompt.to_messages()[-1].content
+    question = text.split("QUESTION : ")[1].splitlines()[0]
+    if "panne" in question:
+        raise RuntimeError("LLM indisponible")
+    return f"Réponse : {question}"
+
+
+@patch("src.core.rag_chain.nearest_eligible_many")
+@patch("src.core.rag_chain.VectorStoreManager")
+@patch("src.core.rag_chain.ChatMistralAI")
+def test_rag_chain_ask_many(mock_llm, mock_vector_mgr, mock_nearest):
+    """Test ask_many : un appel d'embedding, une recherche FAISS, erreurs par question."""
+    manager = mock_vector_mgr.return_value
+    vectorstore = MagicMock()
+    vectorstore.embeddings.embed_queries.side_effect = lambda texts: [
+        [float(n), 1.0] for n in range(len(texts))
+    ]
+    vectorstore.index_to_docstore_id = {p: p for p in range(3)}
+    vectorstore.docstore.search.side_effect = lambda p: Document(
+        page_content=f"Événement {p}"
+    )
+    manager.load_index.return_value = vectorstore
+    manager.load_time_index.return_value.eligible.return_value = [0, 1, 2]
+    manager.load_lexical_index.return_value = None
+    manager.load_parents.return_value = None
+    mock_llm.return_value = RunnableLambda(_echo_llm)
+    mock_nearest.side_effect = lambda index, embeddings, k, positions: [
+        [0] for _ in embeddings
+    ]
+    cache = AnswerCache()
+
+    chain = RAGChain(
+        answer_cache=cache, semantic_cache=SemanticAnswerCache(max_entries=0)
+    )
+    questions = [
+        "Des concerts de jazz ce week-end ?",
+        "Des expositions de peinture ce week-end ?",
+        "Des concerts de jazz ce week-end ?",
+        "Du théâtre en panne ce week-end ?",
+        "bonjour",
+    ]
+    results = chain.ask_many(questions, max_concurrency=2)
+
+    assert len(results) == 5
+    for question, answer in zip(questions[:3], results[:3]):
+        assert question in answer
+    assert isinstance(results[3], RuntimeError)
+    assert "bonjour" in results[4]
+    # Questions distinctes et thématiques : un embedding groupé, une recherche
+    vectorstore.embeddings.embed_queries.assert_called_once_with(
+        [questions[0], questions[1], questions[3]]
+    )
+    vectorstore.embeddings.embed_query.assert_not_called()
+    mock_nearest.assert_called_once()
+    assert len(mock_nearest.call_args[0][1]) == 3
+    # Réponses réussies en cache, l'échec sera retenté
+    assert chain.ask(questions[1]) == results[1]
+    assert cache.stats["hits"] == 1
+
+    assert asyncio.run(chain.aask_many(questions[:2])) == results[:2]
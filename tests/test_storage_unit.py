@@ -0,0 +1,51 @@
+import json
+import pytest
+from src.storage import iter_records, write_records
+
+RECORDS = [
+    {"uid": 1, "title": {"fr": "Concert d'été"}},
+    {"uid": 2, "title": {"fr": "Expo\nPhoto"}},
+]
+
+
+@pytest.mark.parametrize("name", ["events.json", "events.json.gz", "events.json.zst"])
+def test_write_and_iter_records_roundtrip(tmp_path, name):
+    """Test l'aller-retour NDJSON, compressé ou non."""
+    path = str(tmp_path / "data" / name)
+
+    count = write_records(path, iter(RECORDS))
+
+    assert count == 2
+    assert list(iter_records(path)) == RECORDS
+    # Aucun fichier temporaire ne doit subsister
+    assert sorted(p.name for p in (tmp_path / "data").iterdir()) == [name]
+
+
+def test_ndjson_one_compact_record_per_line(tmp_path):
+    """Test le format : un objet JSON compact par ligne, UTF-8 non échappé."""
+    path = tmp_path / "events.json"
+    write_records(str(path), RECORDS)
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == RECORDS[0]
+    assert "été" in lines[0]
+    assert ": " not in lines[0]
+
+
+def test_iter_records_reads_legacy_json_array(tmp_path):
+    """Test la lecture des anciens stores (tableau JSON indenté)."""
+    path = tmp_path / "legacy.json"
+    path.write_text(json.dumps(RECORDS, indent=4), encoding="utf-8")
+
+    assert list(iter_records(str(path))) == RECORDS
+
+
+def test_write_records_can_rewrite_store_it_reads(tmp_path):
+    """Test la réécriture atomique d'un store à partir de son propre flux."""
+    path = str(tmp_path / "events.json")
+    write_records(path, RECORDS)
+
+    write_records(path, (dict(r, seen=True) for r in iter_records(path)))
+
+    assert [r["seen"] for r in iter_records(path)] == [True, True]
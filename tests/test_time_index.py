@@ -0,0 +1,172 @@
+from datetime import datetime
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import FakeEmbeddings
+import faiss
+
+from src.core.index_spec import IndexSpec
+from src.core.time_index import (
+    TimeIndex,
+    nearest_eligible,
+    nearest_eligible_many,
+    search_eligible,
+)
+from src.timings import encode_sessions
+
+
+def _ts(*args):
+    return datetime(*args).timestamp()
+
+
+def _metadata(*sessions):
+    return {
+        "sessions_ts": encode_sessions(
+            np.array([[b, e, 0] for b, e in sessions], dtype=np.float64)
+        )
+    }
+
+
+def test_eligible_positions():
+    """Test les positions des chunks ayant une session dans la plage demandée."""
+    index = TimeIndex.from_metadatas(
+        [
+            _metadata((_ts(2025, 12, 24), _ts(2025, 12, 24, 23))),
+            _metadata(
+                (_ts(2025, 11, 1), _ts(2025, 11, 1, 23)),
+                (_ts(2026, 1, 10), _ts(2026, 1, 10, 23)),
+            ),
+            _metadata((_ts(2025, 6, 1), _ts(2026, 6, 1))),  # Exposition longue
+            {},  # Sans date : toujours éligible
+        ]
+    )
+
+    january = index.eligible(_ts(2026, 1, 1), _ts(2026, 1, 31, 23))
+    assert january.tolist() == [1, 2, 3]
+    christmas = index.eligible(_ts(2025, 12, 24), _ts(2025, 12, 24, 23))
+    assert christmas.tolist() == [0, 2, 3]
+    assert index.eligible(_ts(2027, 1, 1), _ts(2027, 1, 2)).tolist() == [3]
+
+
+def test_start_end_fallback_and_save_load(tmp_path):
+    """Test le repli sur start_ts/end_ts et le rechargement en mémoire mappée."""
+    index = TimeIndex.from_metadatas(
+        [
+            {"start_ts": _ts(2026, 1, 1), "end_ts": _ts(2026, 1, 5)},
+            {"start_ts": _ts(2026, 3, 1), "end_ts": _ts(2026, 3, 2)},
+        ]
+    )
+    index.save(str(tmp_path))
+    loaded = TimeIndex.load(str(tmp_path))
+
+    assert isinstance(loaded.table, np.memmap)
+    assert loaded.eligible(_ts(2026, 1, 3), _ts(2026, 1, 4)).tolist() == [0]
+    assert TimeIndex.load(str(tmp_path / "absent")) is None
+
+
+def test_interval_index_matches_brute_force(tmp_path):
+    """Test l'index d'intervalles contre un filtrage exhaustif (sessions longues et ouvertes)."""
+    rng = np.random.default_rng(0)
+    begins = rng.uniform(0, 1e6, 3000)
+    durations = rng.exponential(1e4, 3000)
+    durations[::40] = 3e5  # Expositions
+    durations[::97] = np.inf  # Sans fin
+    index = TimeIndex.from_metadatas(
+        {"start_ts": b, "end_ts": b + d} for b, d in zip(begins, durations)
+    )
+    assert index.buckets.shape[1] > 1
+
+    index.save(str(tmp_path))
+    loaded = TimeIndex.load(str(tmp_path))
+    for _ in range(100):
+        start = rng.uniform(0, 1e6)
+        end = start + rng.exponential(2e4)
+        expected = np.nonzero((begins <= end) & (begins + durations >= start))[0]
+        assert index.eligible(start, end).tolist() == expected.tolist()
+        assert loaded.eligible(start, end).tolist() == expected.tolist()
+
+
+def test_chronological_order_and_legacy_table():
+    """Test l'ordre calendaire des événements et un index sans groupes de durée."""
+    index = TimeIndex.from_metadatas(
+        [
+            _metadata((_ts(2026, 1, 20), _ts(2026, 1, 20, 22))),
+            _metadata(
+                (_ts(2025, 12, 1), _ts(2025, 12, 1, 22)),
+                (_ts(2026, 1, 5), _ts(2026, 1, 5, 22)),
+            ),
+            _metadata((_ts(2025, 12, 15), _ts(2026, 2, 15))),  # En cours
+            _metadata((_ts(2026, 1, 12), _ts(2026, 1, 12, 22))),
+        ]
+    )
+    january = (_ts(2026, 1, 1), _ts(2026, 1, 31, 23))
+    assert index.chronological(*january).tolist() == [2, 1, 3, 0]
+
+    # Table triée par début seulement (format précédent)
+    rows = index.table[:, np.argsort(index.begins, kind="stable")]
+    assert TimeIndex(rows).chronological(*january).tolist() == [2, 1, 3, 0]
+
+
+def _vectorstore(vectors, spec):
+    dim = vectors.shape[1]
+    index = spec.build(dim, vectors)
+    index.add(vectors)
+    docs = [
+        Document(id=str(i), page_content=f"event {i}", metadata={"event": i})
+        for i in range(len(vectors))
+    ]
+    return FAISS(
+        FakeEmbeddings(size=dim),
+        index,
+        InMemoryDocstore({doc.id: doc for doc in docs}),
+        {i: doc.id for i, doc in enumerate(docs)},
+    )
+
+
+def test_search_eligible_finds_out_of_top_k_events():
+    """
+    Test qu'un événement éligible mais hors du top-k global est retrouvé
+    (le post-filtrage du top-k ne renverrait rien).
+    """
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(2000, 16)).astype(np.float32)
+    query = vectors[0]
+    exact = faiss.IndexFlatL2(16)
+    exact.add(vectors)
+    _, ranked = exact.search(query[None, :], 2000)
+    # Trois événements éloignés de la requête : seuls éligibles
+    eligible = np.sort(ranked[0][-3:])
+
+    for spec in ("flat", "hnsw", "ivf_flat:nlist=16,nprobe=1"):
+        vectorstore = _vectorstore(vectors, IndexSpec.parse(spec))
+        assert not set(vectorstore.index.search(query[None, :], 3)[1][0]) & set(
+            eligible.tolist()
+        )
+
+        docs = search_eligible(vectorstore, query, 3, eligible)
+        assert sorted(doc.metadata["event"] for doc in docs) == eligible.tolist()
+
+
+def test_search_eligible_without_candidates():
+    """Test qu'aucune position éligible ne déclenche pas de recherche."""
+    vectorstore = _vectorstore(np.eye(4, dtype=np.float32), IndexSpec("flat"))
+    assert (
+        search_eligible(vectorstore, [1, 0, 0, 0], 3, np.array([], dtype=np.int64))
+        == []
+    )
+
+
+def test_nearest_eligible_many_matches_single_searches():
+    """Test qu'une recherche matricielle donne les résultats des recherches unitaires."""
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(500, 16)).astype(np.float32)
+    queries = rng.normal(size=(5, 16)).astype(np.float32)
+    eligible = np.arange(0, 500, 7)
+
+    for spec in ("flat", "hnsw", "ivf_flat:nlist=16,nprobe=2"):
+        index = _vectorstore(vectors, IndexSpec.parse(spec)).index
+        assert nearest_eligible_many(index, queries, 3, eligible) == [
+            nearest_eligible(index, query, 3, eligible) for query in queries
+        ]
+    assert nearest_eligible_many(index, queries, 3, []) == [[]] * 5
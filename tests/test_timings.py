@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+from src.timings import (
+    decode_sessions,
+    encode_sessions,
+    ends_after,
+    event_sessions,
+    overlaps,
+    parse_timings,
+    session_datetime,
+)
+
+
+def ts(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+TIMINGS = [
+    {"begin": "2026-03-10T18:00:00+01:00", "end": "2026-03-10T20:00:00+01:00"},
+    {"begin": "2026-03-01T09:00:00Z", "end": "2026-03-01T11:00:00Z"},
+    {"begin": "pas une date", "end": "2026-03-05T10:00:00Z"},
+    {"begin": "2026-03-20T10:00:00Z"},  # Pas de fin
+]
+
+
+def test_parse_timings_sorted_with_offsets():
+    """Test le parsing unique : tri par début, 'Z' géré, dates invalides ignorées."""
+    sessions = parse_timings(TIMINGS)
+
+    assert sessions.shape == (2, 3)
+    assert sessions[0, 0] == ts(2026, 3, 1, 9)
+    assert sessions[1, 0] == ts(2026, 3, 10, 17)
+    # Le décalage d'origine permet d'afficher l'heure locale de l'événement
+    assert session_datetime(sessions[1, 0], sessions[1, 2]).hour == 18
+
+
+def test_encode_decode_roundtrip_and_legacy_list():
+    """Test l'encodage compact et la lecture de l'ancien 'all_sessions_ts'."""
+    sessions = parse_timings(TIMINGS)
+    assert (decode_sessions(encode_sessions(sessions)) == sessions).all()
+
+    legacy = decode_sessions([ts(2026, 3, 10), ts(2026, 3, 11), ts(2026, 1, 1), 0])
+    assert legacy[:, 0].tolist() == [ts(2026, 1, 1), ts(2026, 3, 10)]
+    assert len(decode_sessions([])) == 0
+    assert len(decode_sessions(None)) == 0
+
+
+def test_event_sessions_leaves_raw_event_untouched():
+    """Test que le parsing des sessions n'écrit rien dans l'événement brut."""
+    event = {"timings": TIMINGS}
+    assert (event_sessions(event) == parse_timings(TIMINGS)).all()
+    assert event == {"timings": TIMINGS}
+
+
+def test_overlaps_and_ends_after():
+    """Test les requêtes temporelles vectorisées."""
+    # Exposition du 1er au 31 mars
+    sessions = parse_timings(
+        [{"begin": "2026-03-01T10:00:00Z", "end": "2026-03-31T18:00:00Z"}]
+    )
+
+    # Une session qui couvre toute la plage demandée est retenue
+    assert overlaps(sessions, ts(2026, 3, 14), ts(2026, 3, 15, 23, 59))
+    assert not overlaps(sessions, ts(2026, 4, 1), ts(2026, 4, 30))
+    assert not overlaps(sessions, ts(2026, 2, 1), ts(2026, 2, 28))
+    assert not overlaps(parse_timings([]), 0, float("inf"))
+
+    assert ends_after(sessions, ts(2026, 3, 31))
+    assert not ends_after(sessions, ts(2026, 4, 1))
+    assert not ends_after(parse_timings([]), 0)
@@ -1,11 +1,21 @@
 import os
 import json
 from unittest.mock import patch, MagicMock
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from src.core.embedding_cache import CachedEmbeddings
+from src.core.index_bundle import save_bundle
+from src.core.index_spec import IndexSpec
+from src.core.lexical_index import LexicalIndex
+from src.core.local_embeddings import LocalEmbeddings
+from src.core.time_index import TimeIndex
 from src.core.vectorstore import VectorStoreManager
 
 
 @patch("src.core.vectorstore.MistralAIEmbeddings")
-@patch("src.core.vectorstore.HuggingFaceEmbeddings")
+@patch("langchain_huggingface.HuggingFaceEmbeddings")
 def test_get_embeddings_selection(mock_hf, mock_mistral):
     """Test le choix des embeddings selon la clé API."""
 
@@ -25,9 +35,51 @@ def test_get_embeddings_selection(mock_hf, mock_mistral):
         mock_mistral.assert_not_called()
 
 
+@patch("langchain_huggingface.HuggingFaceEmbeddings")
+def test_local_multiprocess_embeddings_selection(mock_hf):
+    """Test le mode local multi-processus (LOCAL_EMBEDDING_WORKERS != 1)."""
+    env = {"MISTRAL_API_KEY": "", "LOCAL_EMBEDDING_WORKERS": "4"}
+    with patch.dict(os.environ, env):
+        manager = VectorStoreManager()
+    mock_hf.assert_not_called()
+    assert isinstance(manager.embeddings.embeddings, LocalEmbeddings)
+    assert manager.embeddings.embeddings.workers == 4
+    # Mêmes vecteurs que le mode mono-processus : même identifiant de modèle
+    assert manager.embeddings.model_id == "HuggingFaceEmbeddings:all-MiniLM-L6-v2"
+    assert (manager.batch_size, manager.concurrency) == (4096, 1)
+    # Requêtes encodées comme des documents : embed_queries en un appel
+    assert manager.embeddings.query_as_document
+
+
+@patch("src.core.vectorstore.OnnxEmbeddings")
+@patch("langchain_huggingface.HuggingFaceEmbeddings")
+def test_onnx_backend_selection(mock_hf, mock_onnx):
+    """Test le moteur local ONNX int8 (LOCAL_EMBEDDING_BACKEND=onnx)."""
+    env = {
+        "MISTRAL_API_KEY": "",
+        "LOCAL_EMBEDDING_BACKEND": "onnx",
+        "ONNX_MODEL_DIR": "models/minilm-int8",
+    }
+    with patch.dict(os.environ, env):
+        manager = VectorStoreManager()
+    mock_hf.assert_not_called()
+    mock_onnx.assert_called_once_with("models/minilm-int8", batch_size=32)
+    assert manager.embeddings.embeddings is mock_onnx.return_value
+
+
+@patch("src.core.vectorstore.LexicalIndex")
+@patch("src.core.vectorstore.TimeIndex")
+@patch("src.core.vectorstore.save_bundle")
 @patch("src.core.vectorstore.FAISS")
 @patch("src.core.vectorstore.RecursiveCharacterTextSplitter")
-def test_create_index(mock_splitter, mock_faiss, tmp_path):
+def test_create_index(
+    mock_splitter,
+    mock_faiss,
+    mock_save_bundle,
+    mock_time_index,
+    mock_lexical_index,
+    tmp_path,
+):
     """Test la création de l'index."""
     # Setup
     input_file = tmp_path / "processed_events.json"
@@ -36,11 +88,14 @@ def test_create_index(mock_splitter, mock_faiss, tmp_path):
 
     # Mock du splitter qui retourne une liste de docs fictifs
     mock_splitter_instance = mock_splitter.return_value
-    mock_splitter_instance.split_documents.return_value = ["doc1", "doc2"]
+    mock_splitter_instance.split_documents.return_value = [
+        Document(page_content="Event", metadata={"event_id": None}),
+        Document(page_content=" 1", metadata={"event_id": None}),
+    ]
 
     # Mock du vectorstore retourné par FAISS
     mock_vectorstore = MagicMock()
-    mock_faiss.from_documents.return_value = mock_vectorstore
+    mock_faiss.from_embeddings.return_value = mock_vectorstore
 
     # Action
     manager = VectorStoreManager(index_path=str(tmp_path / "faiss_index"))
@@ -52,8 +107,12 @@ def test_create_index(mock_splitter, mock_faiss, tmp_path):
     # Assertions
     mock_splitter.assert_called_once()  # Vérifie qu'on a init le splitter
     mock_splitter_instance.split_documents.assert_called_once()  # Vérifie qu'on a split
-    mock_faiss.from_documents.assert_called_once()  # Vérifie la création FAISS
-    mock_vectorstore.save_local.assert_called_once()  # Vérifie la sauvegarde
+    mock_faiss.from_embeddings.assert_called_once()  # Vérifie la création FAISS
+    mock_save_bundle.assert_called_once()  # Vérifie la sauvegarde
+    mock_time_index.from_vectorstore.assert_called_once()
+    assert mock_time_index.from_vectorstore.call_args.args[0] is mock_vectorstore
+    mock_lexical_index.from_vectorstore.assert_called_once_with(mock_vectorstore)
+    assert mock_save_bundle.call_args.args[0] is mock_vectorstore
 
 
 @patch("src.core.vectorstore.FAISS")
@@ -68,3 +127,299 @@ def test_load_index(mock_faiss, tmp_path):
     manager.load_index()
 
     mock_faiss.load_local.assert_called_once()
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Embeddings factices qui comptent les textes envoyés au modèle."""
+
+    embedded_texts: list = []
+
+    def embed_documents(self, texts):
+        self.embedded_texts.extend(texts)
+        return super().embed_documents(texts)
+
+
+def write_processed(path, texts):
+    records = [
+        {"id": uid, "text": text, "metadata": {"title": text}}
+        for uid, text in texts.items()
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f)
+
+
+def test_create_index_incremental_only_embeds_changes(tmp_path):
+    """Test que seuls les événements nouveaux ou modifiés sont ré-embeddés."""
+    processed = tmp_path / "processed_events.json"
+    manager = VectorStoreManager(index_path=str(tmp_path / "faiss_index"))
+    manager.embeddings = CountingEmbeddings(size=8, embedded_texts=[])
+
+    write_processed(processed, {1: "Concert", 2: "Expo", 3: "Théâtre"})
+    manager.create_index(processed_events_file=str(processed))
+    assert len(manager.embeddings.embedded_texts) == 3
+
+    manager.embeddings.embedded_texts.clear()
+    write_processed(processed, {1: "Concert", 2: "Expo photo", 4: "Cirque"})
+    manager.create_index(processed_events_file=str(processed))
+
+    assert sorted(manager.embeddings.embedded_texts) == ["Cirque", "Expo photo"]
+    assert manager.stats["reused_chunks"] == 1
+    assert manager.stats["deleted_events"] == 1
+    assert manager.load_manifest().keys() == {"1", "2", "4"}
+
+    index = manager.load_index()
+    parents = manager.load_parents()
+    chunks = [
+        index.docstore.search(doc_id) for doc_id in index.index_to_docstore_id.values()
+    ]
+    # Chunks allégés : les métadonnées de l'événement sont dans le store parent
+    assert all(chunk.metadata.keys() == {"event_id"} for chunk in chunks)
+    titles = sorted(
+        parents.search(str(chunk.metadata["event_id"])).metadata["title"]
+        for chunk in chunks
+    )
+    assert titles == ["Cirque", "Concert", "Expo photo"]
+    assert len(parents) == 3
+    # Le vecteur réutilisé est identique à un embedding frais
+    hits = index.similarity_search("Concert", k=1)
+    assert hits[0].metadata["event_id"] == 1
+
+
+def test_upsert_and_delete_events_in_place(tmp_path):
+    """Test la mise à jour en place de l'index par uid OpenAgenda."""
+    processed = tmp_path / "processed_events.json"
+    manager = VectorStoreManager(index_path=str(tmp_path / "faiss_index"))
+    manager.embeddings = CountingEmbeddings(size=8, embedded_texts=[])
+
+    long_text = "Festival " + "musique " * 1200  # Plusieurs chunks
+    write_processed(processed, {1: long_text, 2: "Expo"})
+    manager.create_index(processed_events_file=str(processed))
+    assert manager.load_manifest()["1"]["chunks"] > 1
+
+    manager.embeddings.embedded_texts.clear()
+    stats = manager.upsert_events(
+        [
+            {"id": 1, "text": "Festival annulé", "metadata": {"title": "Festival"}},
+            {"id": 2, "text": "Expo", "metadata": {"title": "Expo"}},  # Inchangé
+            {"id": 3, "text": "Cirque", "metadata": {"title": "Cirque"}},
+        ]
+    )
+    assert manager.embeddings.embedded_texts == ["Festival annulé", "Cirque"]
+    assert stats["chunks"] == 3
+
+    manager.delete_events([2, 404])
+    index = manager.load_index()
+    contents = sorted(
+        index.docstore.search(doc_id).page_content
+        for doc_id in index.index_to_docstore_id.values()
+    )
+    assert contents == ["Cirque", "Festival annulé"]
+    assert sorted(index.index_to_docstore_id.values()) == ["1#0", "3#0"]
+    assert set(manager.load_manifest()) == {"1", "3"}
+    # Sauvegarde atomique : lien vers la version courante, plus la précédente
+    index_path = tmp_path / "faiss_index"
+    assert index_path.is_symlink()
+    versions = sorted(
+        p.name for p in tmp_path.iterdir() if p.name.startswith("faiss_index.v")
+    )
+    assert len(versions) == 2
+    assert os.readlink(index_path) == versions[-1]
+
+
+def test_save_swaps_legacy_directory_and_skips_empty_upsert(tmp_path):
+    """Test la conversion d'un index en dossier réel et l'upsert vide sans index."""
+    index_path = tmp_path / "faiss_index"
+    manager = VectorStoreManager(index_path=str(index_path))
+    manager.embeddings = CountingEmbeddings(size=8, embedded_texts=[])
+
+    assert manager.upsert_events([]) == {}
+    assert not index_path.exists()
+
+    manager.upsert_events([{"id": 1, "text": "Expo", "metadata": {"title": "E"}}])
+    # Index au format précédent : dossier réel à la place du lien
+    current = index_path.resolve()
+    os.remove(index_path)
+    os.replace(current, index_path)
+
+    manager.upsert_events([{"id": 2, "text": "Cirque", "metadata": {"title": "C"}}])
+    assert index_path.is_symlink()
+    assert sorted(manager.load_manifest()) == ["1", "2"]
+    version = manager.load_index_version()
+    assert os.readlink(index_path) == f"faiss_index.v{version}"
+
+
+class FlakyEmbeddings(CountingEmbeddings):
+    """Embeddings qui échouent tant que 'failures' contient le texte demandé."""
+
+    failures: list = []
+    batches: list = []
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        if any(text in self.failures for text in texts):
+            raise RuntimeError("429 Too Many Requests")
+        return super().embed_documents(texts)
+
+
+def test_legacy_chunks_moved_to_parent_store(tmp_path):
+    """Test la migration d'un index dont chaque chunk porte le contexte complet."""
+    index_path = tmp_path / "faiss_index"
+    processed = tmp_path / "processed_events.json"
+    manager = VectorStoreManager(index_path=str(index_path))
+    manager.embeddings = CountingEmbeddings(size=8, embedded_texts=[])
+    long_text = "Festival " + "musique " * 1200
+    write_processed(processed, {1: long_text, 2: "Expo"})
+    manager.create_index(processed_events_file=str(processed))
+
+    # Index au format précédent : métadonnées complètes dans chaque chunk
+    index = manager.load_index(writable=True)
+    for doc_id in index.index_to_docstore_id.values():
+        chunk = index.docstore.search(doc_id)
+        event_id = chunk.metadata["event_id"]
+        chunk.metadata = {
+            "event_id": event_id,
+            "title": f"Titre {event_id}",
+            "full_context": f"Contexte {event_id}",
+        }
+    save_bundle(index, str(index_path))
+    for name in os.listdir(index_path):
+        if name.startswith("parents"):
+            os.remove(index_path / name)
+    assert manager.load_parents() is None
+
+    manager.upsert_events([{"id": 3, "text": "Cirque", "metadata": {"title": "C"}}])
+
+    parents = manager.load_parents()
+    assert parents.search("1").page_content == "Contexte 1"
+    assert parents.search("1").metadata["title"] == "Titre 1"
+    assert parents.search("3").metadata["title"] == "C"
+    index = manager.load_index()
+    assert all(
+        index.docstore.search(doc_id).metadata.keys() == {"event_id"}
+        for doc_id in index.index_to_docstore_id.values()
+    )
+
+
+def test_embedding_batches_retry_and_resume(tmp_path):
+    """Lots concurrents, retry, puis reprise d'un build interrompu via le cache."""
+    processed = tmp_path / "processed_events.json"
+    texts = {uid: f"Événement {uid}" for uid in range(1, 8)}
+    write_processed(processed, texts)
+
+    model = FlakyEmbeddings(size=8, embedded_texts=[], failures=["Événement 6"])
+    manager = VectorStoreManager(index_path=str(tmp_path / "faiss_index"))
+    manager.embeddings = CachedEmbeddings(
+        model, "fake:8", path=str(tmp_path / "cache.sqlite")
+    )
+    manager.batch_size, manager.concurrency, manager.max_retries = 2, 2, 1
+    manager.sleep = MagicMock()
+
+    with pytest.raises(RuntimeError):
+        manager.create_index(processed_events_file=str(processed))
+    assert all(len(batch) <= 2 for batch in model.batches)
+    manager.sleep.assert_called_once_with(0.5)  # Un retry pour le lot en échec
+    assert not (tmp_path / "faiss_index").exists()
+
+    # Reprise : seuls les textes des lots non terminés sont envoyés au modèle
+    model.failures.clear()
+    model.embedded_texts.clear()
+    manager.create_index(processed_events_file=str(processed))
+    assert "Événement 1" not in model.embedded_texts
+    assert "Événement 6" in model.embedded_texts
+    assert manager.stats["chunks"] == 7
+    assert manager.stats["embeddings_per_sec"] > 0
+    assert (
+        manager.load_index()
+        .similarity_search("Événement 3", k=1)[0]
+        .metadata["event_id"]
+        == 3
+    )
+
+
+def test_index_spec_persisted_and_updated(tmp_path):
+    """Test les index approchés (HNSW, IVF) : persistance, mises à jour, changement."""
+    processed = tmp_path / "processed_events.json"
+    manager = VectorStoreManager(index_path=str(tmp_path / "faiss_index"))
+    manager.embeddings = CountingEmbeddings(size=8, embedded_texts=[])
+
+    texts = {uid: f"Événement {uid}" for uid in range(1, 6)}
+    write_processed(processed, texts)
+    manager.create_index(processed_events_file=str(processed), index_spec="hnsw:m=8")
+    assert manager.load_index_spec() == IndexSpec.parse("hnsw:m=8")
+    index = manager.load_index()
+    assert type(index.index).__name__ == "IndexHNSWFlat"
+    assert index.index.hnsw.efSearch == 64
+
+    # HNSW ne sait pas supprimer : reconstruction depuis les vecteurs restants
+    manager.delete_events([2])
+    manager.upsert_events([{"id": 3, "text": "Cirque", "metadata": {"title": "C"}}])
+    index = manager.load_index()
+    assert index.index.ntotal == 4
+    assert sorted(index.index_to_docstore_id.values()) == ["1#0", "3#0", "4#0", "5#0"]
+    assert index.similarity_search("Cirque", k=1)[0].metadata["event_id"] == 3
+
+    # Nouveau type demandé : reconstruction complète (même incrémentale)
+    manager.embeddings.embedded_texts.clear()
+    manager.create_index(
+        processed_events_file=str(processed), index_spec="ivf_flat:nlist=4"
+    )
+    assert len(manager.embeddings.embedded_texts) == 5
+    index = manager.load_index()
+    assert type(index.index).__name__ == "IndexIVFFlat"
+    assert index.similarity_search("Événement 4", k=1)[0].metadata["event_id"] == 4
+
+
+def test_build_without_cache_path_warns(tmp_path, capsys):
+    """Test l'avertissement : sans cache disque, pas de reprise possible."""
+    processed = tmp_path / "processed_events.json"
+    write_processed(processed, {1: "Événement 1"})
+    manager = VectorStoreManager(index_path=str(tmp_path / "faiss_index"))
+    manager.embeddings = CachedEmbeddings(
+        FlakyEmbeddings(size=8, embedded_texts=[], failures=[]), "fake:8", path=""
+    )
+
+    manager.create_index(processed_events_file=str(processed))
+
+    assert "ne pourra pas reprendre" in capsys.readouterr().out
+
+
+def test_in_place_updates_patch_time_and_lexical_indexes(tmp_path):
+    """Test que les index temporel et BM25 patchés égalent une reconstruction."""
+    manager = VectorStoreManager(index_path=str(tmp_path / "faiss_index"))
+    manager.embeddings = CountingEmbeddings(size=8, embedded_texts=[])
+
+    def event(uid, text, day):
+        start = 1_700_000_000 + day * 86400
+        return {
+            "id": uid,
+            "text": text,
+            "metadata": {"title": text, "start_ts": start, "end_ts": start + 3600},
+        }
+
+    long_text = "Festival " + "musique " * 1200  # Plusieurs chunks
+    manager.upsert_events(
+        [event(1, long_text, 0), event(2, "Expo peinture", 1), event(3, "Cirque", 2)]
+    )
+    with patch.object(
+        LexicalIndex, "from_vectorstore", side_effect=AssertionError
+    ), patch.object(TimeIndex, "from_vectorstore", side_effect=AssertionError):
+        manager.upsert_events([event(2, "Expo photo", 5), event(4, "Concert jazz", 3)])
+        manager.delete_events([1])
+
+    index = manager.load_index()
+    parents = {
+        doc_id: manager.load_parents().search(doc_id) for doc_id in ("2", "3", "4")
+    }
+    expected = LexicalIndex.from_vectorstore(index)
+    lexical = manager.load_lexical_index()
+    for name in ("terms", "offsets", "postings", "freqs", "lengths"):
+        assert np.array_equal(getattr(lexical, name), getattr(expected, name))
+    expected = TimeIndex.from_vectorstore(index, parents)
+    time_index = manager.load_time_index()
+    assert np.array_equal(time_index.table, expected.table)
+    assert np.array_equal(time_index.buckets, expected.buckets)
+    assert lexical.search("photo", k=1) == [
+        position
+        for position, doc_id in index.index_to_docstore_id.items()
+        if doc_id == "2#0"
+    ]